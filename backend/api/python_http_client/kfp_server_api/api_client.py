@@ -27,6 +27,7 @@ from __future__ import absolute_import
 import atexit
 import datetime
 from dateutil.parser import parse
+from dateutil.tz import tzoffset, tzutc
 import json
 import mimetypes
 from multiprocessing.pool import ThreadPool
@@ -64,6 +65,9 @@ class ApiClient(object):
         to the API
     :param pool_threads: The number of threads to use for async requests
         to the API. More threads means more concurrent API requests.
+    :param raw_responses: if True, the responses are returned as the decoded
+        JSON dicts and lists instead of the model objects. The dict keys are
+        the JSON names of the model attributes.
     """
 
     PRIMITIVE_TYPES = (float, bool, bytes, six.text_type) + six.integer_types
@@ -77,10 +81,18 @@ class ApiClient(object):
         'datetime': datetime.datetime,
         'object': object,
     }
+    # RFC 3339 date-time, e.g. 2021-01-01T00:00:00.123456789Z.
+    DATETIME_PATTERN = re.compile(
+        r'(\d{4})-(\d\d)-(\d\d)[Tt ](\d\d):(\d\d):(\d\d)(?:\.(\d{1,6})\d*)?'
+        r'(?:([Zz])|([+-])(\d\d):(\d\d))?$')
     _pool = None
+    # The parsed type strings (e.g. 'list[ApiRun]'), shared by the clients.
+    _types_cache = {}
+    # The (attribute name, JSON key, type) tuples of the model classes.
+    _model_attributes_cache = {}
 
     def __init__(self, configuration=None, header_name=None, header_value=None,
-                 cookie=None, pool_threads=1):
+                 cookie=None, pool_threads=1, raw_responses=False):
         if configuration is None:
             configuration = Configuration.get_default_copy()
         self.configuration = configuration
@@ -94,6 +106,7 @@ class ApiClient(object):
         # Set default User-Agent.
         self.user_agent = 'OpenAPI-Generator/1.3.0/python'
         self.client_side_validation = configuration.client_side_validation
+        self.raw_responses = raw_responses
 
     def __enter__(self):
         return self
@@ -291,6 +304,9 @@ class ApiClient(object):
         except ValueError:
             data = response.data
 
+        if self.raw_responses:
+            return data
+
         return self.__deserialize(data, response_type)
 
     def __deserialize(self, data, klass):
@@ -305,22 +321,14 @@ class ApiClient(object):
             return None
 
         if type(klass) == str:
-            if klass.startswith('list['):
-                sub_kls = re.match(r'list\[(.*)\]', klass).group(1)
-                return [self.__deserialize(sub_data, sub_kls)
+            kind, klass = self.__resolve_type(klass)
+            if kind == 'list':
+                return [self.__deserialize(sub_data, klass)
                         for sub_data in data]
-
-            if klass.startswith('dict('):
-                sub_kls = re.match(r'dict\(([^,]*), (.*)\)', klass).group(2)
-                return {k: self.__deserialize(v, sub_kls)
+            if kind == 'dict':
+                return {k: self.__deserialize(v, klass)
                         for k, v in six.iteritems(data)}
 
-            # convert str to class
-            if klass in self.NATIVE_TYPES_MAPPING:
-                klass = self.NATIVE_TYPES_MAPPING[klass]
-            else:
-                klass = getattr(kfp_server_api.models, klass)
-
         if klass in self.PRIMITIVE_TYPES:
             return self.__deserialize_primitive(data, klass)
         elif klass == object:
@@ -332,6 +340,29 @@ class ApiClient(object):
         else:
             return self.__deserialize_model(data, klass)
 
+    def __resolve_type(self, klass):
+        """Parses the type string once and caches the result.
+
+        :param klass: string of class name, e.g. `list[ApiRun]`.
+        :return: tuple of the kind ('list', 'dict' or None) and the class
+            literal or the string of the item class name.
+        """
+        resolved_type = self._types_cache.get(klass)
+        if resolved_type is None:
+            if klass.startswith('list['):
+                resolved_type = (
+                    'list', re.match(r'list\[(.*)\]', klass).group(1))
+            elif klass.startswith('dict('):
+                resolved_type = (
+                    'dict',
+                    re.match(r'dict\(([^,]*), (.*)\)', klass).group(2))
+            elif klass in self.NATIVE_TYPES_MAPPING:
+                resolved_type = (None, self.NATIVE_TYPES_MAPPING[klass])
+            else:
+                resolved_type = (None, getattr(kfp_server_api.models, klass))
+            self._types_cache[klass] = resolved_type
+        return resolved_type
+
     def call_api(self, resource_path, method,
                  path_params=None, query_params=None, header_params=None,
                  body=None, post_params=None, files=None,
@@ -634,6 +665,25 @@ class ApiClient(object):
         :param string: str.
         :return: datetime.
         """
+        match = self.DATETIME_PATTERN.match(string)
+        if match:
+            # The fast path for the date-times returned by the API server.
+            (year, month, day, hour, minute, second, fraction, utc, sign,
+             offset_hours, offset_minutes) = match.groups()
+            if utc:
+                tzinfo = tzutc()
+            elif sign:
+                offset = int(offset_hours) * 3600 + int(offset_minutes) * 60
+                tzinfo = tzoffset(None, -offset if sign == '-' else offset)
+            else:
+                tzinfo = None
+            try:
+                return datetime.datetime(
+                    int(year), int(month), int(day), int(hour), int(minute),
+                    int(second), int(fraction.ljust(6, '0')) if fraction else 0,
+                    tzinfo)
+            except ValueError:
+                pass
         try:
             return parse(string)
         except ImportError:
@@ -666,12 +716,19 @@ class ApiClient(object):
         if (data is not None and
                 klass.openapi_types is not None and
                 isinstance(data, (list, dict))):
-            for attr, attr_type in six.iteritems(klass.openapi_types):
-                if klass.attribute_map[attr] in data:
-                    value = data[klass.attribute_map[attr]]
-                    kwargs[attr] = self.__deserialize(value, attr_type)
-
-        instance = klass(**kwargs)
+            attributes = self._model_attributes_cache.get(klass)
+            if attributes is None:
+                attributes = [
+                    (attr, klass.attribute_map[attr], attr_type)
+                    for attr, attr_type in six.iteritems(klass.openapi_types)]
+                self._model_attributes_cache[klass] = attributes
+            for attr, key, attr_type in attributes:
+                if key in data:
+                    kwargs[attr] = self.__deserialize(data[key], attr_type)
+
+        # Creating a configuration for every model is slower than
+        # deserializing the model itself.
+        instance = klass(local_vars_configuration=self.configuration, **kwargs)
 
         if has_discriminator:
             klass_name = instance.get_real_child_model(data)
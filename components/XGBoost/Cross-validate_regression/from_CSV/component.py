@@ -0,0 +1,211 @@
+from typing import NamedTuple
+from kfp.components import InputPath, create_component_from_func
+
+def xgboost_cross_validate_regression(
+    data_path: InputPath('CSV'),
+    label_column: int = 0,
+    number_of_folds: int = 5,
+    random_seed: int = 0,
+    num_iterations: int = 200,
+    booster_params: dict = None,
+
+    # Booster parameters
+    objective: str = 'reg:squarederror',
+    booster: str = 'gbtree',
+    learning_rate: float = 0.3,
+    min_split_loss: float = 0,
+    max_depth: int = 6,
+
+    parallelism: int = 0,
+) -> NamedTuple('Outputs', [
+    ('number_of_items', int),
+    ('max_absolute_error', float),
+    ('mean_absolute_error', float),
+    ('mean_squared_error', float),
+    ('root_mean_squared_error', float),
+    ('metrics', dict),
+    ('fold_metrics', list),
+]):
+    '''Cross-validates an XGBoost regression model in a single task.
+
+    Unlike the "Xgboost 5 fold cross validation for regression" graph component, which runs separate
+    train, predict and metrics tasks for every fold, this component trains and evaluates all folds in parallel processes.
+    The data is converted to memory-mapped float32 arrays once and shared by all fold processes.
+    Every concurrently running fold copies its training rows out of the shared arrays and XGBoost copies them again
+    into the DMatrix, so a fold needs about twice the size of its training rows while its DMatrix is built and about
+    the size of its training rows while it trains. Lower the parallelism when the folds do not fit in memory.
+    The folds are the same as the ones produced by the "Split table into folds" component.
+
+    Args:
+        data_path: Path for the data in CSV format.
+        label_column: Column containing the label data.
+        number_of_folds: Number of folds to split the data into.
+        random_seed: Random seed for reproducible splitting.
+        num_iterations: Number of boosting iterations.
+        booster_params: Parameters for the booster. See https://xgboost.readthedocs.io/en/latest/parameter.html
+        objective: The learning task and the corresponding learning objective.
+            See https://xgboost.readthedocs.io/en/latest/parameter.html#learning-task-parameters
+        parallelism: Maximum number of folds that are trained at the same time. Defaults to the number of CPUs available to the container.
+            The CPUs are divided between the concurrently trained folds.
+
+    Outputs:
+        metrics: The regression metrics calculated over the testing subsamples of all folds.
+        fold_metrics: The regression metrics of every fold.
+    '''
+    import math
+    import multiprocessing
+    import os
+    import queue
+    import tempfile
+    import traceback
+
+    import numpy
+    import pandas
+    import xgboost
+
+    if number_of_folds < 2:
+        raise ValueError('Number of folds must be at least 2.')
+
+    number_of_cpus = len(os.sched_getaffinity(0))
+    parallelism = min(parallelism or number_of_cpus, number_of_folds)
+    threads_per_fold = max(1, number_of_cpus // parallelism)
+
+    # Converting the data to the memory-mapped arrays chunk by chunk.
+    temp_dir = tempfile.mkdtemp()
+    features_path = os.path.join(temp_dir, 'features')
+    labels_path = os.path.join(temp_dir, 'labels')
+    number_of_rows = 0
+    with open(features_path, 'wb') as features_file, open(labels_path, 'wb') as labels_file:
+        for df in pandas.read_csv(data_path, chunksize=100000):
+            label_column_name = df.columns[label_column]
+            feature_names = list(df.columns.drop(label_column_name))
+            features_file.write(df[feature_names].to_numpy(dtype=numpy.float32).tobytes())
+            labels_file.write(df[label_column_name].to_numpy(dtype=numpy.float32).tobytes())
+            number_of_rows += len(df)
+    if number_of_rows < number_of_folds:
+        raise ValueError('Cannot split {} rows into {} folds.'.format(number_of_rows, number_of_folds))
+    features = numpy.memmap(features_path, dtype=numpy.float32, mode='r', shape=(number_of_rows, len(feature_names)))
+    labels = numpy.memmap(labels_path, dtype=numpy.float32, mode='r', shape=(number_of_rows,))
+
+    # Same folds as in sklearn.model_selection.KFold(shuffle=True)
+    row_folds = numpy.empty(number_of_rows, dtype=numpy.uint16)
+    shuffled_rows = numpy.random.RandomState(random_seed).permutation(number_of_rows)
+    for fold_index, fold_rows in enumerate(numpy.array_split(shuffled_rows, number_of_folds)):
+        row_folds[fold_rows] = fold_index + 1
+
+    booster_params = booster_params or {}
+    booster_params.setdefault('objective', objective)
+    booster_params.setdefault('booster', booster)
+    booster_params.setdefault('learning_rate', learning_rate)
+    booster_params.setdefault('min_split_loss', min_split_loss)
+    booster_params.setdefault('max_depth', max_depth)
+    booster_params['nthread'] = threads_per_fold
+
+    def evaluate_fold(fold_number):
+        testing_rows = row_folds == fold_number
+        training_data = xgboost.DMatrix(
+            data=features[~testing_rows],
+            label=labels[~testing_rows],
+            feature_names=feature_names,
+            nthread=threads_per_fold,
+        )
+        model = xgboost.train(
+            params=booster_params,
+            dtrain=training_data,
+            num_boost_round=num_iterations,
+        )
+        del training_data
+
+        testing_data = xgboost.DMatrix(
+            data=features[testing_rows],
+            feature_names=feature_names,
+            nthread=threads_per_fold,
+        )
+        errors = labels[testing_rows].astype(numpy.float64) - model.predict(testing_data)
+        return dict(
+            number_of_items=int(errors.size),
+            max_absolute_error=float(numpy.max(numpy.abs(errors))),
+            sum_of_absolute_errors=float(numpy.sum(numpy.abs(errors))),
+            sum_of_squared_errors=float(numpy.sum(errors ** 2)),
+        )
+
+    # The fold processes are forked, so they share the memory-mapped data and do not need to pickle the fold function.
+    # The parent process must not use XGBoost (and its OpenMP thread pool) before forking.
+    context = multiprocessing.get_context('fork')
+    results_queue = context.Queue()
+
+    def run_fold(fold_number):
+        try:
+            results_queue.put((fold_number, evaluate_fold(fold_number), None))
+        except BaseException:
+            results_queue.put((fold_number, None, traceback.format_exc()))
+
+    pending_folds = list(range(1, number_of_folds + 1))
+    running_processes = {}
+    fold_results = {}
+
+    def terminate_running_processes():
+        for process in running_processes.values():
+            process.terminate()
+        for process in running_processes.values():
+            process.join()
+
+    while pending_folds or running_processes:
+        while pending_folds and len(running_processes) < parallelism:
+            fold_number = pending_folds.pop(0)
+            # The daemon processes are terminated when the main process exits.
+            process = context.Process(target=run_fold, args=(fold_number,), daemon=True)
+            process.start()
+            running_processes[fold_number] = process
+        try:
+            fold_number, result, error = results_queue.get(timeout=1)
+        except queue.Empty:
+            for fold_number, process in running_processes.items():
+                if process.exitcode:
+                    terminate_running_processes()
+                    raise RuntimeError('The process of fold {} has exited with code {}.'.format(fold_number, process.exitcode))
+            continue
+        running_processes.pop(fold_number).join()
+        if error:
+            terminate_running_processes()
+            raise RuntimeError('Fold {} has failed:\n{}'.format(fold_number, error))
+        fold_results[fold_number] = result
+        print('Fold {}: {}'.format(fold_number, result))
+
+    # Aggregating the metrics
+    def make_metrics(results):
+        number_of_items = sum(result['number_of_items'] for result in results)
+        mean_squared_error = sum(result['sum_of_squared_errors'] for result in results) / number_of_items
+        return dict(
+            number_of_items=number_of_items,
+            max_absolute_error=max(result['max_absolute_error'] for result in results),
+            mean_absolute_error=sum(result['sum_of_absolute_errors'] for result in results) / number_of_items,
+            mean_squared_error=mean_squared_error,
+            root_mean_squared_error=math.sqrt(mean_squared_error),
+        )
+
+    fold_metrics = [make_metrics([fold_results[fold_number]]) for fold_number in sorted(fold_results)]
+    metrics = make_metrics(fold_results.values())
+    print('Metrics: {}'.format(metrics))
+
+    return (
+        metrics['number_of_items'],
+        metrics['max_absolute_error'],
+        metrics['mean_absolute_error'],
+        metrics['mean_squared_error'],
+        metrics['root_mean_squared_error'],
+        metrics,
+        fold_metrics,
+    )
+
+
+if __name__ == '__main__':
+    xgboost_cross_validate_regression_op = create_component_from_func(
+        xgboost_cross_validate_regression,
+        output_component_file='component.yaml',
+        base_image='python:3.7',
+        packages_to_install=[
+            'xgboost==1.6.2',
+            'pandas==1.0.5',
+        ]
+    )
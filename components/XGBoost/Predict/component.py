@@ -5,6 +5,8 @@ def xgboost_predict(
     model_path: InputPath('XGBoostModel'),
     predictions_path: OutputPath('Text'),
     label_column: int = None,
+    batch_size: int = 100000,
+    num_threads: int = 0,
 ):
     '''Make predictions using a trained XGBoost model.
 
@@ -13,33 +15,38 @@ def xgboost_predict(
         model_path: Path for the trained model in binary XGBoost format.
         predictions_path: Output path for the predictions.
         label_column: Column containing the label data.
+        batch_size: Number of rows that are read and predicted at a time.
+        num_threads: Number of threads used for the prediction. Defaults to the number of CPUs available to the container.
 
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import os
     from pathlib import Path
 
     import numpy
     import pandas
     import xgboost
 
-    df = pandas.read_csv(
-        data_path,
-    )
-
-    if label_column is not None:
-        df = df.drop(columns=[df.columns[label_column]])
-
-    testing_data = xgboost.DMatrix(
-        data=df,
-    )
+    num_threads = num_threads or len(os.sched_getaffinity(0))
 
     model = xgboost.Booster(model_file=model_path)
+    model.set_param('nthread', num_threads)
 
-    predictions = model.predict(testing_data)
-
+    # The data is read and predicted batch by batch, so it does not need to fit in memory.
     Path(predictions_path).parent.mkdir(parents=True, exist_ok=True)
-    numpy.savetxt(predictions_path, predictions)
+    with open(predictions_path, 'w') as predictions_file:
+        for df in pandas.read_csv(data_path, chunksize=batch_size):
+            if label_column is not None:
+                df = df.drop(columns=[df.columns[label_column]])
+
+            testing_data = xgboost.DMatrix(
+                data=df.to_numpy(dtype=numpy.float32),
+                feature_names=list(df.columns),
+                nthread=num_threads,
+            )
+            predictions = model.predict(testing_data)
+            numpy.savetxt(predictions_file, predictions)
 
 
 if __name__ == '__main__':
@@ -48,7 +55,7 @@ if __name__ == '__main__':
         output_component_file='component.yaml',
         base_image='python:3.7',
         packages_to_install=[
-            'xgboost==1.1.1',
+            'xgboost==1.6.2',
             'pandas==1.0.5',
         ]
     )
@@ -5,6 +5,8 @@ def xgboost_predict(
     model_path: InputPath('XGBoostModel'),
     predictions_path: OutputPath('Text'),
     label_column_name: str = None,
+    batch_size: int = 100000,
+    num_threads: int = 0,
 ):
     '''Make predictions using a trained XGBoost model.
 
@@ -13,32 +15,54 @@ def xgboost_predict(
         model_path: Path for the trained model in binary XGBoost format.
         predictions_path: Output path for the predictions.
         label_column_name: Optional. Name of the column containing the label data that is excluded during the prediction.
+        batch_size: Maximum number of rows that are predicted at a time. The data is read one row group at a time.
+        num_threads: Number of threads used for the prediction. Defaults to the number of CPUs available to the container.
 
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import os
     from pathlib import Path
 
     import numpy
-    import pandas
+    import pyarrow.parquet
     import xgboost
 
-    # Loading data
-    df = pandas.read_parquet(data_path)
-    if label_column_name:
-        df = df.drop(columns=[label_column_name])
+    num_threads = num_threads or len(os.sched_getaffinity(0))
 
-    evaluation_data = xgboost.DMatrix(
-        data=df,
-    )
-
-    # Training
     model = xgboost.Booster(model_file=model_path)
+    model.set_param('nthread', num_threads)
 
-    predictions = model.predict(evaluation_data)
+    # The data is read and predicted one row group at a time, so it does not need to fit in memory.
+    parquet_file = pyarrow.parquet.ParquetFile(data_path)
+    arrow_schema = parquet_file.schema.to_arrow_schema()
+    index_columns = (arrow_schema.pandas_metadata or {}).get('index_columns', [])
+    feature_names = [
+        name for name in arrow_schema.names
+        if name != label_column_name and name not in index_columns
+    ]
 
     Path(predictions_path).parent.mkdir(parents=True, exist_ok=True)
-    numpy.savetxt(predictions_path, predictions)
+    with open(predictions_path, 'w') as predictions_file:
+        for row_group_index in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(
+                row_group_index,
+                columns=feature_names,
+                use_threads=num_threads > 1,
+            )
+            for offset in range(0, table.num_rows, batch_size):
+                batch = table.slice(offset, batch_size)
+                features = numpy.empty((batch.num_rows, len(feature_names)), dtype=numpy.float32)
+                for feature_index, name in enumerate(feature_names):
+                    features[:, feature_index] = batch.column(name).to_pandas()
+
+                evaluation_data = xgboost.DMatrix(
+                    data=features,
+                    feature_names=feature_names,
+                    nthread=num_threads,
+                )
+                predictions = model.predict(evaluation_data)
+                numpy.savetxt(predictions_file, predictions)
 
 
 if __name__ == '__main__':
@@ -47,7 +71,7 @@ if __name__ == '__main__':
         output_component_file='component.yaml',
         base_image='python:3.7',
         packages_to_install=[
-            'xgboost==1.1.1',
+            'xgboost==1.6.2',
             'pandas==1.0.5',
             'pyarrow==0.17.1',
         ]
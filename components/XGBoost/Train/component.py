@@ -16,6 +16,11 @@ def xgboost_train(
     learning_rate: float = 0.3,
     min_split_loss: float = 0,
     max_depth: int = 6,
+
+    # Data loading
+    batch_size: int = 100000,
+    use_external_memory: bool = False,
+    num_threads: int = 0,
 ):
     '''Train an XGBoost model.
 
@@ -36,21 +41,81 @@ def xgboost_train(
             "binary:logitraw" - Logistic regression for binary classification, output score before logistic transformation
             "rank:pairwise" - Use LambdaMART to perform pairwise ranking where the pairwise loss is minimized
             "rank:ndcg" - Use LambdaMART to perform list-wise ranking where Normalized Discounted Cumulative Gain (NDCG) is maximized
+        batch_size: Number of rows that are read from the training data at a time.
+        use_external_memory: Whether to use the XGBoost external memory mode.
+            The data is paged to the local disk and the training data does not need to fit in memory.
+        num_threads: Number of threads used for loading the data and training. Defaults to the number of CPUs available to the container.
 
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import os
+    import tempfile
+
+    import numpy
     import pandas
     import xgboost
 
-    df = pandas.read_csv(
-        training_data_path,
-    )
+    num_threads = num_threads or len(os.sched_getaffinity(0))
 
-    training_data = xgboost.DMatrix(
-        data=df.drop(columns=[df.columns[label_column]]),
-        label=df[df.columns[label_column]],
-    )
+    # Loading data
+    # The batches are converted to float32 arrays right away, so the whole table is never held as a DataFrame.
+    def iterate_batches():
+        for df in pandas.read_csv(training_data_path, chunksize=batch_size):
+            label_column_name = df.columns[label_column]
+            yield (
+                df.drop(columns=[label_column_name]).to_numpy(dtype=numpy.float32),
+                df[label_column_name].to_numpy(dtype=numpy.float32),
+            )
+
+    feature_names = list(pandas.read_csv(training_data_path, nrows=0).columns)
+    del feature_names[label_column]
+
+    if use_external_memory:
+        class BatchIterator(xgboost.DataIter):
+            def __init__(self, cache_prefix):
+                self._batches = None
+                super().__init__(cache_prefix=cache_prefix)
+
+            def next(self, input_data):
+                if self._batches is None:
+                    self._batches = iterate_batches()
+                batch = next(self._batches, None)
+                if batch is None:
+                    return 0
+                features, labels = batch
+                input_data(data=features, label=labels, feature_names=feature_names)
+                return 1
+
+            def reset(self):
+                self._batches = None
+
+        # XGBoost pages the batches to the cache files and only keeps the working set in memory.
+        cache_prefix = os.path.join(tempfile.mkdtemp(), 'cache')
+        training_data = xgboost.DMatrix(BatchIterator(cache_prefix), nthread=num_threads)
+    else:
+        # The number of rows is not known in advance, so the arrays grow as the batches are read.
+        # ndarray.resize reallocates the arrays in place, since nothing else references them.
+        data = numpy.empty((batch_size, len(feature_names)), dtype=numpy.float32)
+        label = numpy.empty(batch_size, dtype=numpy.float32)
+        offset = 0
+        for features, labels in iterate_batches():
+            if offset + len(labels) > len(label):
+                capacity = max(2 * len(label), offset + len(labels))
+                data.resize((capacity, len(feature_names)), refcheck=False)
+                label.resize(capacity, refcheck=False)
+            data[offset:offset + len(labels)] = features
+            label[offset:offset + len(labels)] = labels
+            offset += len(labels)
+        data.resize((offset, len(feature_names)), refcheck=False)
+        label.resize(offset, refcheck=False)
+        training_data = xgboost.DMatrix(
+            data=data,
+            label=label,
+            feature_names=feature_names,
+            nthread=num_threads,
+        )
+        del data, label
 
     booster_params = booster_params or {}
     booster_params.setdefault('objective', objective)
@@ -58,6 +123,7 @@ def xgboost_train(
     booster_params.setdefault('learning_rate', learning_rate)
     booster_params.setdefault('min_split_loss', min_split_loss)
     booster_params.setdefault('max_depth', max_depth)
+    booster_params.setdefault('nthread', num_threads)
 
     starting_model = None
     if starting_model_path:
@@ -84,7 +150,7 @@ if __name__ == '__main__':
         output_component_file='component.yaml',
         base_image='python:3.7',
         packages_to_install=[
-            'xgboost==1.1.1',
+            'xgboost==1.6.2',
             'pandas==1.0.5',
         ]
     )
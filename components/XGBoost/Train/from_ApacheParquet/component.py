@@ -17,6 +17,11 @@ def xgboost_train(
     learning_rate: float = 0.3,
     min_split_loss: float = 0,
     max_depth: int = 6,
+
+    # Data loading
+    batch_size: int = 100000,
+    use_external_memory: bool = False,
+    num_threads: int = 0,
 ):
     '''Train an XGBoost model.
 
@@ -37,19 +42,87 @@ def xgboost_train(
             "binary:logitraw" - Logistic regression for binary classification, output score before logistic transformation
             "rank:pairwise" - Use LambdaMART to perform pairwise ranking where the pairwise loss is minimized
             "rank:ndcg" - Use LambdaMART to perform list-wise ranking where Normalized Discounted Cumulative Gain (NDCG) is maximized
+        batch_size: Maximum number of rows that are converted at a time. The data is read one row group at a time.
+        use_external_memory: Whether to use the XGBoost external memory mode.
+            The data is paged to the local disk and the training data does not need to fit in memory.
+        num_threads: Number of threads used for loading the data and training. Defaults to the number of CPUs available to the container.
 
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
-    import pandas
+    import os
+    import tempfile
+
+    import numpy
+    import pyarrow.parquet
     import xgboost
 
+    num_threads = num_threads or len(os.sched_getaffinity(0))
+
     # Loading data
-    df = pandas.read_parquet(training_data_path)
-    training_data = xgboost.DMatrix(
-        data=df.drop(columns=[label_column_name]),
-        label=df[[label_column_name]],
-    )
+    # The row groups are read and converted to float32 arrays one by one, so the whole table is never held as a DataFrame.
+    parquet_file = pyarrow.parquet.ParquetFile(training_data_path)
+    arrow_schema = parquet_file.schema.to_arrow_schema()
+    index_columns = (arrow_schema.pandas_metadata or {}).get('index_columns', [])
+    feature_names = [
+        name for name in arrow_schema.names
+        if name != label_column_name and name not in index_columns
+    ]
+
+    def iterate_batches():
+        for row_group_index in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(
+                row_group_index,
+                columns=feature_names + [label_column_name],
+                use_threads=num_threads > 1,
+            )
+            for offset in range(0, table.num_rows, batch_size):
+                batch = table.slice(offset, batch_size)
+                features = numpy.empty((batch.num_rows, len(feature_names)), dtype=numpy.float32)
+                for feature_index, name in enumerate(feature_names):
+                    features[:, feature_index] = batch.column(name).to_pandas()
+                labels = batch.column(label_column_name).to_pandas().to_numpy(dtype=numpy.float32)
+                yield features, labels
+
+    if use_external_memory:
+        class BatchIterator(xgboost.DataIter):
+            def __init__(self, cache_prefix):
+                self._batches = None
+                super().__init__(cache_prefix=cache_prefix)
+
+            def next(self, input_data):
+                if self._batches is None:
+                    self._batches = iterate_batches()
+                batch = next(self._batches, None)
+                if batch is None:
+                    return 0
+                features, labels = batch
+                input_data(data=features, label=labels, feature_names=feature_names)
+                return 1
+
+            def reset(self):
+                self._batches = None
+
+        # XGBoost pages the batches to the cache files and only keeps the working set in memory.
+        cache_prefix = os.path.join(tempfile.mkdtemp(), 'cache')
+        training_data = xgboost.DMatrix(BatchIterator(cache_prefix), nthread=num_threads)
+    else:
+        num_rows = parquet_file.metadata.num_rows
+        data = numpy.empty((num_rows, len(feature_names)), dtype=numpy.float32)
+        label = numpy.empty(num_rows, dtype=numpy.float32)
+        offset = 0
+        for features, labels in iterate_batches():
+            data[offset:offset + len(labels)] = features
+            label[offset:offset + len(labels)] = labels
+            offset += len(labels)
+        training_data = xgboost.DMatrix(
+            data=data,
+            label=label,
+            feature_names=feature_names,
+            nthread=num_threads,
+        )
+        del data, label
+
     # Training
     booster_params = booster_params or {}
     booster_params.setdefault('objective', objective)
@@ -57,6 +130,7 @@ def xgboost_train(
     booster_params.setdefault('learning_rate', learning_rate)
     booster_params.setdefault('min_split_loss', min_split_loss)
     booster_params.setdefault('max_depth', max_depth)
+    booster_params.setdefault('nthread', num_threads)
 
     starting_model = None
     if starting_model_path:
@@ -83,7 +157,7 @@ if __name__ == '__main__':
         output_component_file='component.yaml',
         base_image='python:3.7',
         packages_to_install=[
-            'xgboost==1.1.1',
+            'xgboost==1.6.2',
             'pandas==1.0.5',
             'pyarrow==0.17.1',
         ]
@@ -3,18 +3,58 @@ from kfp.components import InputPath, OutputPath, create_component_from_func
 def convert_tsv_to_apache_parquet(
     data_path: InputPath('TSV'),
     output_data_path: OutputPath('ApacheParquet'),
+    columns: list = None,
+    row_group_size: int = 100000,
+    compression: str = 'snappy',
 ):
     '''Converts TSV table to Apache Parquet.
 
     [Apache Parquet](https://parquet.apache.org/)
 
+    The table is converted in batches, so the memory usage does not depend on the table size.
+
+    Args:
+        columns: Optional. Names of the columns to convert. By default all columns are converted.
+        row_group_size: Number of rows in every Apache Parquet row group (except the last one).
+            Smaller row groups allow the readers to process the data in smaller batches.
+        compression: Compression codec for the Apache Parquet data. One of "none", "snappy", "gzip", "brotli", "lz4", "zstd".
+
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import pyarrow
     from pyarrow import csv, parquet
 
-    table = csv.read_csv(data_path, parse_options=csv.ParseOptions(delimiter='\t'))
-    parquet.write_table(table, output_data_path)
+    convert_options = csv.ConvertOptions(include_columns=columns) if columns else None
+
+    def write_row_groups(batches, schema):
+        writer = parquet.ParquetWriter(output_data_path, schema, compression=compression)
+        try:
+            pending_batches = []
+            pending_rows = 0
+            for batch in batches:
+                pending_batches.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= row_group_size:
+                    table = pyarrow.Table.from_batches(pending_batches, schema)
+                    full_rows = pending_rows - pending_rows % row_group_size
+                    writer.write_table(table.slice(0, full_rows), row_group_size=row_group_size)
+                    pending_batches = table.slice(full_rows).to_batches()
+                    pending_rows -= full_rows
+            if pending_rows:
+                writer.write_table(pyarrow.Table.from_batches(pending_batches, schema), row_group_size=row_group_size)
+        finally:
+            writer.close()
+
+    reader = csv.open_csv(data_path, parse_options=csv.ParseOptions(delimiter='\t'), convert_options=convert_options)
+    try:
+        write_row_groups(reader, reader.schema)
+    except pyarrow.ArrowInvalid as e:
+        # The streaming reader infers the column types from the first block of the data.
+        # Falling back to reading the whole table when the later blocks do not match those types.
+        print('Could not convert the table in batches: {}. Converting the whole table at once.'.format(e))
+        table = csv.read_csv(data_path, parse_options=csv.ParseOptions(delimiter='\t'), convert_options=convert_options)
+        write_row_groups(table.to_batches(), table.schema)
 
 
 if __name__ == '__main__':
@@ -22,5 +62,5 @@ if __name__ == '__main__':
         convert_tsv_to_apache_parquet,
         output_component_file='component.yaml',
         base_image='python:3.7',
-        packages_to_install=['pyarrow==0.17.1']
+        packages_to_install=['pyarrow==4.0.1']
     )
@@ -3,21 +3,45 @@ from kfp.components import InputPath, OutputPath, create_component_from_func
 def convert_apache_parquet_to_csv(
     data_path: InputPath('ApacheParquet'),
     output_data_path: OutputPath('CSV'),
+    columns: list = None,
+    batch_size: int = 100000,
 ):
     '''Converts Apache Parquet to CSV.
 
     [Apache Parquet](https://parquet.apache.org/)
 
+    The table is converted in batches, so the memory usage does not depend on the table size.
+
+    Args:
+        columns: Optional. Names of the columns to convert. By default all columns are converted.
+        batch_size: Maximum number of rows that are converted at a time.
+
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import pyarrow
     from pyarrow import parquet
 
-    data_frame = parquet.read_pandas(data_path).to_pandas()
-    data_frame.to_csv(
-        output_data_path,
-        index=False,
-    )
+    parquet_file = parquet.ParquetFile(data_path)
+    schema = parquet_file.schema_arrow
+    if not columns:
+        # The pandas index columns are not written, same as with DataFrame.to_csv(index=False)
+        index_columns = (schema.pandas_metadata or {}).get('index_columns', [])
+        columns = [name for name in schema.names if name not in index_columns]
+
+    with open(output_data_path, 'w') as output_file:
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            batch.to_pandas().to_csv(
+                output_file,
+                index=False,
+                header=output_file.tell() == 0,
+            )
+        if output_file.tell() == 0:
+            # Writing the header of an empty table
+            pyarrow.schema([schema.field(name) for name in columns]).empty_table().to_pandas().to_csv(
+                output_file,
+                index=False,
+            )
 
 
 if __name__ == '__main__':
@@ -25,5 +49,5 @@ if __name__ == '__main__':
         convert_apache_parquet_to_csv,
         output_component_file='component.yaml',
         base_image='python:3.7',
-        packages_to_install=['pyarrow==0.17.1', 'pandas==1.0.3']
+        packages_to_install=['pyarrow==4.0.1', 'pandas==1.0.3']
     )
@@ -0,0 +1,61 @@
+from kfp.components import InputPath, OutputPath, create_component_from_func
+
+def select_fold_rows(
+    table_path: InputPath('ApacheParquet'),
+    fold_assignments_path: InputPath('ApacheParquet'),
+    output_table_path: OutputPath('ApacheParquet'),
+    fold_number: int,
+    subsample: str = 'test',
+):
+    """Selects the training or testing subsample of a fold produced by "Split table into fold assignments".
+
+    Only the row groups that contain the selected rows are read.
+    When the folds were assigned by row groups, the row groups of the other folds are not read at all.
+    The row groups are processed one by one, so the memory use does not depend on the table size.
+
+    Inputs:
+        table: The data table that was split into folds
+        fold_assignments: The fold number of every row of the table
+        fold_number: The number of the fold (1..k)
+        subsample: "test" selects the rows of the fold. "train" selects the rows of all other folds.
+
+    Outputs:
+        output_table: The selected rows
+    """
+    import numpy
+    import pyarrow
+    from pyarrow import parquet
+
+    if subsample not in ('train', 'test'):
+        raise ValueError('Subsample must be "train" or "test". Got "{}".'.format(subsample))
+
+    row_folds = parquet.read_table(fold_assignments_path).column('fold').to_numpy()
+    if fold_number not in numpy.unique(row_folds):
+        raise ValueError('Fold {} does not exist.'.format(fold_number))
+    row_is_selected = (row_folds == fold_number) if subsample == 'test' else (row_folds != fold_number)
+
+    table_file = parquet.ParquetFile(table_path)
+    if table_file.metadata.num_rows != len(row_folds):
+        raise ValueError('The table has {} rows, but there are fold assignments for {} rows.'.format(
+            table_file.metadata.num_rows, len(row_folds)))
+    with parquet.ParquetWriter(output_table_path, table_file.schema.to_arrow_schema()) as writer:
+        row_group_start = 0
+        for row_group_index in range(table_file.num_row_groups):
+            row_group_size = table_file.metadata.row_group(row_group_index).num_rows
+            row_group_selection = row_is_selected[row_group_start:row_group_start + row_group_size]
+            row_group_start += row_group_size
+            if not row_group_selection.any():
+                continue
+            row_group = table_file.read_row_group(row_group_index)
+            if not row_group_selection.all():
+                row_group = row_group.take(pyarrow.array(numpy.flatnonzero(row_group_selection)))
+            writer.write_table(row_group)
+
+
+if __name__ == '__main__':
+    select_fold_rows_op = create_component_from_func(
+        select_fold_rows,
+        base_image='python:3.7',
+        packages_to_install=['pyarrow==0.17.1'],
+        output_component_file='component.yaml',
+    )
@@ -0,0 +1,57 @@
+from kfp.components import InputPath, OutputPath, create_component_from_func
+
+def select_fold_rows(
+    table_path: InputPath('CSV'),
+    fold_assignments_path: InputPath('ApacheParquet'),
+    output_table_path: OutputPath('CSV'),
+    fold_number: int,
+    subsample: str = 'test',
+):
+    """Selects the training or testing subsample of a fold produced by "Split table into fold assignments".
+
+    The table is processed in chunks, so the memory use does not depend on the table size.
+
+    Inputs:
+        table: The data table that was split into folds
+        fold_assignments: The fold number of every row of the table
+        fold_number: The number of the fold (1..k)
+        subsample: "test" selects the rows of the fold. "train" selects the rows of all other folds.
+
+    Outputs:
+        output_table: The selected rows
+    """
+    import numpy
+    import pandas
+    from pyarrow import parquet
+
+    if subsample not in ('train', 'test'):
+        raise ValueError('Subsample must be "train" or "test". Got "{}".'.format(subsample))
+
+    row_folds = parquet.read_table(fold_assignments_path).column('fold').to_numpy()
+    if fold_number not in numpy.unique(row_folds):
+        raise ValueError('Fold {} does not exist.'.format(fold_number))
+    row_is_selected = (row_folds == fold_number) if subsample == 'test' else (row_folds != fold_number)
+
+    chunk_start = 0
+    # Column types are not inferred, so that the values are written back unchanged.
+    for chunk_index, chunk in enumerate(pandas.read_csv(table_path, chunksize=100000, dtype=str, keep_default_na=False)):
+        chunk_selection = row_is_selected[chunk_start:chunk_start + len(chunk)]
+        chunk_start += len(chunk)
+        chunk[chunk_selection].to_csv(
+            output_table_path,
+            mode='w' if chunk_index == 0 else 'a',
+            header=chunk_index == 0,
+            index=False,
+        )
+    if chunk_start != len(row_folds):
+        raise ValueError('The table has {} rows, but there are fold assignments for {} rows.'.format(
+            chunk_start, len(row_folds)))
+
+
+if __name__ == '__main__':
+    select_fold_rows_op = create_component_from_func(
+        select_fold_rows,
+        base_image='python:3.7',
+        packages_to_install=['pyarrow==0.17.1', 'pandas==1.0.5'],
+        output_component_file='component.yaml',
+    )
@@ -0,0 +1,64 @@
+from kfp.components import InputPath, OutputPath, create_component_from_func
+
+def split_table_into_fold_assignments(
+    table_path: InputPath('ApacheParquet'),
+    fold_assignments_path: OutputPath('ApacheParquet'),
+    number_of_folds: int = 5,
+    random_seed: int = 0,
+    split_by_row_groups: bool = False,
+):
+    """Assigns the rows of the data table to the specified number of folds.
+
+    Unlike "Split table into folds", this component does not copy the data.
+    It only reads the table metadata and produces a compact table with the fold number (1..k) of every row.
+    The "Select fold rows" component reads the training or testing subsample of a fold using the assignments.
+
+    Each testing subsample has 1/k fraction of samples. The testing subsamples do not overlap.
+    The i-th training subsample consists of all rows not assigned to fold i.
+    With split_by_row_groups, the whole Parquet row groups are assigned to the folds (the rows should already be shuffled).
+    Then every subsample is read without reading the row groups of the other folds.
+
+    Inputs:
+        table: The data to split by rows
+        number_of_folds: Number of folds to split data into
+        random_seed: Random seed for reproducible splitting
+        split_by_row_groups: Whether to assign the whole row groups instead of the individual rows to the folds
+
+    Outputs:
+        fold_assignments: The table with a single "fold" column containing the fold number of every row of the data table
+    """
+    import numpy
+    import pyarrow
+    from pyarrow import parquet
+
+    if number_of_folds < 1 or number_of_folds > 65535:
+        raise ValueError('Number of folds must be between 1 and 65535.')
+
+    metadata = parquet.ParquetFile(table_path).metadata
+    if split_by_row_groups:
+        unit_sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    else:
+        unit_sizes = [1] * metadata.num_rows
+    if len(unit_sizes) < number_of_folds:
+        raise ValueError('Cannot split {} {} into {} folds.'.format(
+            len(unit_sizes), 'row groups' if split_by_row_groups else 'rows', number_of_folds))
+
+    # Same fold sizes as in sklearn.model_selection.KFold
+    unit_folds = numpy.empty(len(unit_sizes), dtype=numpy.uint16)
+    shuffled_units = numpy.random.RandomState(random_seed).permutation(len(unit_sizes))
+    for fold_index, fold_units in enumerate(numpy.array_split(shuffled_units, number_of_folds)):
+        unit_folds[fold_units] = fold_index + 1
+    row_folds = numpy.repeat(unit_folds, unit_sizes)
+
+    fold_type = pyarrow.uint8() if number_of_folds < 256 else pyarrow.uint16()
+    fold_assignments = pyarrow.Table.from_arrays([pyarrow.array(row_folds, type=fold_type)], names=['fold'])
+    parquet.write_table(fold_assignments, fold_assignments_path)
+
+
+if __name__ == '__main__':
+    split_table_into_fold_assignments_op = create_component_from_func(
+        split_table_into_fold_assignments,
+        base_image='python:3.7',
+        packages_to_install=['pyarrow==0.17.1'],
+        output_component_file='component.yaml',
+    )
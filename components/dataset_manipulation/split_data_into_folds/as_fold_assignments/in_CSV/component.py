@@ -0,0 +1,58 @@
+from kfp.components import InputPath, OutputPath, create_component_from_func
+
+def split_table_into_fold_assignments(
+    table_path: InputPath('CSV'),
+    fold_assignments_path: OutputPath('ApacheParquet'),
+    number_of_folds: int = 5,
+    random_seed: int = 0,
+):
+    """Assigns the rows of the data table to the specified number of folds.
+
+    Unlike "Split table into folds", this component does not copy the data.
+    It only counts the table rows and produces a compact table with the fold number (1..k) of every row.
+    The "Select fold rows" component reads the training or testing subsample of a fold using the assignments.
+
+    Each testing subsample has 1/k fraction of samples. The testing subsamples do not overlap.
+    The i-th training subsample consists of all rows not assigned to fold i.
+
+    Inputs:
+        table: The data to split by rows
+        number_of_folds: Number of folds to split data into
+        random_seed: Random seed for reproducible splitting
+
+    Outputs:
+        fold_assignments: The table with a single "fold" column containing the fold number of every row of the data table
+    """
+    import numpy
+    import pandas
+    import pyarrow
+    from pyarrow import parquet
+
+    if number_of_folds < 1 or number_of_folds > 65535:
+        raise ValueError('Number of folds must be between 1 and 65535.')
+
+    # Counting the rows without keeping the data in memory.
+    number_of_rows = 0
+    for chunk in pandas.read_csv(table_path, chunksize=100000, usecols=[0]):
+        number_of_rows += len(chunk)
+    if number_of_rows < number_of_folds:
+        raise ValueError('Cannot split {} rows into {} folds.'.format(number_of_rows, number_of_folds))
+
+    # Same fold sizes as in sklearn.model_selection.KFold
+    row_folds = numpy.empty(number_of_rows, dtype=numpy.uint16)
+    shuffled_rows = numpy.random.RandomState(random_seed).permutation(number_of_rows)
+    for fold_index, fold_rows in enumerate(numpy.array_split(shuffled_rows, number_of_folds)):
+        row_folds[fold_rows] = fold_index + 1
+
+    fold_type = pyarrow.uint8() if number_of_folds < 256 else pyarrow.uint16()
+    fold_assignments = pyarrow.Table.from_arrays([pyarrow.array(row_folds, type=fold_type)], names=['fold'])
+    parquet.write_table(fold_assignments, fold_assignments_path)
+
+
+if __name__ == '__main__':
+    split_table_into_fold_assignments_op = create_component_from_func(
+        split_table_into_fold_assignments,
+        base_image='python:3.7',
+        packages_to_install=['pyarrow==0.17.1', 'pandas==1.0.5'],
+        output_component_file='component.yaml',
+    )
@@ -13,4 +13,7 @@
 # limitations under the License.
 
 from ._download_blob import download_blob
+from ._download_dir import download_dir
+from ._upload_blob import upload_blob
+from ._upload_dir import upload_dir
 from ._common_ops import parse_blob_path, is_gcs_path
@@ -38,4 +38,30 @@ def parse_blob_path(path):
     if match:
         return match.group(1), match.group(2)
     raise ValueError('Path {} is invalid blob path.'.format(
+        path))
+
+def parse_dir_path(path):
+    """Parse a gcs directory path into bucket name and blob name prefix
+
+    Args:
+        path (str): the path to parse.
+
+    Returns:
+        (bucket name in the path, blob name prefix in the path)
+
+    Raises:
+        ValueError if the path is not a valid gcs directory path.
+
+    Example:
+
+        `bucket_name, prefix = parse_dir_path('gs://foo/bar')`
+        `bucket_name` is `foo` and `prefix` is `bar/`
+    """
+    match = re.match('gs://([^/]+)/?(.*)$', path)
+    if match:
+        prefix = match.group(2)
+        if prefix and not prefix.endswith('/'):
+            prefix += '/'
+        return match.group(1), prefix
+    raise ValueError('Path {} is invalid directory path.'.format(
         path))
\ No newline at end of file
@@ -12,31 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import logging
-import os
-
-from google.cloud import storage
 from ._common_ops import parse_blob_path
+from ._transfer import (BlobDownload, DEFAULT_MAX_WORKERS, DEFAULT_SLICE_SIZE,
+    get_client, run_transfers)
 
-def download_blob(source_blob_path, destination_file_path):
+def download_blob(source_blob_path, destination_file_path,
+    slice_size=DEFAULT_SLICE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
     """Downloads a blob from the bucket.
-    
+
+    The blobs bigger than the slice size are downloaded in slices
+    concurrently. An interrupted download is resumed when it is repeated.
+
     Args:
         source_blob_path (str): the source blob path to download from.
         destination_file_path (str): the local file path to download to.
+        slice_size (int): the size of the concurrently downloaded slices.
+        max_workers (int): the maximum number of the concurrent requests.
     """
     bucket_name, blob_name = parse_blob_path(source_blob_path)
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-
-    dirname = os.path.dirname(destination_file_path)
-    if not os.path.exists(dirname):
-        os.makedirs(dirname)
-
-    with open(destination_file_path, 'wb+') as f:
-        blob.download_to_file(f)
+    blob = get_client().bucket(bucket_name).blob(blob_name)
+    blob.reload(client=get_client())
 
-    logging.info('Blob {} downloaded to {}.'.format(
-        source_blob_path,
-        destination_file_path))
\ No newline at end of file
+    run_transfers(
+        [BlobDownload(blob, destination_file_path, slice_size)],
+        max_workers)
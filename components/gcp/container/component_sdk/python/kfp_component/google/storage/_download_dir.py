@@ -0,0 +1,49 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+
+from ._common_ops import parse_dir_path
+from ._transfer import (BlobDownload, DEFAULT_MAX_WORKERS, DEFAULT_SLICE_SIZE,
+    get_client, list_blobs, run_transfers)
+
+def download_dir(source_dir_path, destination_dir_path,
+    slice_size=DEFAULT_SLICE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+    """Downloads all blobs under a GCS directory to a local directory.
+
+    The blobs are listed and downloaded concurrently. An interrupted download
+    is resumed when it is repeated.
+
+    Args:
+        source_dir_path (str): the source GCS directory (e.g. gs://bucket/dir).
+        destination_dir_path (str): the local directory to download to.
+        slice_size (int): the size of the concurrently downloaded slices.
+        max_workers (int): the maximum number of the concurrent requests.
+    """
+    bucket_name, prefix = parse_dir_path(source_dir_path)
+    bucket = get_client().bucket(bucket_name)
+    blobs = list_blobs(bucket, prefix, max_workers)
+    transfers = [
+        BlobDownload(
+            blob,
+            os.path.join(destination_dir_path, *blob.name[len(prefix):].split('/')),
+            slice_size)
+        # The "directory placeholder" blobs are skipped.
+        for blob in blobs if not blob.name.endswith('/')
+    ]
+    os.makedirs(destination_dir_path, exist_ok=True)
+    run_transfers(transfers, max_workers)
+    logging.info('Downloaded {} blobs from {} to {}.'.format(
+        len(transfers), source_dir_path, destination_dir_path))
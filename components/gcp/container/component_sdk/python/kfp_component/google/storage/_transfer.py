@@ -0,0 +1,369 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""The transfer engine shared by the storage operations.
+
+The blobs and files bigger than the slice size are transferred in slices
+concurrently. The downloads write the slices to a partial file next to the
+destination and record the finished slices in a state file, so a repeated
+download of the same blob generation only fetches the missing slices. The
+uploads upload the slices as temporary blobs (skipping the ones that were
+already uploaded with the same MD5) and compose them into the destination
+blob. The transferred data is verified using the MD5 or CRC32C checksums.
+"""
+
+import base64
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from google.cloud import storage
+
+DEFAULT_SLICE_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 8
+
+# The storage API composes at most 32 blobs at a time.
+_MAX_COMPOSE_SOURCES = 32
+_CONNECTION_POOL_SIZE = 32
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Gets the storage client shared by the transfers of the process.
+
+    The client is created once, so the transfers reuse its credentials and
+    its HTTP connection pool instead of creating a new client for every blob.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = storage.Client()
+            # The default requests connection pool only keeps 10 connections.
+            import requests
+            client._http.mount('https://', requests.adapters.HTTPAdapter(
+                pool_connections=_CONNECTION_POOL_SIZE,
+                pool_maxsize=_CONNECTION_POOL_SIZE))
+            _client = client
+        return _client
+
+
+def run_transfers(transfers, max_workers=DEFAULT_MAX_WORKERS):
+    """Runs the slices of the transfers concurrently.
+
+    Args:
+        transfers (list): the BlobDownload and FileUpload transfers.
+        max_workers (int): the maximum number of the concurrent requests.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        remaining_parts = {}
+
+        def finish(transfer):
+            futures[executor.submit(transfer.finish)] = (transfer, None)
+
+        for transfer in transfers:
+            parts = transfer.start()
+            remaining_parts[transfer] = len(parts)
+            for part in parts:
+                futures[executor.submit(transfer.transfer_part, part)] = (transfer, part)
+            if not parts:
+                finish(transfer)
+
+        try:
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                errors = []
+                for future in done:
+                    transfer, part = futures.pop(future)
+                    if future.exception() is not None:
+                        errors.append(future.exception())
+                        continue
+                    if part is None:
+                        continue
+                    transfer.part_done(part, future.result())
+                    remaining_parts[transfer] -= 1
+                    if not remaining_parts[transfer]:
+                        finish(transfer)
+                if errors:
+                    raise errors[0]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            # Recording the parts that were finished anyway, so that they are
+            # not transferred again when the transfers are resumed.
+            concurrent.futures.wait(futures)
+            for future, (transfer, part) in futures.items():
+                if part is not None and not future.cancelled() and future.exception() is None:
+                    transfer.part_done(part, future.result())
+            raise
+
+
+class BlobDownload(object):
+    """Downloads a blob to a local file.
+
+    Args:
+        blob (Blob): the blob to download. Must have the metadata loaded.
+        destination_file_path (str): the local file path to download to.
+        slice_size (int): the size of the concurrently downloaded slices.
+    """
+    def __init__(self, blob, destination_file_path,
+        slice_size=DEFAULT_SLICE_SIZE):
+        self._blob = blob
+        self._destination_file_path = destination_file_path
+        self._partial_file_path = destination_file_path + '.partial'
+        self._state_file_path = destination_file_path + '.partial.json'
+        self._slice_size = slice_size
+        self._completed_slices = set()
+
+    def _get_state_key(self):
+        return {
+            'blob': '{}/{}'.format(self._blob.bucket.name, self._blob.name),
+            'generation': self._blob.generation,
+            'size': self._blob.size,
+            'slice_size': self._slice_size,
+        }
+
+    def start(self):
+        dirname = os.path.dirname(self._destination_file_path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        state = None
+        if os.path.exists(self._partial_file_path) and os.path.exists(self._state_file_path):
+            with open(self._state_file_path) as f:
+                state = json.load(f)
+        if state and state['key'] == self._get_state_key():
+            self._completed_slices = set(state['completed_slices'])
+            logging.info('Resuming the download of {}. {} slices are already downloaded.'.format(
+                self._blob.name, len(self._completed_slices)))
+        else:
+            with open(self._partial_file_path, 'wb') as f:
+                f.truncate(self._blob.size)
+            self._save_state()
+
+        return [
+            index for index in range(_get_number_of_slices(self._blob.size, self._slice_size))
+            if index not in self._completed_slices
+        ]
+
+    def transfer_part(self, index):
+        start = index * self._slice_size
+        end = min(start + self._slice_size, self._blob.size) - 1
+        with open(self._partial_file_path, 'r+b') as f:
+            f.seek(start)
+            self._blob.download_to_file(f, client=get_client(), start=start, end=end)
+
+    def part_done(self, index, result):
+        self._completed_slices.add(index)
+        self._save_state()
+
+    def _save_state(self):
+        with open(self._state_file_path, 'w') as f:
+            json.dump({
+                'key': self._get_state_key(),
+                'completed_slices': sorted(self._completed_slices),
+            }, f)
+
+    def finish(self):
+        try:
+            verify_checksums(self._blob, self._partial_file_path)
+        except ValueError:
+            # The partial data cannot be trusted anymore.
+            os.remove(self._partial_file_path)
+            os.remove(self._state_file_path)
+            raise
+        os.replace(self._partial_file_path, self._destination_file_path)
+        os.remove(self._state_file_path)
+        logging.info('Blob {} downloaded to {}.'.format(
+            self._blob.name, self._destination_file_path))
+
+
+class FileUpload(object):
+    """Uploads a local file to a blob.
+
+    Args:
+        source_file_path (str): the local file path to upload.
+        bucket (Bucket): the destination bucket.
+        blob_name (str): the destination blob name.
+        slice_size (int): the size of the concurrently uploaded slices.
+    """
+    def __init__(self, source_file_path, bucket, blob_name,
+        slice_size=DEFAULT_SLICE_SIZE):
+        self._source_file_path = source_file_path
+        self._bucket = bucket
+        self._blob_name = blob_name
+        self._slice_size = slice_size
+        self._slice_blobs = {}
+
+    def start(self):
+        self._size = os.path.getsize(self._source_file_path)
+        return list(range(_get_number_of_slices(self._size, self._slice_size) or 1))
+
+    def _get_slice_blob_name(self, index):
+        return '{}.kfp-upload/{:05d}'.format(self._blob_name, index)
+
+    def transfer_part(self, index):
+        if self._size <= self._slice_size:
+            blob = self._bucket.blob(self._blob_name)
+            blob.upload_from_filename(self._source_file_path, client=get_client())
+            return blob
+
+        start = index * self._slice_size
+        size = min(self._slice_size, self._size - start)
+        md5, _ = compute_file_checksums(self._source_file_path, start, size)
+        blob_name = self._get_slice_blob_name(index)
+        blob = self._bucket.get_blob(blob_name, client=get_client())
+        if blob is not None and blob.size == size and blob.md5_hash == md5:
+            logging.info('Slice {} of {} is already uploaded.'.format(
+                index, self._source_file_path))
+            return blob
+
+        blob = self._bucket.blob(blob_name)
+        with open(self._source_file_path, 'rb') as f:
+            f.seek(start)
+            blob.upload_from_file(f, size=size, client=get_client())
+        if blob.md5_hash and blob.md5_hash != md5:
+            raise ValueError('The MD5 of the uploaded slice {} does not match: {} != {}.'.format(
+                blob_name, blob.md5_hash, md5))
+        return blob
+
+    def part_done(self, index, blob):
+        self._slice_blobs[index] = blob
+
+    def finish(self):
+        if len(self._slice_blobs) == 1 and self._size <= self._slice_size:
+            verify_checksums(self._slice_blobs[0], self._source_file_path)
+            logging.info('File {} uploaded to {}.'.format(
+                self._source_file_path, self._blob_name))
+            return
+
+        sources = [self._slice_blobs[index] for index in sorted(self._slice_blobs)]
+        temporary_blobs = list(sources)
+        level = 0
+        while len(sources) > _MAX_COMPOSE_SOURCES:
+            composed_blobs = []
+            for group_start in range(0, len(sources), _MAX_COMPOSE_SOURCES):
+                composed_blob = self._bucket.blob('{}.kfp-upload/composed-{}-{:05d}'.format(
+                    self._blob_name, level, group_start // _MAX_COMPOSE_SOURCES))
+                composed_blob.compose(
+                    sources[group_start:group_start + _MAX_COMPOSE_SOURCES],
+                    client=get_client())
+                composed_blobs.append(composed_blob)
+            temporary_blobs.extend(composed_blobs)
+            sources = composed_blobs
+            level += 1
+
+        blob = self._bucket.blob(self._blob_name)
+        blob.compose(sources, client=get_client())
+        verify_checksums(blob, self._source_file_path)
+        self._bucket.delete_blobs(temporary_blobs, on_error=lambda blob: None,
+            client=get_client())
+        logging.info('File {} uploaded to {} in {} slices.'.format(
+            self._source_file_path, self._blob_name, len(self._slice_blobs)))
+
+
+def list_blobs(bucket, prefix, max_workers=DEFAULT_MAX_WORKERS):
+    """Lists the blobs with the prefix.
+
+    The top level "subdirectories" of the prefix are listed concurrently.
+
+    Args:
+        bucket (Bucket): the bucket to list.
+        prefix (str): the blob name prefix.
+        max_workers (int): the maximum number of the concurrent requests.
+
+    Returns:
+        The list of the blobs.
+    """
+    iterator = bucket.list_blobs(prefix=prefix, delimiter='/', client=get_client())
+    blobs = list(iterator)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for prefix_blobs in executor.map(
+            lambda sub_prefix: list(bucket.list_blobs(prefix=sub_prefix, client=get_client())),
+            sorted(iterator.prefixes)):
+            blobs.extend(prefix_blobs)
+    return blobs
+
+
+def compute_file_checksums(file_path, start=0, size=None):
+    """Computes the checksums of the file (region) in the storage API format.
+
+    Returns:
+        (base64 encoded MD5, base64 encoded CRC32C) of the data. The CRC32C is
+        None when neither google-crc32c nor crcmod are installed.
+    """
+    md5 = hashlib.md5()
+    crc32c = _create_crc32c()
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = size
+        while remaining is None or remaining > 0:
+            read_size = _HASH_BUFFER_SIZE if remaining is None else min(_HASH_BUFFER_SIZE, remaining)
+            data = f.read(read_size)
+            if not data:
+                break
+            md5.update(data)
+            if crc32c:
+                crc32c.update(data)
+            if remaining is not None:
+                remaining -= len(data)
+    return (
+        base64.b64encode(md5.digest()).decode('ascii'),
+        base64.b64encode(crc32c.digest()).decode('ascii') if crc32c else None,
+    )
+
+
+def verify_checksums(blob, file_path):
+    """Verifies that the file data matches the blob checksums.
+
+    The composite blobs only have the CRC32C checksum.
+
+    Raises:
+        ValueError if the checksums do not match.
+    """
+    md5, crc32c = compute_file_checksums(file_path)
+    if blob.md5_hash:
+        if blob.md5_hash != md5:
+            raise ValueError('The MD5 of {} does not match the blob {}: {} != {}.'.format(
+                file_path, blob.name, md5, blob.md5_hash))
+    elif blob.crc32c and crc32c:
+        if blob.crc32c != crc32c:
+            raise ValueError('The CRC32C of {} does not match the blob {}: {} != {}.'.format(
+                file_path, blob.name, crc32c, blob.crc32c))
+    else:
+        logging.warning('Cannot verify the data of the blob {}. Install google-crc32c '
+            'or crcmod to verify the composite blobs.'.format(blob.name))
+
+
+def _create_crc32c():
+    try:
+        import google_crc32c
+        return google_crc32c.Checksum()
+    except ImportError:
+        pass
+    try:
+        import crcmod.predefined
+        return crcmod.predefined.Crc('crc-32c')
+    except ImportError:
+        return None
+
+
+def _get_number_of_slices(size, slice_size):
+    return (size + slice_size - 1) // slice_size
@@ -0,0 +1,37 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ._common_ops import parse_blob_path
+from ._transfer import (FileUpload, DEFAULT_MAX_WORKERS, DEFAULT_SLICE_SIZE,
+    get_client, run_transfers)
+
+def upload_blob(source_file_path, destination_blob_path,
+    slice_size=DEFAULT_SLICE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+    """Uploads a local file to a blob.
+
+    The files bigger than the slice size are uploaded in slices concurrently
+    and composed into the destination blob. An interrupted upload is resumed
+    when it is repeated.
+
+    Args:
+        source_file_path (str): the local file path to upload.
+        destination_blob_path (str): the destination blob path.
+        slice_size (int): the size of the concurrently uploaded slices.
+        max_workers (int): the maximum number of the concurrent requests.
+    """
+    bucket_name, blob_name = parse_blob_path(destination_blob_path)
+    bucket = get_client().bucket(bucket_name)
+    run_transfers(
+        [FileUpload(source_file_path, bucket, blob_name, slice_size)],
+        max_workers)
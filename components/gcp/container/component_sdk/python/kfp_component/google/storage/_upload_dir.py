@@ -0,0 +1,47 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+
+from ._common_ops import parse_dir_path
+from ._transfer import (FileUpload, DEFAULT_MAX_WORKERS, DEFAULT_SLICE_SIZE,
+    get_client, run_transfers)
+
+def upload_dir(source_dir_path, destination_dir_path,
+    slice_size=DEFAULT_SLICE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+    """Uploads all files in a local directory to a GCS directory.
+
+    The files are uploaded concurrently. An interrupted upload is resumed when
+    it is repeated.
+
+    Args:
+        source_dir_path (str): the local directory to upload.
+        destination_dir_path (str): the destination GCS directory
+            (e.g. gs://bucket/dir).
+        slice_size (int): the size of the concurrently uploaded slices.
+        max_workers (int): the maximum number of the concurrent requests.
+    """
+    bucket_name, prefix = parse_dir_path(destination_dir_path)
+    bucket = get_client().bucket(bucket_name)
+    transfers = []
+    for dir_path, _, file_names in os.walk(source_dir_path):
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(file_path, source_dir_path)
+            blob_name = prefix + '/'.join(relative_path.split(os.sep))
+            transfers.append(FileUpload(file_path, bucket, blob_name, slice_size))
+    run_transfers(transfers, max_workers)
+    logging.info('Uploaded {} files from {} to {}.'.format(
+        len(transfers), source_dir_path, destination_dir_path))
@@ -14,25 +14,25 @@
 
 import mock
 import unittest
-import os
 
 from kfp_component.google.storage import download_blob
+from kfp_component.google.storage._transfer import BlobDownload
 
 DOWNLOAD_BLOB_MODULE = 'kfp_component.google.storage._download_blob'
 
-@mock.patch(DOWNLOAD_BLOB_MODULE + '.os')
-@mock.patch(DOWNLOAD_BLOB_MODULE + '.open')
-@mock.patch(DOWNLOAD_BLOB_MODULE + '.storage.Client')
+@mock.patch(DOWNLOAD_BLOB_MODULE + '.run_transfers')
+@mock.patch(DOWNLOAD_BLOB_MODULE + '.get_client')
 class DownloadBlobTest(unittest.TestCase):
 
-    def test_download_blob_succeed(self, mock_storage_client,
-        mock_open, mock_os):
-        mock_os.path.dirname.return_value = '/foo'
-        mock_os.path.exists.return_value = False
-
+    def test_download_blob_succeed(self, mock_get_client,
+        mock_run_transfers):
         download_blob('gs://foo/bar.py', 
             '/foo/bar.py')
 
-        mock_blob = mock_storage_client().bucket().blob()
-        mock_blob.download_to_file.assert_called_once()
-        mock_os.makedirs.assert_called_once()
\ No newline at end of file
+        mock_get_client().bucket.assert_called_with('foo')
+        mock_blob = mock_get_client().bucket().blob()
+        mock_blob.reload.assert_called_once()
+        mock_run_transfers.assert_called_once()
+        transfers = mock_run_transfers.call_args[0][0]
+        self.assertEqual(1, len(transfers))
+        self.assertIsInstance(transfers[0], BlobDownload)
@@ -0,0 +1,259 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import io
+import mock
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from google.api_core import exceptions
+from kfp_component.google.storage import (download_blob, download_dir,
+    upload_blob, upload_dir)
+
+TRANSFER_MODULE = 'kfp_component.google.storage._transfer'
+
+class FakeBlob(object):
+    """An in-memory blob that implements the used Blob methods."""
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.size = None
+        self.generation = None
+        self.md5_hash = None
+        self.crc32c = None
+
+    def _load(self):
+        data = self.bucket.objects[self.name]
+        self.size = len(data)
+        self.generation = self.bucket.generations[self.name]
+        self.md5_hash = None if self.name in self.bucket.composites else (
+            base64.b64encode(hashlib.md5(data).digest()).decode('ascii'))
+        return self
+
+    def reload(self, client=None):
+        if self.name not in self.bucket.objects:
+            raise exceptions.NotFound(self.name)
+        self._load()
+
+    def download_to_file(self, file_obj, client=None, start=None, end=None):
+        self.bucket.on_request('download', self.name, start)
+        file_obj.write(self.bucket.objects[self.name][start:end + 1])
+
+    def _store(self, data, composite=False):
+        self.bucket.on_request('upload', self.name, len(data))
+        with self.bucket.lock:
+            self.bucket.objects[self.name] = data
+            self.bucket.generations[self.name] = len(self.bucket.generations) + 1
+            if composite:
+                self.bucket.composites.add(self.name)
+            else:
+                self.bucket.composites.discard(self.name)
+        self._load()
+
+    def upload_from_file(self, file_obj, size=None, client=None):
+        self._store(file_obj.read(size))
+
+    def upload_from_filename(self, filename, client=None):
+        with open(filename, 'rb') as f:
+            self._store(f.read())
+
+    def compose(self, sources, client=None):
+        self._store(b''.join(self.bucket.objects[source.name] for source in sources),
+            composite=True)
+
+
+class FakeBucket(object):
+    def __init__(self, name):
+        self.name = name
+        self.objects = {}
+        self.generations = {}
+        self.composites = set()
+        self.requests = []
+        self.lock = threading.Lock()
+        self.fail_request = None
+
+    def on_request(self, *request):
+        with self.lock:
+            self.requests.append(request)
+        if self.fail_request == request:
+            self.fail_request = None
+            raise exceptions.ServiceUnavailable('Injected failure')
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name, client=None):
+        if name not in self.objects:
+            return None
+        return FakeBlob(self, name)._load()
+
+    def list_blobs(self, prefix='', delimiter=None, client=None):
+        self.on_request('list', prefix)
+        blobs = FakeBlobIterator()
+        for name in sorted(self.objects):
+            if not name.startswith(prefix):
+                continue
+            if delimiter and delimiter in name[len(prefix):]:
+                blobs.prefixes.add(name[:name.index(delimiter, len(prefix)) + 1])
+            else:
+                blobs.append(FakeBlob(self, name)._load())
+        return blobs
+
+    def delete_blobs(self, blobs, on_error=None, client=None):
+        for blob in blobs:
+            del self.objects[blob.name]
+
+
+class FakeBlobIterator(list):
+    def __init__(self):
+        self.prefixes = set()
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.buckets = {}
+
+    def bucket(self, name):
+        return self.buckets.setdefault(name, FakeBucket(name))
+
+
+class TransferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.bucket = self.client.bucket('foo')
+        patcher = mock.patch(TRANSFER_MODULE + '._client', self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def _get_downloads(self):
+        return sorted(request[2] for request in self.bucket.requests if request[0] == 'download')
+
+    def test_download_blob_in_slices(self):
+        data = os.urandom(95)
+        self.bucket.blob('dir/data').upload_from_file(io.BytesIO(data))
+        destination = os.path.join(self.temp_dir, 'sub', 'data')
+
+        download_blob('gs://foo/dir/data', destination, slice_size=10, max_workers=4)
+
+        with open(destination, 'rb') as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual(list(range(0, 95, 10)), self._get_downloads())
+        self.assertEqual(['data'], os.listdir(os.path.dirname(destination)))
+
+    def test_download_blob_not_found(self):
+        with self.assertRaises(exceptions.NotFound):
+            download_blob('gs://foo/missing', os.path.join(self.temp_dir, 'data'))
+
+    def test_download_blob_resumes_missing_slices(self):
+        data = os.urandom(95)
+        self.bucket.blob('data').upload_from_file(io.BytesIO(data))
+        destination = os.path.join(self.temp_dir, 'data')
+        self.bucket.fail_request = ('download', 'data', 50)
+
+        with self.assertRaises(exceptions.ServiceUnavailable):
+            download_blob('gs://foo/data', destination, slice_size=10, max_workers=1)
+        self.assertFalse(os.path.exists(destination))
+        downloaded_slices = set(self._get_downloads()) - {50}
+        self.bucket.requests = []
+
+        download_blob('gs://foo/data', destination, slice_size=10, max_workers=1)
+
+        with open(destination, 'rb') as f:
+            self.assertEqual(data, f.read())
+        # Only the slices that were not downloaded yet are downloaded.
+        self.assertEqual(
+            [index for index in range(0, 95, 10) if index not in downloaded_slices],
+            self._get_downloads())
+
+    def test_download_blob_restarts_changed_blob(self):
+        self.bucket.blob('data').upload_from_file(io.BytesIO(os.urandom(95)))
+        destination = os.path.join(self.temp_dir, 'data')
+        self.bucket.fail_request = ('download', 'data', 50)
+        with self.assertRaises(exceptions.ServiceUnavailable):
+            download_blob('gs://foo/data', destination, slice_size=10, max_workers=1)
+        data = os.urandom(95)
+        self.bucket.blob('data').upload_from_file(io.BytesIO(data))
+        self.bucket.requests = []
+
+        download_blob('gs://foo/data', destination, slice_size=10, max_workers=1)
+
+        with open(destination, 'rb') as f:
+            self.assertEqual(data, f.read())
+        self.assertEqual(list(range(0, 95, 10)), self._get_downloads())
+
+    def test_download_blob_checksum_mismatch(self):
+        self.bucket.blob('data').upload_from_file(io.BytesIO(b'data'))
+        destination = os.path.join(self.temp_dir, 'data')
+
+        with mock.patch.object(FakeBlob, 'download_to_file',
+            lambda blob, f, client, start, end: f.write(b'date')):
+            with self.assertRaises(ValueError):
+                download_blob('gs://foo/data', destination)
+        self.assertEqual([], os.listdir(self.temp_dir))
+
+    def test_upload_blob_in_slices(self):
+        data = os.urandom(95)
+        source = os.path.join(self.temp_dir, 'data')
+        with open(source, 'wb') as f:
+            f.write(data)
+        self.bucket.fail_request = ('upload', 'dir/data.kfp-upload/00005', 10)
+
+        with self.assertRaises(exceptions.ServiceUnavailable):
+            upload_blob(source, 'gs://foo/dir/data', slice_size=10, max_workers=1)
+        self.assertNotIn('dir/data', self.bucket.objects)
+        self.bucket.requests = []
+        # Composing more than 32 slices requires multiple compose levels.
+        with mock.patch(TRANSFER_MODULE + '._MAX_COMPOSE_SOURCES', 4):
+            upload_blob(source, 'gs://foo/dir/data', slice_size=10, max_workers=4)
+
+        self.assertEqual(data, self.bucket.objects['dir/data'])
+        self.assertEqual(['dir/data'], list(self.bucket.objects))
+        uploaded_slices = sorted(request[1] for request in self.bucket.requests
+            if request[0] == 'upload' and request[1].split('/')[-1].isdigit())
+        # The slices that were already uploaded are reused.
+        self.assertIn('dir/data.kfp-upload/00005', uploaded_slices)
+        self.assertNotIn('dir/data.kfp-upload/00004', uploaded_slices)
+
+    def test_upload_and_download_dir(self):
+        source_dir = os.path.join(self.temp_dir, 'source')
+        files = {
+            'a': os.urandom(5),
+            os.path.join('b', 'c'): os.urandom(25),
+            os.path.join('b', 'd', 'e'): b'',
+        }
+        for path, data in files.items():
+            os.makedirs(os.path.dirname(os.path.join(source_dir, path)), exist_ok=True)
+            with open(os.path.join(source_dir, path), 'wb') as f:
+                f.write(data)
+
+        upload_dir(source_dir, 'gs://foo/dir', slice_size=10)
+        self.assertEqual(['dir/a', 'dir/b/c', 'dir/b/d/e'], sorted(self.bucket.objects))
+
+        destination_dir = os.path.join(self.temp_dir, 'destination')
+        download_dir('gs://foo/dir/', destination_dir, slice_size=10)
+
+        for path, data in files.items():
+            with open(os.path.join(destination_dir, path), 'rb') as f:
+                self.assertEqual(data, f.read())
+        # The subdirectories are listed separately.
+        self.assertIn(('list', 'dir/b/'), self.bucket.requests)
+
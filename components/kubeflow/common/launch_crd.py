@@ -18,7 +18,18 @@ import multiprocessing
 import time
 
 from kubernetes import client as k8s_client
+from kubernetes import watch
 from kubernetes.client import rest
+import urllib3
+
+# The watch is re-established (from the last seen resource version) at least this often.
+_MAX_WATCH_SECONDS = 300
+_WATCH_REQUEST_TIMEOUT_GRACE_SECONDS = 30
+
+
+class _WatchError(Exception):
+  pass
+
 
 class K8sCR(object):
   def __init__(self, group, plural, version, client):
@@ -33,7 +44,9 @@ class K8sCR(object):
                          expected_conditions=[],
                          timeout=datetime.timedelta(days=365),
                          polling_interval=datetime.timedelta(seconds=30),
-                         status_callback=None):
+                         status_callback=None,
+                         use_watch=True,
+                         tolerate_errors=False):
     """Waits until any of the specified conditions occur.
     Args:
       namespace: namespace for the CR.
@@ -41,41 +54,134 @@ class K8sCR(object):
       expected_conditions: A list of conditions. Function waits until any of the
         supplied conditions is reached.
       timeout: How long to wait for the CR.
-      polling_interval: How often to poll for the status of the CR.
+      polling_interval: How often to poll for the status of the CR. When
+        use_watch is set, only used after falling back to polling.
       status_callback: (Optional): Callable. If supplied this callable is
         invoked after we poll the CR. Callable takes a single argument which
         is the CR.
+      use_watch: Whether to watch the CR for changes instead of polling. Falls
+        back to polling if the watch fails.
+      tolerate_errors: Whether to log the errors of getting the CR and retry
+        after the polling interval until the timeout instead of raising them.
     """
     end_time = datetime.datetime.now() + timeout
-    while True:
+    if use_watch:
       try:
-        results = self.client.get_namespaced_custom_object(
-          self.group, self.version, namespace, self.plural, name)
-      except Exception as e:
-        logging.error("There was a problem waiting for %s/%s %s in namespace %s; Exception: %s",
-                       self.group, self.plural, name, namespace, e)
-        raise
+        return self._wait_for_condition_using_watch(
+          namespace, name, expected_conditions, end_time, polling_interval, status_callback, tolerate_errors)
+      except _WatchError as e:
+        logging.warning("Failed to watch %s/%s %s in namespace %s, falling back to polling; Exception: %s",
+                        self.group, self.plural, name, namespace, e)
+
+    while True:
+      results = self._get(namespace, name, tolerate_errors)
 
       if results:
-        if status_callback:
-          status_callback(results)
-        expected, condition = self.is_expected_conditions(results, expected_conditions)
-        if expected:
-          logging.info("%s/%s %s in namespace %s has reached the expected condition: %s.",
-                       self.group, self.plural, name, namespace, condition)
+        if self._check_conditions(results, namespace, name, expected_conditions, status_callback):
           return results
-        else:
-          if condition:
-            logging.info("Current condition of %s/%s %s in namespace %s is %s.",
-                  self.group, self.plural, name, namespace, condition)
 
       if datetime.datetime.now() + polling_interval > end_time:
-        raise Exception(
-          "Timeout waiting for {0}/{1} {2} in namespace {3} to enter one of the "
-          "conditions {4}.".format(self.group, self.plural, name, namespace, expected_conditions))
+        self._raise_timeout(namespace, name, expected_conditions)
 
       time.sleep(polling_interval.seconds)
 
+  def _wait_for_condition_using_watch(self, namespace, name, expected_conditions, end_time, polling_interval,
+                                      status_callback, tolerate_errors):
+    resource_version = None
+    needs_listing = True
+    while True:
+      if needs_listing:
+        # (Re-)listing to get the current state and the version to watch from.
+        results = self._get(namespace, name, tolerate_errors)
+        if results is None:
+          # The error is tolerated. Listing again after the polling interval.
+          if datetime.datetime.now() + polling_interval > end_time:
+            self._raise_timeout(namespace, name, expected_conditions)
+          time.sleep(polling_interval.seconds)
+          continue
+        if results:
+          if self._check_conditions(results, namespace, name, expected_conditions, status_callback):
+            return results
+          resource_version = results.get("metadata", {}).get("resourceVersion")
+        needs_listing = False
+
+      remaining_seconds = int((end_time - datetime.datetime.now()).total_seconds())
+      if remaining_seconds <= 0:
+        self._raise_timeout(namespace, name, expected_conditions)
+
+      # The server closes the watch after timeout_seconds. The watch is then resumed from the last seen version.
+      for event in self._watch_events(namespace, name, resource_version, min(remaining_seconds, _MAX_WATCH_SECONDS)):
+        event_type = event.get("type")
+        event_object = event.get("raw_object") or event.get("object")
+        if event_type == "ERROR":
+          if isinstance(event_object, dict) and event_object.get("code") == 410:
+            # The version is too old. The CR needs to be listed again.
+            needs_listing = True
+            break
+          raise _WatchError("Watch error event: {}".format(event_object))
+        if event_type == "DELETED":
+          raise Exception("{0}/{1} {2} in namespace {3} was deleted while waiting for the "
+            "conditions {4}.".format(self.group, self.plural, name, namespace, expected_conditions))
+        if not isinstance(event_object, dict):
+          continue
+        resource_version = event_object.get("metadata", {}).get("resourceVersion", resource_version)
+        if self._check_conditions(event_object, namespace, name, expected_conditions, status_callback):
+          return event_object
+
+  def _watch_events(self, namespace, name, resource_version, timeout_seconds):
+    """Yields the watch events of the CR. Raises _WatchError if the watch fails."""
+    stream = watch.Watch().stream(
+      self.client.list_namespaced_custom_object,
+      self.group, self.version, namespace, self.plural,
+      field_selector="metadata.name=" + name,
+      resource_version=resource_version,
+      timeout_seconds=timeout_seconds,
+      # Protects against the connections silently dropped by the proxies.
+      _request_timeout=timeout_seconds + _WATCH_REQUEST_TIMEOUT_GRACE_SECONDS)
+    while True:
+      try:
+        event = next(stream)
+      except (StopIteration, urllib3.exceptions.ReadTimeoutError):
+        return
+      except rest.ApiException as e:
+        if e.status == 410:
+          yield {"type": "ERROR", "raw_object": {"code": 410}}
+          return
+        raise _WatchError(e) from e
+      except Exception as e:
+        raise _WatchError(e) from e
+      yield event
+
+  def _get(self, namespace, name, tolerate_errors=False):
+    """Gets the CR. Returns None if the error is tolerated."""
+    try:
+      return self.client.get_namespaced_custom_object(
+        self.group, self.version, namespace, self.plural, name)
+    except Exception as e:
+      logging.error("There was a problem waiting for %s/%s %s in namespace %s; Exception: %s",
+                     self.group, self.plural, name, namespace, e)
+      if tolerate_errors:
+        return None
+      raise
+
+  def _check_conditions(self, results, namespace, name, expected_conditions, status_callback):
+    if status_callback:
+      status_callback(results)
+    expected, condition = self.is_expected_conditions(results, expected_conditions)
+    if expected:
+      logging.info("%s/%s %s in namespace %s has reached the expected condition: %s.",
+                   self.group, self.plural, name, namespace, condition)
+      return True
+    if condition:
+      logging.info("Current condition of %s/%s %s in namespace %s is %s.",
+            self.group, self.plural, name, namespace, condition)
+    return False
+
+  def _raise_timeout(self, namespace, name, expected_conditions):
+    raise Exception(
+      "Timeout waiting for {0}/{1} {2} in namespace {3} to enter one of the "
+      "conditions {4}.".format(self.group, self.plural, name, namespace, expected_conditions))
+
   def is_expected_conditions(self, cr_object, expected_conditions):
     return False, ""
 
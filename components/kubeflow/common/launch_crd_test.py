@@ -0,0 +1,206 @@
+# Copyright 2021 kubeflow.org.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import http.server
+import json
+import threading
+import unittest
+from urllib import parse
+
+from kubernetes import client as k8s_client
+
+import launch_crd
+
+
+class FakeJob(launch_crd.K8sCR):
+  def __init__(self, client):
+    super(FakeJob, self).__init__("kubeflow.org", "fakejobs", "v1", client)
+
+  def is_expected_conditions(self, inst, expected_conditions):
+    conditions = inst.get("status", {}).get("conditions")
+    if not conditions:
+      return False, ""
+    return conditions[-1]["type"] in expected_conditions, conditions[-1]["type"]
+
+
+def _make_job(resource_version, condition=None):
+  job = {"metadata": {"name": "job", "namespace": "ns", "resourceVersion": str(resource_version)}}
+  if condition:
+    job["status"] = {"conditions": [{"type": condition, "status": "True"}]}
+  return job
+
+
+class _FakeApiServer(http.server.ThreadingHTTPServer):
+  """Serves the GET and the watch requests for the fake CR.
+
+  get_responses and watch_responses are consumed in order. The last get response is repeated.
+  Each get response is either the CR or an HTTP error status code.
+  Each watch response is either a list of events or an HTTP error status code.
+  """
+  def __init__(self):
+    super(_FakeApiServer, self).__init__(("127.0.0.1", 0), _FakeApiHandler)
+    self.get_responses = []
+    self.watch_responses = []
+    self.requests = []
+
+
+class _FakeApiHandler(http.server.BaseHTTPRequestHandler):
+  # The watch responses are streamed using the chunked transfer encoding like the API server does.
+  protocol_version = "HTTP/1.1"
+
+  def do_GET(self):
+    server = self.server
+    url = parse.urlparse(self.path)
+    query = dict(parse.parse_qsl(url.query))
+    server.requests.append((url.path, query))
+    if query.get("watch") in ("true", "True"):
+      response = server.watch_responses.pop(0) if server.watch_responses else []
+      if isinstance(response, int):
+        self._send_json(response, {"kind": "Status", "code": response})
+        return
+      self.send_response(200)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Transfer-Encoding", "chunked")
+      self.end_headers()
+      for event in response:
+        data = json.dumps(event).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+      self.wfile.write(b"0\r\n\r\n")
+      return
+    if len(server.get_responses) > 1:
+      response = server.get_responses.pop(0)
+    else:
+      response = server.get_responses[0]
+    if isinstance(response, int):
+      self._send_json(response, {"kind": "Status", "code": response})
+      return
+    self._send_json(200, response)
+
+  def _send_json(self, status, body):
+    data = json.dumps(body).encode()
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(data)))
+    self.end_headers()
+    self.wfile.write(data)
+
+  def log_message(self, format, *args):
+    pass
+
+
+class K8sCRTest(unittest.TestCase):
+  def setUp(self):
+    self.server = _FakeApiServer()
+    thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    thread.start()
+    configuration = k8s_client.Configuration()
+    configuration.host = "http://127.0.0.1:{}".format(self.server.server_address[1])
+    self.job = FakeJob(k8s_client.ApiClient(configuration))
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def _watch_requests(self):
+    return [query for _, query in self.server.requests if query.get("watch") in ("true", "True")]
+
+  def test_wait_for_condition_using_watch(self):
+    self.server.get_responses = [_make_job(1)]
+    self.server.watch_responses = [[
+      {"type": "MODIFIED", "object": _make_job(2, "Running")},
+      {"type": "MODIFIED", "object": _make_job(3, "Succeeded")},
+    ]]
+    statuses = []
+    result = self.job.wait_for_condition(
+      "ns", "job", ["Succeeded", "Failed"], timeout=datetime.timedelta(seconds=30),
+      status_callback=statuses.append)
+    self.assertEqual(result["metadata"]["resourceVersion"], "3")
+    self.assertEqual([s["metadata"]["resourceVersion"] for s in statuses], ["1", "2", "3"])
+    watch_requests = self._watch_requests()
+    self.assertEqual(len(watch_requests), 1)
+    self.assertEqual(watch_requests[0]["resourceVersion"], "1")
+    self.assertEqual(watch_requests[0]["fieldSelector"], "metadata.name=job")
+
+  def test_wait_for_condition_returns_without_watching_when_condition_is_reached(self):
+    self.server.get_responses = [_make_job(1, "Failed")]
+    result = self.job.wait_for_condition("ns", "job", ["Succeeded", "Failed"])
+    self.assertEqual(result["metadata"]["resourceVersion"], "1")
+    self.assertEqual(self._watch_requests(), [])
+
+  def test_wait_for_condition_resumes_watch_from_last_version(self):
+    self.server.get_responses = [_make_job(1)]
+    self.server.watch_responses = [
+      [{"type": "MODIFIED", "object": _make_job(2, "Running")}],
+      [{"type": "MODIFIED", "object": _make_job(3, "Succeeded")}],
+    ]
+    result = self.job.wait_for_condition("ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30))
+    self.assertEqual(result["metadata"]["resourceVersion"], "3")
+    self.assertEqual([q["resourceVersion"] for q in self._watch_requests()], ["1", "2"])
+
+  def test_wait_for_condition_relists_when_version_is_too_old(self):
+    self.server.get_responses = [_make_job(1), _make_job(5)]
+    self.server.watch_responses = [
+      [{"type": "ERROR", "object": {"kind": "Status", "code": 410}}],
+      [{"type": "MODIFIED", "object": _make_job(6, "Succeeded")}],
+    ]
+    result = self.job.wait_for_condition("ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30))
+    self.assertEqual(result["metadata"]["resourceVersion"], "6")
+    self.assertEqual([q["resourceVersion"] for q in self._watch_requests()], ["1", "5"])
+
+  def test_wait_for_condition_falls_back_to_polling(self):
+    self.server.get_responses = [_make_job(1), _make_job(2), _make_job(3, "Succeeded")]
+    self.server.watch_responses = [403]
+    result = self.job.wait_for_condition(
+      "ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30),
+      polling_interval=datetime.timedelta(seconds=0))
+    self.assertEqual(result["metadata"]["resourceVersion"], "3")
+    self.assertEqual(len(self._watch_requests()), 1)
+
+  def test_wait_for_condition_tolerates_get_errors_when_polling(self):
+    self.server.get_responses = [_make_job(1), 500, _make_job(3, "Succeeded")]
+    self.server.watch_responses = [403]
+    result = self.job.wait_for_condition(
+      "ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30),
+      polling_interval=datetime.timedelta(seconds=0), tolerate_errors=True)
+    self.assertEqual(result["metadata"]["resourceVersion"], "3")
+
+  def test_wait_for_condition_tolerates_initial_get_error(self):
+    self.server.get_responses = [500, _make_job(1)]
+    self.server.watch_responses = [[{"type": "MODIFIED", "object": _make_job(2, "Succeeded")}]]
+    result = self.job.wait_for_condition(
+      "ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30),
+      polling_interval=datetime.timedelta(seconds=0), tolerate_errors=True)
+    self.assertEqual(result["metadata"]["resourceVersion"], "2")
+    self.assertEqual([q["resourceVersion"] for q in self._watch_requests()], ["1"])
+
+  def test_wait_for_condition_raises_get_errors_by_default(self):
+    self.server.get_responses = [500, _make_job(1)]
+    with self.assertRaises(Exception):
+      self.job.wait_for_condition("ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30))
+
+  def test_wait_for_condition_raises_when_deleted(self):
+    self.server.get_responses = [_make_job(1)]
+    self.server.watch_responses = [[{"type": "DELETED", "object": _make_job(2)}]]
+    with self.assertRaisesRegex(Exception, "was deleted"):
+      self.job.wait_for_condition("ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=30))
+
+  def test_wait_for_condition_timeout(self):
+    self.server.get_responses = [_make_job(1)]
+    with self.assertRaisesRegex(Exception, "Timeout waiting for"):
+      self.job.wait_for_condition("ns", "job", ["Succeeded"], timeout=datetime.timedelta(seconds=1))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -18,5 +18,10 @@ IMAGE="docker.io/kubeflowkatib/kubeflow-pipelines-launcher"
 echo "Releasing image for the Katib Pipeline Launcher..."
 echo -e "Image: ${IMAGE}\n"
 
+mkdir -p ./build
+rsync -arvp ../common/ ./build/
+
 docker build . -f Dockerfile -t ${IMAGE}
 docker push ${IMAGE}
+
+rm -rf ./build
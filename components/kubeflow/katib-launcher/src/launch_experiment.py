@@ -18,18 +18,22 @@ from distutils.util import strtobool
 import json
 import os
 import logging
-import time
 
+from kubernetes import client as k8s_client
 from kubernetes.client import V1ObjectMeta
 
 from kubeflow.katib import KatibClient
 from kubeflow.katib import ApiClient
 from kubeflow.katib import V1beta1Experiment
 
+import launch_crd
+
 logger = logging.getLogger()
 logging.basicConfig(level=logging.INFO)
 
 FINISH_CONDITIONS = ["Succeeded", "Failed"]
+# Any condition means that the Experiment has been created.
+CREATED_CONDITIONS = ["Created", "Running", "Restarting"] + FINISH_CONDITIONS
 
 
 class JSONObject(object):
@@ -41,33 +45,29 @@ class JSONObject(object):
         self.data = json
 
 
+class Experiment(launch_crd.K8sCR):
+    def __init__(self, client=None):
+        super(Experiment, self).__init__("kubeflow.org", "experiments", "v1beta1", client)
+
+    def is_expected_conditions(self, inst, expected_conditions):
+        conditions = inst.get("status", {}).get("conditions")
+        if not conditions:
+            return False, ""
+        # The last condition is the current condition of the Experiment.
+        current_condition = conditions[-1]
+        if current_condition["type"] in expected_conditions and current_condition["status"] == "True":
+            return True, current_condition["type"]
+        return False, current_condition["type"]
+
+
 def wait_experiment_finish(katib_client, experiment, timeout):
-    polling_interval = datetime.timedelta(seconds=30)
-    end_time = datetime.datetime.now() + datetime.timedelta(minutes=timeout)
-    experiment_name = experiment.metadata.name
-    experiment_namespace = experiment.metadata.namespace
-    while True:
-        current_status = None
-        try:
-            current_status = katib_client.get_experiment_status(name=experiment_name, namespace=experiment_namespace)
-        except Exception as e:
-            logger.info("Unable to get current status for the Experiment: {} in namespace: {}. Exception: {}".format(
-                experiment_name, experiment_namespace, e))
-        # If Experiment has reached complete condition, exit the loop.
-        if current_status in FINISH_CONDITIONS:
-            logger.info("Experiment: {} in namespace: {} has reached the end condition: {}".format(
-                experiment_name, experiment_namespace, current_status))
-            return
-        # Print the current condition.
-        logger.info("Current condition for Experiment: {} in namespace: {} is: {}".format(
-            experiment_name, experiment_namespace, current_status))
-        # If timeout has been reached, rise an exception.
-        if datetime.datetime.now() > end_time:
-            raise Exception("Timout waiting for Experiment: {} in namespace: {} "
-                            "to reach one of these conditions: {}".format(
-                                experiment_name, experiment_namespace, FINISH_CONDITIONS))
-        # Sleep for poll interval.
-        time.sleep(polling_interval.seconds)
+    # The Katib client has already loaded the cluster configuration.
+    experiment_cr = Experiment(k8s_client.ApiClient())
+    # The transient API errors are logged and the status is requested again until the timeout.
+    experiment_cr.wait_for_condition(
+        experiment.metadata.namespace, experiment.metadata.name, FINISH_CONDITIONS,
+        timeout=datetime.timedelta(minutes=timeout),
+        tolerate_errors=True)
 
 
 if __name__ == "__main__":
@@ -115,22 +115,12 @@ if __name__ == "__main__":
     output = katib_client.create_experiment(experiment, namespace=experiment_namespace)
 
     # Wait until Experiment is created.
-    end_time = datetime.datetime.now() + datetime.timedelta(minutes=args.experiment_timeout_minutes)
-    while True:
-        current_status = None
-        # Try to get Experiment status.
-        try:
-            current_status = katib_client.get_experiment_status(name=experiment_name, namespace=experiment_namespace)
-        except Exception:
-            logger.info("Waiting until Experiment is created...")
-        # If current status is set, exit the loop.
-        if current_status is not None:
-            break
-        # If timeout has been reached, rise an exception.
-        if datetime.datetime.now() > end_time:
-            raise Exception("Timout waiting for Experiment: {} in namespace: {} to be created".format(
-                experiment_name, experiment_namespace))
-        time.sleep(1)
+    logger.info("Waiting until Experiment is created...")
+    Experiment(k8s_client.ApiClient()).wait_for_condition(
+        experiment_namespace, experiment_name, CREATED_CONDITIONS,
+        timeout=datetime.timedelta(minutes=args.experiment_timeout_minutes),
+        polling_interval=datetime.timedelta(seconds=1),
+        tolerate_errors=True)
 
     logger.info("Experiment is created")
 
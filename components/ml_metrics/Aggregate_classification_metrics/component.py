@@ -0,0 +1,119 @@
+from typing import NamedTuple
+from kfp.components import create_component_from_func
+
+
+def aggregate_classification_metrics(
+    confusion_matrix_1: dict = None,
+    confusion_matrix_2: dict = None,
+    confusion_matrix_3: dict = None,
+    confusion_matrix_4: dict = None,
+    confusion_matrix_5: dict = None,
+    confusion_matrix_list: list = None,
+    average: str = 'binary',
+) -> NamedTuple('Outputs', [
+    ('f1', float),
+    ('precision', float),
+    ('recall', float),
+    ('accuracy', float),
+    ('metrics', dict),
+    ('confusion_matrix', dict),
+]):
+    """
+    Aggregates classification metrics.
+
+    Combines the confusion matrices of the non-overlapping subsamples produced by the "Calculate classification metrics" component
+    and calculates the metrics of the whole sample.
+    The combination is associative, so the confusion matrix output of this component can itself be aggregated.
+    Any number of confusion matrices can be aggregated by passing them in confusion_matrix_list or by chaining the components.
+
+    Args:
+        confusion_matrix_list: Optional. JSON array of the confusion matrix objects (or their JSON serializations).
+            For example, the aggregated output of a batched ParallelFor loop.
+        average: The averaging of the per-label metrics. One of "binary", "micro", "macro" and "weighted".
+            The "binary" metrics are the ones of the "1" label.
+    """
+    import json
+
+    confusion_matrices = [d for d in [confusion_matrix_1, confusion_matrix_2, confusion_matrix_3, confusion_matrix_4, confusion_matrix_5] if d is not None]
+    for confusion_matrix in confusion_matrix_list or []:
+        confusion_matrices.append(json.loads(confusion_matrix) if isinstance(confusion_matrix, str) else confusion_matrix)
+    if not confusion_matrices:
+        raise ValueError('There are no confusion matrices to aggregate.')
+
+    counts = {}
+    for confusion_matrix in confusion_matrices:
+        for true_value, row in zip(confusion_matrix['labels'], confusion_matrix['counts']):
+            for predicted_value, count in zip(confusion_matrix['labels'], row):
+                if count:
+                    key = (true_value, predicted_value)
+                    counts[key] = counts.get(key, 0) + count
+
+    labels = sorted(set(label for key in counts for label in key))
+    label_indices = {label: index for index, label in enumerate(labels)}
+    confusion_matrix_counts = [[0] * len(labels) for _ in labels]
+    for (true_value, predicted_value), count in counts.items():
+        confusion_matrix_counts[label_indices[true_value]][label_indices[predicted_value]] = count
+    confusion_matrix = dict(
+        labels=labels,
+        counts=confusion_matrix_counts,
+    )
+
+    # Calculating the metrics from the confusion matrix
+    if average not in ('binary', 'micro', 'macro', 'weighted'):
+        raise ValueError(f'Unsupported average: {average}')
+    if average == 'binary' and len(labels) > 2:
+        raise ValueError(f'Target is multiclass but average="binary". Labels: {labels}')
+
+    def divide(numerator, denominator):
+        return numerator / denominator if denominator else 0.0
+
+    total = sum(map(sum, confusion_matrix_counts))
+    true_positives = [confusion_matrix_counts[index][index] for index in range(len(labels))]
+    true_sums = [sum(row) for row in confusion_matrix_counts]
+    predicted_sums = [sum(column) for column in zip(*confusion_matrix_counts)]
+    accuracy = divide(sum(true_positives), total)
+    if average == 'binary':
+        positive_index = label_indices.get('1')
+        precisions = [divide(true_positives[positive_index], predicted_sums[positive_index])] if positive_index is not None else [0.0]
+        recalls = [divide(true_positives[positive_index], true_sums[positive_index])] if positive_index is not None else [0.0]
+        label_weights = [1]
+    elif average == 'micro':
+        precisions = [divide(sum(true_positives), sum(predicted_sums))]
+        recalls = [divide(sum(true_positives), sum(true_sums))]
+        label_weights = [1]
+    else:
+        precisions = [divide(true_positive, predicted_sum) for true_positive, predicted_sum in zip(true_positives, predicted_sums)]
+        recalls = [divide(true_positive, true_sum) for true_positive, true_sum in zip(true_positives, true_sums)]
+        label_weights = true_sums if average == 'weighted' else [1] * len(labels)
+    f1s = [divide(2 * precision * recall, precision + recall) for precision, recall in zip(precisions, recalls)]
+
+    def weighted_average(values):
+        return divide(sum(value * weight for value, weight in zip(values, label_weights)), sum(label_weights))
+
+    f1 = weighted_average(f1s)
+    precision = weighted_average(precisions)
+    recall = weighted_average(recalls)
+
+    metrics = dict(
+        f1=f1,
+        precision=precision,
+        recall=recall,
+        accuracy=accuracy
+    )
+
+    return (
+        f1,
+        precision,
+        recall,
+        accuracy,
+        metrics,
+        confusion_matrix,
+    )
+
+
+if __name__ == '__main__':
+    aggregate_classification_metrics_op = create_component_from_func(
+        aggregate_classification_metrics,
+        output_component_file='component.yaml',
+        base_image='python:3.7',
+    )
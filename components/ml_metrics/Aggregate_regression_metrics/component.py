@@ -3,11 +3,12 @@ from kfp.components import create_component_from_func
 
 
 def aggregate_regression_metrics(
-    metrics_1: dict,
+    metrics_1: dict = None,
     metrics_2: dict = None,
     metrics_3: dict = None,
     metrics_4: dict = None,
     metrics_5: dict = None,
+    metrics_list: list = None,
 ) -> NamedTuple('Outputs', [
     ('number_of_items', int),
     ('max_absolute_error', float),
@@ -18,12 +19,27 @@ def aggregate_regression_metrics(
 ]):
     '''Calculates regression metrics.
 
+    Combines the regression metrics of the non-overlapping subsamples into the metrics of the whole sample.
+    The combination is associative, so the outputs of this component can themselves be aggregated.
+    Any number of metrics can be aggregated by passing them in metrics_list or by chaining the components.
+
+    Args:
+        metrics_list: Optional. JSON array of the metrics objects (or their JSON serializations).
+            For example, the aggregated output of a batched ParallelFor loop.
+
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import json
     import math
 
     metrics_dicts = [d for d in [metrics_1, metrics_2, metrics_3, metrics_4, metrics_5] if d is not None]
+    for metrics in metrics_list or []:
+        metrics_dicts.append(json.loads(metrics) if isinstance(metrics, str) else metrics)
+    metrics_dicts = [metrics for metrics in metrics_dicts if metrics['number_of_items']]
+    if not metrics_dicts:
+        raise ValueError('There are no metrics to aggregate.')
+
     number_of_items = sum(metrics['number_of_items'] for metrics in metrics_dicts)
     max_absolute_error = max(metrics['max_absolute_error'] for metrics in metrics_dicts)
     mean_absolute_error = sum(metrics['mean_absolute_error'] * metrics['number_of_items'] for metrics in metrics_dicts) / number_of_items
@@ -13,42 +13,103 @@ def calculate_classification_metrics_from_csv(
     ('precision', float),
     ('recall', float),
     ('accuracy', float),
+    ('metrics', dict),
+    ('confusion_matrix', dict),
 ]):
     """
     Calculates classification metrics.
 
+    The values are read in a single pass and only the (weighted) confusion matrix is kept in memory.
+    The metrics are the same as the ones calculated by the sklearn.metrics functions.
+    The "confusion_matrix" output can be combined with the confusion matrices of the other subsamples
+    using the "Aggregate classification metrics" component.
+
+    Args:
+        average: The averaging of the per-label metrics. One of "binary", "micro", "macro" and "weighted".
+            The "binary" metrics are the ones of the "1" label.
+
     Annotations:
         author: Anton Kiselev <akiselev@provectus.com>
     """
-    import numpy
-    from sklearn.metrics import f1_score, precision_score, recall_score, accuracy_score
+    import itertools
+
+    def read_values(path, name):
+        with open(path) as values_file:
+            for line in values_file:
+                # Same format as the one supported by numpy.loadtxt
+                values = line.split('#', 1)[0].split()
+                if len(values) > 1:
+                    raise NotImplementedError(f'Only single {name} values are supported.')
+                if values:
+                    yield values[0]
 
-    true_values = numpy.loadtxt(true_values_path, dtype=str)
-    predicted_values = numpy.loadtxt(predicted_values_path, dtype=str)
+    true_values = read_values(true_values_path, 'true')
+    predicted_values = read_values(predicted_values_path, 'prediction')
 
-    if len(predicted_values.shape) != 1:
-        raise NotImplemented('Only single prediction values are supported.')
-    if len(true_values.shape) != 1:
-        raise NotImplemented('Only single true values are supported.')
+    missing = object()
+    if sample_weights_path is None:
+        rows = (
+            (true_value, predicted_value, 1)
+            for true_value, predicted_value in itertools.zip_longest(true_values, predicted_values, fillvalue=missing)
+        )
+    else:
+        sample_weights = (float(value) for value in read_values(sample_weights_path, 'sample weight'))
+        rows = itertools.zip_longest(true_values, predicted_values, sample_weights, fillvalue=missing)
+
+    counts = {}
+    for true_value, predicted_value, sample_weight in rows:
+        if true_value is missing or predicted_value is missing:
+            raise ValueError('Input shapes of true values and predictions are different.')
+        if sample_weight is missing:
+            raise ValueError('Input shapes of sample weights and predictions are different.')
+        key = (true_value, predicted_value)
+        counts[key] = counts.get(key, 0) + sample_weight
+
+    labels = sorted(set(label for key in counts for label in key))
+    label_indices = {label: index for index, label in enumerate(labels)}
+    confusion_matrix_counts = [[0] * len(labels) for _ in labels]
+    for (true_value, predicted_value), count in counts.items():
+        confusion_matrix_counts[label_indices[true_value]][label_indices[predicted_value]] = count
+    confusion_matrix = dict(
+        labels=labels,
+        counts=confusion_matrix_counts,
+    )
 
-    if predicted_values.shape != true_values.shape:
-        raise ValueError(f'Input shapes are different: {predicted_values.shape} != {true_values.shape}')
+    # Calculating the metrics from the confusion matrix
+    if average not in ('binary', 'micro', 'macro', 'weighted'):
+        raise ValueError(f'Unsupported average: {average}')
+    if average == 'binary' and len(labels) > 2:
+        raise ValueError(f'Target is multiclass but average="binary". Labels: {labels}')
 
-    sample_weights = None
-    if sample_weights_path is not None:
-        sample_weights = numpy.loadtxt(sample_weights_path, dtype=float)
+    def divide(numerator, denominator):
+        return numerator / denominator if denominator else 0.0
 
-        if len(sample_weights.shape) != 1:
-            raise NotImplemented('Only single sample weights are supported.')
+    total = sum(map(sum, confusion_matrix_counts))
+    true_positives = [confusion_matrix_counts[index][index] for index in range(len(labels))]
+    true_sums = [sum(row) for row in confusion_matrix_counts]
+    predicted_sums = [sum(column) for column in zip(*confusion_matrix_counts)]
+    accuracy = divide(sum(true_positives), total)
+    if average == 'binary':
+        positive_index = label_indices.get('1')
+        precisions = [divide(true_positives[positive_index], predicted_sums[positive_index])] if positive_index is not None else [0.0]
+        recalls = [divide(true_positives[positive_index], true_sums[positive_index])] if positive_index is not None else [0.0]
+        label_weights = [1]
+    elif average == 'micro':
+        precisions = [divide(sum(true_positives), sum(predicted_sums))]
+        recalls = [divide(sum(true_positives), sum(true_sums))]
+        label_weights = [1]
+    else:
+        precisions = [divide(true_positive, predicted_sum) for true_positive, predicted_sum in zip(true_positives, predicted_sums)]
+        recalls = [divide(true_positive, true_sum) for true_positive, true_sum in zip(true_positives, true_sums)]
+        label_weights = true_sums if average == 'weighted' else [1] * len(labels)
+    f1s = [divide(2 * precision * recall, precision + recall) for precision, recall in zip(precisions, recalls)]
 
-        if sample_weights.shape != predicted_values.shape:
-            raise ValueError(f'Input shapes of sample weights and predictions are different: '
-                             f'{sample_weights.shape} != {predicted_values.shape}')
+    def weighted_average(values):
+        return divide(sum(value * weight for value, weight in zip(values, label_weights)), sum(label_weights))
 
-    f1 = f1_score(true_values, predicted_values, average=average, sample_weight=sample_weights)
-    precision = precision_score(true_values, predicted_values, average=average, sample_weight=sample_weights)
-    recall = recall_score(true_values, predicted_values, average=average, sample_weight=sample_weights)
-    accuracy = accuracy_score(true_values, predicted_values, normalize=average, sample_weight=sample_weights)
+    f1 = weighted_average(f1s)
+    precision = weighted_average(precisions)
+    recall = weighted_average(recalls)
 
     metrics = dict(
         f1=f1,
@@ -63,6 +124,7 @@ def calculate_classification_metrics_from_csv(
         recall,
         accuracy,
         metrics,
+        confusion_matrix,
     )
 
 
@@ -71,5 +133,4 @@ if __name__ == '__main__':
         calculate_classification_metrics_from_csv,
         output_component_file='component.yaml',
         base_image='python:3.7',
-        packages_to_install=['numpy==1.19.0', 'scikit-learn==0.23.2']
     )
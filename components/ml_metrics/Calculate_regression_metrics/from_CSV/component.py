@@ -14,30 +14,57 @@ def calculate_regression_metrics_from_csv(
 ]):
     '''Calculates regression metrics.
 
+    The values are read and processed in chunks in a single pass, so the memory usage does not depend on the number of values.
+    The "metrics" output can be combined with the metrics of the other subsamples using the "Aggregate regression metrics" component.
+
     Annotations:
         author: Alexey Volkov <alexey.volkov@ark-kun.com>
     '''
+    import itertools
     import math
     import numpy
 
-    true_values = numpy.loadtxt(true_values_path, dtype=numpy.float64)
-    predicted_values = numpy.loadtxt(predicted_values_path, dtype=numpy.float64)
+    chunk_size = 100000
+
+    def read_values(path, name):
+        with open(path) as values_file:
+            for line in values_file:
+                # Same format as the one supported by numpy.loadtxt
+                values = line.split('#', 1)[0].split()
+                if len(values) > 1:
+                    raise NotImplementedError('Only single {} values are supported.'.format(name))
+                if values:
+                    yield float(values[0])
+
+    true_values = read_values(true_values_path, 'true')
+    predicted_values = read_values(predicted_values_path, 'prediction')
 
-    if len(predicted_values.shape) != 1:
-        raise NotImplemented('Only single prediction values are supported.')
-    if len(true_values.shape) != 1:
-        raise NotImplemented('Only single true values are supported.')
+    number_of_items = 0
+    max_absolute_error = 0.0
+    sum_of_absolute_errors = 0.0
+    sum_of_squared_errors = 0.0
+    while True:
+        true_values_chunk = numpy.fromiter(itertools.islice(true_values, chunk_size), dtype=numpy.float64)
+        predicted_values_chunk = numpy.fromiter(itertools.islice(predicted_values, chunk_size), dtype=numpy.float64)
+        if predicted_values_chunk.size != true_values_chunk.size:
+            raise ValueError('Input shapes are different: ({},) != ({},)'.format(
+                number_of_items + predicted_values_chunk.size + sum(1 for _ in predicted_values),
+                number_of_items + true_values_chunk.size + sum(1 for _ in true_values),
+            ))
+        if not true_values_chunk.size:
+            break
 
-    if predicted_values.shape != true_values.shape:
-        raise ValueError('Input shapes are different: {} != {}'.format(predicted_values.shape, true_values.shape))
+        errors = (true_values_chunk - predicted_values_chunk)
+        abs_errors = numpy.abs(errors)
+        number_of_items += errors.size
+        max_absolute_error = max(max_absolute_error, float(numpy.max(abs_errors)))
+        sum_of_absolute_errors += float(numpy.sum(abs_errors))
+        sum_of_squared_errors += float(numpy.sum(errors ** 2))
 
-    number_of_items = true_values.size
-    errors = (true_values - predicted_values)
-    abs_errors = numpy.abs(errors)
-    squared_errors = errors ** 2
-    max_absolute_error = numpy.max(abs_errors)
-    mean_absolute_error = numpy.average(abs_errors)
-    mean_squared_error = numpy.average(squared_errors)
+    if not number_of_items:
+        raise ValueError('There are no values.')
+    mean_absolute_error = sum_of_absolute_errors / number_of_items
+    mean_squared_error = sum_of_squared_errors / number_of_items
     root_mean_squared_error = math.sqrt(mean_squared_error)
     metrics = dict(
         number_of_items=number_of_items,
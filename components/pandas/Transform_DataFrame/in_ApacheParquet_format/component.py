@@ -4,6 +4,7 @@ def Pandas_Transform_DataFrame_in_ApacheParquet_format(
     table_path: InputPath('ApacheParquet'),
     transformed_table_path: OutputPath('ApacheParquet'),
     transform_code: 'PythonCode',
+    chunk_size: int = 0,
 ):
     '''Transform DataFrame loaded from an ApacheParquet file.
 
@@ -15,6 +16,11 @@ def Pandas_Transform_DataFrame_in_ApacheParquet_format(
             - `df['prod'] = df['X'] * df['Y']`
             - `df = df[['X', 'prod']]`
             - `df.insert(0, "is_positive", df["X"] > 0)`
+        chunk_size: Optional. When specified, the table is read, transformed and written one row group
+            (and at most chunk_size rows) at a time, so the table does not need to fit in memory.
+            Only use the chunked mode with row-local transformations
+            (the transformations that do not aggregate, sort or otherwise combine the rows).
+            The DataFrame index is not stored in the chunked mode.
 
     Outputs:
         transformed_table: Transformed DataFrame.
@@ -24,6 +30,37 @@ def Pandas_Transform_DataFrame_in_ApacheParquet_format(
     '''
     import pandas
 
+    if chunk_size:
+        import pyarrow
+        from pyarrow import parquet
+
+        # The namespace is needed so that the code can replace `df`. For example df = df[['X']]
+        namespace = dict(locals())
+        parquet_file = parquet.ParquetFile(table_path)
+        writer = None
+        try:
+            for row_group_index in range(parquet_file.num_row_groups):
+                row_group = parquet_file.read_row_group(row_group_index, use_pandas_metadata=True)
+                for offset in range(0, row_group.num_rows, chunk_size):
+                    namespace['df'] = row_group.slice(offset, chunk_size).to_pandas()
+                    exec(transform_code, namespace)
+                    if writer is None:
+                        transformed_table = pyarrow.Table.from_pandas(namespace['df'], preserve_index=False)
+                        writer = parquet.ParquetWriter(transformed_table_path, transformed_table.schema)
+                    else:
+                        # The chunks are converted using the schema of the first chunk, so that the column types stay the same.
+                        transformed_table = pyarrow.Table.from_pandas(namespace['df'], schema=writer.schema, preserve_index=False)
+                    writer.write_table(transformed_table)
+            if writer is None:
+                # Empty table
+                namespace['df'] = parquet_file.schema.to_arrow_schema().empty_table().to_pandas()
+                exec(transform_code, namespace)
+                namespace['df'].to_parquet(transformed_table_path, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
     df = pandas.read_parquet(table_path)
     # The namespace is needed so that the code can replace `df`. For example df = df[['X']]
     namespace = locals()
@@ -38,6 +75,6 @@ if __name__ == '__main__':
         base_image='python:3.7',
         packages_to_install=[
             'pandas==1.0.4',
-            'pyarrow==0.14.1',
+            'pyarrow==0.17.1',
         ],
     )
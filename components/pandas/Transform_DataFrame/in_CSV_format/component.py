@@ -4,6 +4,7 @@ def Pandas_Transform_DataFrame_in_CSV_format(
     table_path: InputPath('CSV'),
     transformed_table_path: OutputPath('CSV'),
     transform_code: 'PythonCode',
+    chunk_size: int = 0,
 ):
     '''Transform DataFrame loaded from a CSV file.
 
@@ -15,6 +16,9 @@ def Pandas_Transform_DataFrame_in_CSV_format(
             - `df['prod'] = df['X'] * df['Y']`
             - `df = df[['X', 'prod']]`
             - `df.insert(0, "is_positive", df["X"] > 0)`
+        chunk_size: Optional. When specified, the table is read, transformed and written in chunks of that many rows,
+            so the table does not need to fit in memory. Only use the chunked mode with row-local transformations
+            (the transformations that do not aggregate, sort or otherwise combine the rows).
 
     Outputs:
         transformed_table: Transformed table.
@@ -24,6 +28,26 @@ def Pandas_Transform_DataFrame_in_CSV_format(
     '''
     import pandas
 
+    if chunk_size:
+        # The namespace is needed so that the code can replace `df`. For example df = df[['X']]
+        namespace = dict(locals())
+        columns = None
+        with open(transformed_table_path, 'w') as transformed_table_file:
+            for df in pandas.read_csv(table_path, chunksize=chunk_size):
+                namespace['df'] = df
+                exec(transform_code, namespace)
+                transformed_df = namespace['df']
+                if columns is None:
+                    columns = list(transformed_df.columns)
+                elif list(transformed_df.columns) != columns:
+                    raise ValueError('The transformed chunks have different columns: {} != {}. Only row-local transformations are supported in the chunked mode.'.format(list(transformed_df.columns), columns))
+                transformed_df.to_csv(
+                    transformed_table_file,
+                    index=False,
+                    header=transformed_table_file.tell() == 0,
+                )
+        return
+
     df = pandas.read_csv(
         table_path,
     )
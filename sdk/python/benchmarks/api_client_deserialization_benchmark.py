@@ -0,0 +1,119 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the response deserialization of the kfp_server_api ApiClient.
+
+Generates a list_runs response with the embedded workflow manifests and a
+get_run response with a big runtime workflow and deserializes them to the
+models and to the raw dicts. The JSON decoding time is reported separately,
+since it does not depend on the deserialization mode.
+
+To benchmark the API client of this repository instead of the installed one::
+
+    PYTHONPATH=../../backend/api/python_http_client \\
+        python benchmarks/api_client_deserialization_benchmark.py --runs 1000
+"""
+
+import argparse
+import datetime
+import json
+import time
+
+import kfp_server_api
+
+
+class _FakeResponse:
+    """The RESTResponse with the already decoded body."""
+
+    def __init__(self, data: str):
+        self.data = data
+
+    def getheader(self, name, default=None):
+        return default
+
+
+def _make_run(index: int, manifest_size: int) -> dict:
+    created_at = datetime.datetime(2021, 1, 1) + datetime.timedelta(minutes=index)
+    return {
+        'id': 'run-%d' % index,
+        'name': 'Run %d' % index,
+        'storage_state': 'STORAGESTATE_AVAILABLE',
+        'pipeline_spec': {
+            'pipeline_id': 'pipeline-%d' % (index % 10),
+            'pipeline_name': 'Pipeline %d' % (index % 10),
+            'workflow_manifest': 'x' * manifest_size,
+            'parameters': [{'name': 'param-%d' % i, 'value': str(i)} for i in range(5)],
+        },
+        'resource_references': [{
+            'key': {'type': 'EXPERIMENT', 'id': 'experiment-1'},
+            'name': 'Default',
+            'relationship': 'OWNER',
+        }],
+        'service_account': 'pipeline-runner',
+        'created_at': created_at.isoformat() + 'Z',
+        'scheduled_at': created_at.isoformat() + 'Z',
+        'finished_at': (created_at + datetime.timedelta(minutes=5)).isoformat() + '.123456789Z',
+        'status': 'Succeeded',
+        'metrics': [{'name': 'accuracy', 'node_id': 'node-%d' % i, 'number_value': 0.9, 'format': 'RAW'} for i in range(3)],
+    }
+
+
+def _benchmark(api_client, data: str, response_type: str, repeats: int) -> float:
+    response = _FakeResponse(data)
+    durations = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        api_client.deserialize(response, response_type)
+        durations.append(time.perf_counter() - start_time)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--manifest-size', type=int, default=20000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    list_runs_data = json.dumps({
+        'runs': [_make_run(i, args.manifest_size) for i in range(args.runs)],
+        'total_size': args.runs,
+        'next_page_token': 'token',
+    })
+    get_run_data = json.dumps({
+        'run': _make_run(0, args.manifest_size),
+        'pipeline_runtime': {'workflow_manifest': 'y' * args.manifest_size * args.runs},
+    })
+
+    api_clients = {
+        'models': kfp_server_api.ApiClient(),
+        'raw': kfp_server_api.ApiClient(raw_responses=True),
+    }
+    print('kfp_server_api: {}'.format(kfp_server_api.__file__))
+    for name, data, response_type in [
+        ('list_runs', list_runs_data, 'ApiListRunsResponse'),
+        ('get_run', get_run_data, 'ApiRunDetail'),
+    ]:
+        start_time = time.perf_counter()
+        json.loads(data)
+        json_duration = time.perf_counter() - start_time
+        print('{:10} {:6.1f} MB   JSON decoding {:7.1f} ms'.format(
+            name, len(data) / 1024 / 1024, json_duration * 1000))
+        for mode, api_client in api_clients.items():
+            duration = _benchmark(api_client, data, response_type, args.repeats)
+            print('{:10} {:6}   deserialization {:7.1f} ms'.format(
+                '', mode, duration * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the cold-start overhead of lightweight Python components.
+
+Runs the container command of a trivial component created with
+`create_component_from_func` locally (outside of a container) in the default
+and the fast startup modes and reports the wall time statistics.
+
+Usage::
+
+    python benchmarks/component_startup_benchmark.py --repetitions 30
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from kfp import components
+from kfp.components import _components
+
+
+def add(a: float, b: bool) -> float:
+  return a if b else -a
+
+
+def _resolve_command(task_factory, outputs_dir: str):
+  old_outputs_dir = _components._outputs_dir
+  _components._outputs_dir = outputs_dir
+  try:
+    task = task_factory(a=1, b=True)
+  finally:
+    _components._outputs_dir = old_outputs_dir
+  resolved_cmd = _components._resolve_command_line_and_paths(
+      task.component_ref.spec, task.arguments)
+  return resolved_cmd.command + resolved_cmd.args
+
+
+def _measure(command, env, repetitions: int):
+  durations = []
+  for _ in range(repetitions):
+    start_time = time.perf_counter()
+    subprocess.run(command, env=env, check=True)
+    durations.append(time.perf_counter() - start_time)
+  return durations
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--repetitions', type=int, default=20)
+  args = parser.parse_args()
+
+  modes = {
+      'default (sh + mktemp)': dict(),
+      'fast startup': dict(use_fast_startup=True),
+      'fast startup + bytecode': dict(use_fast_startup=True, embed_bytecode=True),
+  }
+  baseline_median = None
+  print('{:<26} {:>10} {:>10} {:>10}'.format('mode', 'median ms', 'min ms', 'speedup'))
+  with tempfile.TemporaryDirectory() as temp_dir:
+    # Making python3 resolve to the current interpreter in all modes.
+    bin_dir = Path(temp_dir, 'bin')
+    bin_dir.mkdir()
+    (bin_dir / 'python3').symlink_to(sys.executable)
+    env = dict(os.environ, PATH=str(bin_dir) + os.pathsep + os.environ.get('PATH', ''))
+
+    for mode_name, options in modes.items():
+      task_factory = components.create_component_from_func(add, **options)
+      command = _resolve_command(task_factory, str(Path(temp_dir, mode_name.split()[0])))
+      # Warming up the OS file cache.
+      _measure(command, env, 2)
+      durations = _measure(command, env, args.repetitions)
+      median = statistics.median(durations)
+      baseline_median = baseline_median or median
+      print('{:<26} {:>10.1f} {:>10.1f} {:>9.2f}x'.format(
+          mode_name, median * 1000, min(durations) * 1000, baseline_median / median))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,117 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the v2 compiler on a large pipeline.
+
+Compiles a pipeline with thousands of tasks created from the same two
+components (half of them importing the same artifact) and reports the compile
+time and the size of the compiled pipeline job. The time of the old path
+(PipelineJob with the pipeline spec converted to a Struct) is reported for
+comparison.
+
+Usage::
+
+    python benchmarks/v2_compiler_benchmark.py --tasks 5000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from google.protobuf import json_format
+
+from kfp import components
+from kfp.v2 import compiler
+from kfp.v2 import dsl
+
+_add_op = components.load_component_from_text('''
+name: Add
+inputs:
+- {name: op1, type: Integer}
+- {name: op2, type: Integer}
+outputs:
+- {name: sum, type: Integer}
+implementation:
+  container:
+    image: python:3.7
+    command: [sh, -c, 'echo "$(($0+$1))" > "$2"', {inputValue: op1}, {inputValue: op2}, {outputPath: sum}]
+''')
+
+_score_op = components.load_component_from_text('''
+name: Score
+inputs:
+- {name: model, type: Model}
+- {name: offset, type: Integer}
+implementation:
+  container:
+    image: python:3.7
+    command: [score, --model, {inputUri: model}, --offset, {inputValue: offset}]
+''')
+
+
+def _make_pipeline(task_count: int):
+
+  @dsl.pipeline(name='benchmark-pipeline')
+  def benchmark_pipeline(a: int = 1):
+    previous_task = _add_op(a, 1)
+    for i in range(task_count // 2):
+      previous_task = _add_op(previous_task.outputs['sum'], i)
+      _score_op(model='gs://bucket/model', offset=i)
+
+  return benchmark_pipeline
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--tasks', type=int, default=5000)
+  args = parser.parse_args()
+
+  pipeline_func = _make_pipeline(args.tasks)
+  compiler_instance = compiler.Compiler()
+
+  start_time = time.perf_counter()
+  pipeline_spec = compiler_instance._create_pipeline(pipeline_func)
+  spec_time = time.perf_counter() - start_time
+
+  start_time = time.perf_counter()
+  pipeline_job = compiler_instance._create_pipeline_job(pipeline_spec,
+                                                        'dummy_root')
+  struct_json_text = json_format.MessageToJson(pipeline_job)
+  struct_time = time.perf_counter() - start_time
+
+  with tempfile.TemporaryDirectory() as temp_dir:
+    output_path = os.path.join(temp_dir, 'pipeline.json')
+    start_time = time.perf_counter()
+    compiler_instance._write_pipeline(
+        compiler_instance._create_pipeline_job_dict(pipeline_spec,
+                                                    'dummy_root'), output_path)
+    direct_time = time.perf_counter() - start_time
+    with open(output_path) as f:
+      compiled = json.load(f)
+    size = os.path.getsize(output_path)
+
+  assert compiled == json.loads(struct_json_text)
+  compiled_spec = compiled['pipelineSpec']
+  print('tasks:                      {}'.format(len(compiled_spec['tasks'])))
+  print('executors:                  {}'.format(
+      len(compiled_spec['deploymentConfig']['executors'])))
+  print('compiled size:              {:.1f} KiB'.format(size / 1024))
+  print('pipeline spec creation:     {:.2f} s'.format(spec_time))
+  print('job serialization (Struct): {:.2f} s'.format(struct_time))
+  print('job serialization (direct): {:.2f} s'.format(direct_time))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,140 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks writing and reading the workflow packages.
+
+Generates a large workflow (20 MB of YAML by default) and writes it to a
+.tar.gz package and reads it back using the streaming package writer and
+reader and using the old in-memory implementation. Every measurement runs in a
+fresh process and reports the wall time and the peak memory growth of the
+operation (the generated workflow itself is excluded). The peak memory is
+measured with tracemalloc (which slows the operations down) in a separate run,
+since the freed memory of the generated workflow hides the RSS growth.
+
+Usage::
+
+    python benchmarks/workflow_package_benchmark.py --size-mb 20
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+from kfp.compiler._workflow_package import read_workflow_package, write_workflow_package
+from kfp.components._yaml_utils import dump_yaml
+
+_VARIANTS = ['write-old', 'write-streaming', 'read-old', 'read-streaming']
+
+
+def _make_workflow(size_mb: int) -> dict:
+  script = 'import sys\n' + 'print("processing the data", sys.argv)\n' * 20
+  templates = []
+  # Every template takes about 1.2 KB of YAML.
+  for i in range(size_mb * 1024 * 1024 // 1200):
+    templates.append({
+        'name': 'task-%d' % i,
+        'container': {
+            'image': 'python:3.7',
+            'command': ['python3', '-u', '-c', script],
+            'args': ['--input', '{{inputs.parameters.input-%d}}' % i],
+        },
+        'inputs': {'parameters': [{'name': 'input-%d' % i}]},
+    })
+  return {
+      'apiVersion': 'argoproj.io/v1alpha1',
+      'kind': 'Workflow',
+      'metadata': {'generateName': 'benchmark-'},
+      'spec': {'entrypoint': 'task-0', 'templates': templates},
+  }
+
+
+def _write_old(workflow: dict, package_path: str):
+  yaml_text = dump_yaml(workflow)
+  with tarfile.open(package_path, 'w:gz') as tar:
+    with io.BytesIO(yaml_text.encode()) as yaml_file:
+      tarinfo = tarfile.TarInfo('pipeline.yaml')
+      tarinfo.size = len(yaml_file.getvalue())
+      tar.addfile(tarinfo, fileobj=yaml_file)
+
+
+def _read_old(package_path: str) -> dict:
+  with tarfile.open(package_path, 'r:gz') as tar:
+    with tar.extractfile(tar.getmember('pipeline.yaml')) as f:
+      return yaml.safe_load(f)
+
+
+def _run_variant(variant: str, size_mb: int, package_path: str,
+                 measure_memory: bool):
+  if variant.startswith('write'):
+    workflow = _make_workflow(size_mb)
+    write = _write_old if variant == 'write-old' else write_workflow_package
+    operation = lambda: write(workflow, package_path)
+  else:
+    read = _read_old if variant == 'read-old' else read_workflow_package
+    operation = lambda: read(package_path)
+
+  if measure_memory:
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    operation()
+    result = {'peak_memory': tracemalloc.get_traced_memory()[1] - start_memory}
+    tracemalloc.stop()
+  else:
+    start_time = time.perf_counter()
+    operation()
+    result = {'duration': time.perf_counter() - start_time}
+  print(json.dumps(result))
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--size-mb', type=int, default=20)
+  parser.add_argument('--variant', choices=_VARIANTS, help=argparse.SUPPRESS)
+  parser.add_argument('--package-path', help=argparse.SUPPRESS)
+  parser.add_argument('--measure-memory', action='store_true', help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.variant:
+    _run_variant(args.variant, args.size_mb, args.package_path,
+                 args.measure_memory)
+    return
+
+  with tempfile.TemporaryDirectory() as temp_dir:
+    package_path = os.path.join(temp_dir, 'pipeline.tar.gz')
+    yaml_size = len(dump_yaml(_make_workflow(args.size_mb)))
+    print('workflow YAML size: {:.1f} MB'.format(yaml_size / 1024 / 1024))
+    for variant in _VARIANTS:
+      results = {}
+      for measure_memory in [False, True]:
+        output = subprocess.check_output([
+            sys.executable, __file__, '--variant', variant, '--size-mb',
+            str(args.size_mb), '--package-path', package_path
+        ] + (['--measure-memory'] if measure_memory else []))
+        results.update(json.loads(output))
+      print('{:16} {:6.2f} s   peak memory growth {:7.1f} MB'.format(
+          variant, results['duration'], results['peak_memory'] / 1024 / 1024))
+    print('package size: {:.1f} MB'.format(
+        os.path.getsize(package_path) / 1024 / 1024))
+
+
+if __name__ == '__main__':
+  main()
@@ -18,9 +18,17 @@ __path__ = __import__('pkgutil').extend_path(__path__, __name__)
 
 __version__ = '1.3.0'
 
-from . import components
-from . import containers
-from . import dsl
-from ._client import Client
 from ._config import *
-from ._runners import *
+
+# The submodules are loaded on first access since importing them is expensive
+# and many users (e.g. component programs) only need a small part of the SDK.
+from .components._lazy_import import attach_lazy_attributes as _attach_lazy_attributes
+__getattr__, __dir__ = _attach_lazy_attributes(
+    __name__, globals(), {
+        'components': '.components',
+        'containers': '.containers',
+        'dsl': '.dsl',
+        'Client': '._client',
+        'run_pipeline_func_on_cluster': '._runners',
+        'run_pipeline_func_locally': '._runners',
+    })
@@ -12,12 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import calendar
+import functools
+import hashlib
 import logging
 import os
 import google.auth
 import google.auth.app_engine
 import google.auth.compute_engine.credentials
 import google.auth.iam
+import google.auth.jwt
 from google.auth.transport.requests import Request
 import google.oauth2.credentials
 import google.oauth2.service_account
@@ -25,6 +29,7 @@ import requests_toolbelt.adapters.appengine
 from webbrowser import open_new_tab
 import requests
 import json
+from ._token_cache import get_default_token_cache
 
 IAM_SCOPE = 'https://www.googleapis.com/auth/iam'
 OAUTH_TOKEN_URI = 'https://www.googleapis.com/oauth2/v4/token'
@@ -34,21 +39,107 @@ def get_gcp_access_token():
     """Get and return GCP access token for the current Application Default
     Credentials. If not set, returns None. For more information, see
     https://cloud.google.com/sdk/gcloud/reference/auth/application-default/print-access-token
+
+    The token is cached and shared with the other clients and processes.
     """
     token = None
     try:
-        creds, project = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
-        if not creds.valid:
-            auth_req = Request()
-            creds.refresh(auth_req)
-        if creds.valid:
-            token = creds.token
+        creds = _get_default_credentials(
+            ("https://www.googleapis.com/auth/cloud-platform",),
+            os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'))
+        token = get_default_token_cache().get_token(
+            _get_credentials_cache_key('gcp_access_token', creds),
+            lambda: _fetch_gcp_access_token(creds))
     except Exception as e:
       logging.warning('Failed to get GCP access token: %s', e)
     return token
 
+@functools.lru_cache()
+def _get_default_credentials(scopes, credentials_path):
+    """Gets the Application Default Credentials once per process.
+
+    The credentials_path (the GOOGLE_APPLICATION_CREDENTIALS value) is only
+    used as the lru_cache key.
+    """
+    creds, _ = google.auth.default(scopes=list(scopes))
+    return creds
+
+def _get_credentials_cache_key(token_type, creds):
+    """Gets the token cache key that identifies the account of the credentials."""
+    account = [
+        type(creds).__name__,
+        getattr(creds, 'service_account_email', None),
+        getattr(creds, 'client_id', None),
+        getattr(creds, 'refresh_token', None),
+    ]
+    return token_type + ':' + hashlib.sha256(json.dumps(account).encode()).hexdigest()
+
+def _fetch_gcp_access_token(creds):
+    # The cache only fetches the tokens that are about to expire, so the
+    # credentials are always refreshed.
+    creds.refresh(Request())
+    if not creds.valid:
+        return None
+    expiry = calendar.timegm(creds.expiry.utctimetuple()) if creds.expiry else None
+    return creds.token, expiry
+
 def get_auth_token(client_id, other_client_id, other_client_secret):
-    """Gets auth token from default service account or user account."""
+    """Gets auth token from default service account or user account.
+
+    The token is cached and shared with the other clients and processes.
+    """
+    return make_auth_token_getter(client_id, other_client_id, other_client_secret)()
+
+def make_auth_token_getter(client_id, other_client_id, other_client_secret):
+    """Makes the function that gets the cached auth token of the account.
+
+    The cache key is calculated once, so the function does not read the stored
+    credentials every time it is called. When the user account has no stored
+    credential yet, the interactive login that stores it runs right away.
+    """
+    fetched_tokens = []
+    if _get_local_credential(client_id) is None and other_client_id is not None and other_client_secret is not None:
+        # The stored credential is a part of the cache key.
+        fetched_tokens.append(_fetch_auth_token(client_id, other_client_id, other_client_secret))
+    account = [
+        client_id,
+        other_client_id,
+        os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'),
+        # The locally stored refresh token identifies the user account.
+        _get_local_credential(client_id),
+    ]
+    cache_key = 'id_token:' + hashlib.sha256(json.dumps(account).encode()).hexdigest()
+
+    def fetch_token():
+        if fetched_tokens:
+            token = fetched_tokens.pop()
+        else:
+            token = _fetch_auth_token(client_id, other_client_id, other_client_secret)
+        return token, _get_id_token_expiry(token)
+
+    token_cache = get_default_token_cache()
+    return lambda: token_cache.get_token(cache_key, fetch_token)
+
+def _get_local_credential(client_id):
+    """Gets the credential stored in LOCAL_KFP_CREDENTIAL for the client_id or None."""
+    if not os.path.exists(LOCAL_KFP_CREDENTIAL):
+        return None
+    try:
+        with open(LOCAL_KFP_CREDENTIAL, 'r') as f:
+            return json.load(f).get(client_id)
+    except (OSError, ValueError):
+        return None
+
+def _get_id_token_expiry(token):
+    """Gets the expiry time of the ID token (JWT) or None if it is unknown."""
+    if not token:
+        return None
+    try:
+        return google.auth.jwt.decode(token, verify=False).get('exp')
+    except Exception:
+        return None
+
+def _fetch_auth_token(client_id, other_client_id, other_client_secret):
     if os.path.exists(LOCAL_KFP_CREDENTIAL):
         # fetch IAP auth token using the locally stored credentials.
         with open(LOCAL_KFP_CREDENTIAL, 'r') as f:
@@ -0,0 +1,298 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Execution cache of the local runner.
+
+The cache entries are keyed by the component digest, the container spec, the
+input parameter values and the content hashes of the input artifacts. The
+output artifacts are copied into a content-addressed object store and made
+read-only. The outputs of the cache hits are hard-linked into place, so reusing
+an output does not depend on its size. Since the restored outputs share the
+stored files, the stored objects are verified before they are reused and the
+changed ones are dropped.
+
+Layout of the cache directory::
+
+    entries/<key>.json    The output parameter values and artifact hashes.
+    objects/<hash>        The output artifact files and directories.
+"""
+
+__all__ = [
+    'LocalExecutionCache',
+]
+
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+_DEFAULT_MAX_SIZE_BYTES = 10 * 1024 ** 3
+_DURATION_RE = re.compile(
+    r'^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$')
+_DURATION_UNIT_SECONDS = {'weeks': 604800, 'days': 86400, 'hours': 3600, 'minutes': 60, 'seconds': 1}
+
+
+def parse_duration(duration: str) -> float:
+    """Parses the RFC3339 (ISO 8601) duration (e.g. "P30DT1H22M3S") into seconds."""
+    match = _DURATION_RE.match(duration.strip().upper())
+    if not match or duration.strip().upper() in ('P', 'PT'):
+        raise ValueError('Invalid duration: "{}". Expected an RFC3339 duration like "P30DT1H22M3S".'.format(duration))
+    return sum(float(value) * _DURATION_UNIT_SECONDS[unit] for unit, value in match.groupdict().items() if value)
+
+
+def _calculate_file_hash(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _link_or_copy_file(source_path: str, destination_path: str):
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        shutil.copy2(source_path, destination_path)
+
+
+def _make_read_only(path: str):
+    file_paths = [path]
+    if os.path.isdir(path):
+        file_paths = [os.path.join(dir_path, file_name) for dir_path, _, file_names in os.walk(path) for file_name in file_names]
+    for file_path in file_paths:
+        mode = os.stat(file_path).st_mode
+        os.chmod(file_path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+class LocalExecutionCache:
+    """Caches the task outputs in a local directory.
+
+    Args:
+        cache_dir: The cache directory. Can be shared between the runs.
+        max_size_bytes: The maximum total size of the stored artifacts. The
+            least recently used entries are evicted when it is exceeded.
+    """
+    def __init__(self, cache_dir: str, max_size_bytes: int = _DEFAULT_MAX_SIZE_BYTES):
+        self._cache_dir = cache_dir
+        self._entries_dir = os.path.join(cache_dir, 'entries')
+        self._objects_dir = os.path.join(cache_dir, 'objects')
+        self._max_size_bytes = max_size_bytes
+        os.makedirs(self._entries_dir, exist_ok=True)
+        os.makedirs(self._objects_dir, exist_ok=True)
+        # The files are hashed once. Downstream tasks reuse the hashes of the artifacts produced by the upstream ones.
+        # The hashes are keyed by the inode, so the hard-linked copies of the stored objects are not hashed again.
+        self._hash_lock = threading.Lock()
+        self._file_hashes = {}  # type: Dict[Tuple[int, int, int, int], str]
+
+    def calculate_artifact_hash(self, path: str) -> str:
+        """Returns the content hash of the artifact file or directory."""
+        if not os.path.isdir(path):
+            return self._calculate_file_hash(path)
+        hasher = hashlib.sha256()
+        for rel_path in sorted(self._list_dir_files(path)):
+            hasher.update(json.dumps([rel_path, self._calculate_file_hash(os.path.join(path, rel_path))]).encode())
+        return 'dir-' + hasher.hexdigest()
+
+    def _calculate_file_hash(self, path: str) -> str:
+        memo_key = self._get_memo_key(path)
+        with self._hash_lock:
+            file_hash = self._file_hashes.get(memo_key)
+        if file_hash is None:
+            file_hash = _calculate_file_hash(path)
+            with self._hash_lock:
+                self._file_hashes[memo_key] = file_hash
+        return file_hash
+
+    @staticmethod
+    def _get_memo_key(path: str) -> Tuple[int, int, int, int]:
+        # Any write to the file changes its modification time.
+        file_stat = os.stat(path)
+        return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+    def _copy_file(self, source_path: str, destination_path: str):
+        shutil.copy2(source_path, destination_path)
+        with self._hash_lock:
+            file_hash = self._file_hashes.get(self._get_memo_key(source_path))
+        if file_hash is not None:
+            with self._hash_lock:
+                self._file_hashes[self._get_memo_key(destination_path)] = file_hash
+
+    @staticmethod
+    def _list_dir_files(path: str) -> List[str]:
+        rel_paths = []
+        for dir_path, _, file_names in os.walk(path):
+            for file_name in file_names:
+                rel_paths.append(os.path.relpath(os.path.join(dir_path, file_name), path).replace(os.sep, '/'))
+        return rel_paths
+
+    def calculate_key(
+        self,
+        template: dict,
+        input_parameters: Mapping[str, str],
+        input_artifact_paths: Mapping[str, str],
+    ) -> str:
+        """Calculates the cache key of a container task execution."""
+        annotations = template.get('metadata', {}).get('annotations', {})
+        component_ref = json.loads(annotations.get('pipelines.kubeflow.org/component_ref', '{}'))
+        key_data = {
+            'digest': component_ref.get('digest'),
+            'inputs': template.get('inputs'),
+            # The container and the outputs can be changed by the op transformers, so the digest is not enough.
+            'container': {
+                name: template['container'].get(name)
+                for name in ['image', 'command', 'args', 'env', 'workingDir']
+            },
+            'outputs': template.get('outputs'),
+            'parameters': dict(input_parameters),
+            'artifacts': {
+                name: self.calculate_artifact_hash(path) for name, path in input_artifact_paths.items()
+            },
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str, max_staleness_seconds: float = None) -> Optional[dict]:
+        """Returns the cache entry or None when it is missing or stale."""
+        entry_path = os.path.join(self._entries_dir, key + '.json')
+        try:
+            with open(entry_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if max_staleness_seconds is not None and time.time() - entry['created_at'] > max_staleness_seconds:
+            return None
+        for artifact_hash in entry['artifacts'].values():
+            if not self._verify_object(artifact_hash):
+                return None
+        # Marking the entry as recently used.
+        os.utime(entry_path)
+        return entry
+
+    def restore_artifacts(self, entry: dict, output_artifact_paths: Mapping[str, str]) -> Dict[str, str]:
+        """Links the cached artifacts into place. Returns the paths of the restored artifacts."""
+        restored_paths = {}
+        for name, artifact_hash in entry['artifacts'].items():
+            path = output_artifact_paths.get(name)
+            if path is None:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            object_path = self._object_path(artifact_hash)
+            if os.path.isdir(object_path):
+                shutil.copytree(object_path, path, copy_function=_link_or_copy_file)
+            else:
+                _link_or_copy_file(object_path, path)
+            restored_paths[name] = path
+        return restored_paths
+
+    def put(self, key: str, parameters: Mapping[str, str], artifact_paths: Mapping[str, str]):
+        """Stores the task outputs."""
+        artifact_hashes = {}
+        for name, path in artifact_paths.items():
+            artifact_hash = self.calculate_artifact_hash(path)
+            object_path = self._object_path(artifact_hash)
+            if not os.path.exists(object_path):
+                # Storing under a temporary name first, so that the partially stored objects are never used.
+                # The outputs are copied, since the task output files can still be changed in place.
+                temp_path = object_path + '.' + uuid.uuid4().hex + '.tmp'
+                if os.path.isdir(path):
+                    shutil.copytree(path, temp_path, copy_function=self._copy_file)
+                else:
+                    self._copy_file(path, temp_path)
+                _make_read_only(temp_path)
+                try:
+                    os.rename(temp_path, object_path)
+                except OSError:
+                    # Stored concurrently by another task.
+                    self._remove(temp_path)
+            artifact_hashes[name] = artifact_hash
+        entry = {
+            'created_at': time.time(),
+            'parameters': dict(parameters),
+            'artifacts': artifact_hashes,
+        }
+        entry_path = os.path.join(self._entries_dir, key + '.json')
+        with tempfile.NamedTemporaryFile('w', dir=self._entries_dir, delete=False) as f:
+            json.dump(entry, f)
+        os.replace(f.name, entry_path)
+
+    def evict(self):
+        """Evicts the least recently used entries until the cache fits into the size limit."""
+        entries = []
+        for file_name in os.listdir(self._entries_dir):
+            if not file_name.endswith('.json'):
+                continue
+            entry_path = os.path.join(self._entries_dir, file_name)
+            try:
+                with open(entry_path) as f:
+                    artifact_hashes = set(json.load(f)['artifacts'].values())
+                entries.append((os.stat(entry_path).st_mtime, entry_path, artifact_hashes))
+            except (OSError, ValueError, KeyError):
+                continue
+        object_sizes = {}
+        for object_name in os.listdir(self._objects_dir):
+            if object_name.endswith('.tmp'):
+                continue
+            object_sizes[object_name] = self._get_size(os.path.join(self._objects_dir, object_name))
+
+        # Keeping the most recently used entries that fit.
+        entries.sort(reverse=True)
+        used_hashes = set()
+        total_size = 0
+        for _, entry_path, artifact_hashes in entries:
+            entry_size = sum(object_sizes.get(artifact_hash, 0) for artifact_hash in artifact_hashes - used_hashes)
+            if total_size + entry_size > self._max_size_bytes:
+                self._remove(entry_path)
+                continue
+            total_size += entry_size
+            used_hashes |= artifact_hashes
+        for object_name in object_sizes:
+            if object_name not in used_hashes:
+                self._remove(os.path.join(self._objects_dir, object_name))
+
+    def _object_path(self, artifact_hash: str) -> str:
+        return os.path.join(self._objects_dir, artifact_hash)
+
+    def _verify_object(self, artifact_hash: str) -> bool:
+        """Checks that the stored object exists and was not changed through the restored links."""
+        object_path = self._object_path(artifact_hash)
+        if not os.path.exists(object_path):
+            return False
+        if self.calculate_artifact_hash(object_path) != artifact_hash:
+            self._remove(object_path)
+            return False
+        return True
+
+    @staticmethod
+    def _get_size(path: str) -> int:
+        if not os.path.isdir(path):
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(dir_path, file_name)) for dir_path, _, file_names in os.walk(path) for file_name in file_names)
+
+    @staticmethod
+    def _remove(path: str):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,722 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Executes compiled pipelines (Argo workflows) on the local machine.
+
+The runner interprets the workflow produced by `Compiler._create_workflow`.
+Container templates are executed either as local processes (the container
+command is run on the host) or using a local container runtime (docker or
+podman). DAG templates, including the ones generated for `ParallelFor`,
+`Condition` and `ExitHandler`, are scheduled by the runner itself.
+"""
+
+__all__ = [
+    'LocalRunner',
+    'LocalRunResult',
+    'LocalTaskResult',
+]
+
+
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from ._local_cache import LocalExecutionCache, parse_duration
+
+
+_PLACEHOLDER_RE = re.compile(r'{{\s*([^{}]+?)\s*}}')
+_CONDITION_RE = re.compile(r'^\s*(.*?)\s*(==|!=|>=|<=|>|<)\s*(.*?)\s*$')
+
+
+class LocalTaskResult:
+    """The result of a single task execution.
+
+    Attributes:
+        task_id: The unique ID of the task execution. Consists of the task names
+            in the nested DAGs, e.g. "exit-handler-1.condition-2.train".
+            The loop iterations have the item index, e.g. "for-loop-1(3).train".
+        template: The name of the template the task executes.
+        status: One of "Succeeded", "Failed", "Skipped" (the condition was false)
+            or "Omitted" (an upstream task failed).
+        start_time: The time when the task has started. Seconds since epoch.
+        duration: The time the task took (seconds).
+        parameters: The output parameter values.
+        artifacts: The local paths of the output artifacts.
+        log_path: The path of the file with the stdout and stderr of the task.
+        error: The error message when the task has failed.
+        cached: Whether the outputs were taken from the execution cache.
+    """
+    def __init__(self, task_id: str, template: str, status: str = None):
+        self.task_id = task_id
+        self.template = template
+        self.status = status
+        self.start_time = None
+        self.duration = 0.0
+        self.parameters = {}  # type: Dict[str, str]
+        self.artifacts = {}  # type: Dict[str, str]
+        self.log_path = None
+        self.error = None
+        self.cached = False
+
+    def __repr__(self):
+        return 'LocalTaskResult(task_id={!r}, status={!r}, duration={:.2f})'.format(
+            self.task_id, self.status, self.duration)
+
+
+class LocalRunResult:
+    """The result of a local pipeline run.
+
+    Attributes:
+        status: "Succeeded" or "Failed".
+        run_dir: The directory with the task outputs and logs.
+        tasks: The results of the container tasks in the order of completion.
+        duration: The wall time of the run (seconds).
+    """
+    def __init__(self, status: str, run_dir: str, tasks: List[LocalTaskResult], duration: float):
+        self.status = status
+        self.run_dir = run_dir
+        self.tasks = tasks
+        self.duration = duration
+
+    def get_task(self, task_id: str) -> LocalTaskResult:
+        for task in self.tasks:
+            if task.task_id == task_id:
+                return task
+        raise KeyError(task_id)
+
+    def format_timing_report(self) -> str:
+        """Returns the table with the per-task execution times."""
+        task_id_width = max([len('task')] + [len(task.task_id) for task in self.tasks])
+        lines = ['{:<{}}  {:<9}  {:>9}'.format('task', task_id_width, 'status', 'seconds')]
+        for task in sorted(self.tasks, key=lambda task: (task.start_time or 0, task.task_id)):
+            status = 'Cached' if task.cached else task.status
+            lines.append('{:<{}}  {:<9}  {:>9.2f}'.format(task.task_id, task_id_width, status, task.duration))
+        total_task_time = sum(task.duration for task in self.tasks)
+        lines.append('Run {}: {:.2f}s wall time, {:.2f}s total task time.'.format(
+            self.status.lower(), self.duration, total_task_time))
+        return '\n'.join(lines)
+
+
+class _TaskOutputs:
+    def __init__(self, parameters: Dict[str, str] = None, artifacts: Dict[str, str] = None):
+        self.parameters = parameters or {}
+        self.artifacts = artifacts or {}
+
+
+class _ResolutionError(Exception):
+    pass
+
+
+def _resolve_placeholders(text: str, lookup: Callable[[str], Optional[str]]) -> str:
+    """Replaces the {{...}} placeholders. The unknown placeholders are kept as is."""
+    def replace(match):
+        value = lookup(match.group(1))
+        return match.group(0) if value is None else value
+    return _PLACEHOLDER_RE.sub(replace, text)
+
+
+def _item_to_string(item) -> str:
+    if isinstance(item, str):
+        return item
+    return json.dumps(item, sort_keys=True)
+
+
+def _evaluate_condition(expression: str) -> bool:
+    """Evaluates the simple comparison expressions generated for dsl.Condition."""
+    match = _CONDITION_RE.match(expression)
+    if not match:
+        raise _ResolutionError('Unsupported condition: "{}".'.format(expression))
+    left, operator, right = match.groups()
+
+    def parse_operand(operand: str):
+        if len(operand) >= 2 and operand[0] == operand[-1] and operand[0] in '"\'':
+            operand = operand[1:-1]
+        try:
+            return float(operand)
+        except ValueError:
+            return operand
+
+    left, right = parse_operand(left), parse_operand(right)
+    if type(left) != type(right):
+        # Comparing as strings like Argo does when the operands are not both numbers.
+        left, right = str(left), str(right)
+    return {
+        '==': lambda: left == right,
+        '!=': lambda: left != right,
+        '>': lambda: left > right,
+        '<': lambda: left < right,
+        '>=': lambda: left >= right,
+        '<=': lambda: left <= right,
+    }[operator]()
+
+
+def _link_or_copy(source_path: str, destination_path: str):
+    """Links the file or the directory tree. Falls back to copying across file systems."""
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    if os.path.isdir(source_path):
+        shutil.copytree(source_path, destination_path, copy_function=_link_or_copy_file)
+    else:
+        _link_or_copy_file(source_path, destination_path)
+
+
+def _link_or_copy_file(source_path: str, destination_path: str):
+    try:
+        os.link(source_path, destination_path)
+    except OSError:
+        shutil.copy2(source_path, destination_path)
+
+
+class LocalRunner:
+    """Executes a compiled pipeline (Argo workflow) locally.
+
+    Example::
+
+        workflow = kfp.compiler.Compiler()._create_workflow(my_pipeline)
+        result = LocalRunner(workflow, max_parallelism=4).run({'param': 'value'})
+        print(result.format_timing_report())
+
+    Args:
+        workflow: The workflow dict created by `Compiler._create_workflow`.
+        run_dir: Optional. The directory where the task outputs and logs are
+            stored. A new temporary directory is used if not set.
+        max_parallelism: Optional. The maximum number of the concurrently
+            running container tasks. Defaults to the number of CPUs.
+        container_runtime: Optional. The container runtime executable (e.g.
+            "docker" or "podman") used to run the container tasks. When not
+            set, the container commands are executed directly on the local
+            machine. This works for the lightweight Python components and
+            other components whose programs are available locally.
+        use_current_python: When running the commands on the local machine,
+            makes "python" and "python3" refer to the current Python
+            interpreter, so that the lightweight Python components can use the
+            packages installed in the current environment.
+        cache: Optional. The execution cache. When set, the tasks whose
+            component, inputs and input artifact contents match a previous
+            execution reuse its outputs instead of being executed. The caching
+            can be disabled for a task by setting
+            `task.execution_options.caching_strategy.max_cache_staleness = 'P0D'`.
+        max_cache_staleness: Optional. The maximum age of the reused cache
+            entries as an RFC3339 duration (e.g. "P30DT1H22M3S"). The tasks
+            can set a smaller value using their caching strategy.
+    """
+    def __init__(
+        self,
+        workflow: Mapping[str, Any],
+        run_dir: str = None,
+        max_parallelism: int = None,
+        container_runtime: str = None,
+        use_current_python: bool = True,
+        cache: LocalExecutionCache = None,
+        max_cache_staleness: str = None,
+    ):
+        self._workflow = workflow
+        self._templates = {template['name']: template for template in workflow['spec']['templates']}
+        self._run_dir = run_dir
+        self._max_parallelism = max_parallelism or os.cpu_count() or 1
+        self._container_runtime = container_runtime
+        self._use_current_python = use_current_python
+        self._cache = cache
+        self._max_cache_staleness_seconds = parse_duration(max_cache_staleness) if max_cache_staleness else None
+
+    def run(self, arguments: Mapping[str, Any] = None) -> LocalRunResult:
+        """Runs the pipeline and waits for its completion.
+
+        Args:
+            arguments: The pipeline arguments. Override the default values of
+                the pipeline parameters.
+
+        Returns:
+            The run result with the status, the outputs and the timing of all tasks.
+        """
+        spec = self._workflow['spec']
+        workflow_parameters = {
+            parameter['name']: parameter.get('value')
+            for parameter in spec.get('arguments', {}).get('parameters', [])
+        }
+        for name, value in (arguments or {}).items():
+            workflow_parameters[name] = _item_to_string(value)
+
+        run_dir = self._run_dir or tempfile.mkdtemp(prefix='kfp_local_run_')
+        os.makedirs(run_dir, exist_ok=True)
+        execution = _WorkflowExecution(
+            runner=self,
+            run_dir=run_dir,
+            workflow_name=self._workflow['metadata'].get('name') or self._workflow['metadata'].get('generateName', 'pipeline-') + uuid.uuid4().hex[:5],
+            workflow_parameters=workflow_parameters,
+        )
+        start_time = time.time()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_parallelism) as executor:
+            execution.executor = executor
+            status = execution.run(spec['entrypoint'], spec.get('onExit'))
+        if self._cache:
+            self._cache.evict()
+        result = LocalRunResult(
+            status=status,
+            run_dir=run_dir,
+            tasks=execution.task_results,
+            duration=time.time() - start_time,
+        )
+        logging.info('Local run finished.\n%s', result.format_timing_report())
+        return result
+
+
+class _WorkflowExecution:
+    """The state of a single run. The DAGs are scheduled on the calling thread.
+
+    Only the container tasks are executed on the thread pool (each one in its
+    own process), and their completions are processed on the calling thread.
+    """
+    def __init__(self, runner: LocalRunner, run_dir: str, workflow_name: str, workflow_parameters: Dict[str, str]):
+        self.runner = runner
+        self.run_dir = run_dir
+        self.workflow_name = workflow_name
+        self.workflow_uid = str(uuid.uuid4())
+        self.workflow_parameters = workflow_parameters
+        self.workflow_status = 'Running'
+        self.executor = None  # type: concurrent.futures.Executor
+        self.task_results = []  # type: List[LocalTaskResult]
+        self._completions = queue.Queue()
+        self._running_count = 0
+        self._bin_dir = None
+        if runner._use_current_python and not runner._container_runtime:
+            self._bin_dir = self._create_bin_dir()
+
+    def run(self, entrypoint: str, on_exit: Optional[str]) -> str:
+        statuses = []
+        def on_done(status, outputs):
+            statuses.append(status)
+
+        self.start_template('', entrypoint, self.workflow_parameters, {}, on_done)
+        self._wait()
+        self.workflow_status = statuses[0]
+        if on_exit:
+            self.start_template('onExit', on_exit, {}, {}, on_done)
+            self._wait()
+        return 'Succeeded' if all(status == 'Succeeded' for status in statuses) else 'Failed'
+
+    def _wait(self):
+        while self._running_count:
+            future, on_done = self._completions.get()
+            self._running_count -= 1
+            status, outputs = future.result()
+            on_done(status, outputs)
+
+    def lookup_global(self, name: str) -> Optional[str]:
+        if name.startswith('workflow.parameters.'):
+            return self.workflow_parameters.get(name[len('workflow.parameters.'):])
+        return {
+            'workflow.name': self.workflow_name,
+            'workflow.uid': self.workflow_uid,
+            'workflow.namespace': 'local',
+            'workflow.status': self.workflow_status,
+        }.get(name)
+
+    def start_template(self, execution_id: str, template_name: str, parameters: Dict[str, str], artifacts: Dict[str, str], on_done: Callable):
+        template = self.runner._templates[template_name]
+        if 'dag' in template:
+            _DagExecution(self, execution_id, template, parameters, artifacts, on_done).start()
+        elif 'container' in template:
+            task_result = LocalTaskResult(execution_id, template_name)
+            self.task_results.append(task_result)
+            self._running_count += 1
+            future = self.executor.submit(self._run_container_task, task_result, template, parameters, artifacts)
+            future.add_done_callback(lambda future: self._completions.put((future, on_done)))
+        else:
+            task_result = LocalTaskResult(execution_id, template_name, 'Failed')
+            task_result.error = 'Template "{}" is not supported by the local runner. Only the container and DAG templates are supported.'.format(template_name)
+            logging.error(task_result.error)
+            self.task_results.append(task_result)
+            on_done('Failed', None)
+
+    def _create_bin_dir(self) -> str:
+        bin_dir = os.path.join(self.run_dir, '.bin')
+        os.makedirs(bin_dir, exist_ok=True)
+        for name in ['python', 'python3']:
+            link_path = os.path.join(bin_dir, name)
+            if not os.path.lexists(link_path):
+                os.symlink(sys.executable, link_path)
+        return bin_dir
+
+    def _run_container_task(self, task_result: LocalTaskResult, template: dict, parameters: Dict[str, str], artifacts: Dict[str, str]):
+        """Runs the container task. Executed on the thread pool."""
+        task_result.start_time = time.time()
+        try:
+            status, outputs = self._run_container(task_result, template, parameters, artifacts)
+        except Exception as e:
+            status, outputs = 'Failed', None
+            task_result.error = str(e)
+        task_result.duration = time.time() - task_result.start_time
+        task_result.status = status
+        if outputs:
+            task_result.parameters = outputs.parameters
+            task_result.artifacts = outputs.artifacts
+        if status == 'Failed':
+            logging.error('Task "%s" has failed: %s. Log: %s', task_result.task_id, task_result.error, task_result.log_path)
+        else:
+            logging.info('Task "%s" has succeeded in %.2fs.', task_result.task_id, task_result.duration)
+        return status, outputs
+
+    def _run_container(self, task_result: LocalTaskResult, template: dict, parameters: Dict[str, str], artifacts: Dict[str, str]):
+        task_dir = os.path.join(self.run_dir, re.sub(r'[^-\w.()]', '_', task_result.task_id or template['name']))
+        if os.path.exists(task_dir):
+            shutil.rmtree(task_dir)
+        files_dir = os.path.join(task_dir, 'files')
+        os.makedirs(files_dir)
+        task_result.log_path = os.path.join(task_dir, 'log.txt')
+
+        def local_path(container_path: str) -> str:
+            return os.path.join(files_dir, container_path.lstrip('/'))
+
+        inputs = template.get('inputs', {})
+        input_parameters = {}
+        for parameter in inputs.get('parameters', []):
+            value = parameters.get(parameter['name'], parameter.get('value'))
+            if value is None:
+                raise _ResolutionError('Input parameter "{}" is not set.'.format(parameter['name']))
+            input_parameters[parameter['name']] = value
+
+        # Container path -> local path
+        path_map = {}
+        for artifact in inputs.get('artifacts', []):
+            path = local_path(artifact['path'])
+            path_map[artifact['path']] = path
+            if 'raw' in artifact:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(artifact['raw'].get('data', ''))
+            elif artifact['name'] in artifacts:
+                # Hard links make passing big files free.
+                _link_or_copy(artifacts[artifact['name']], path)
+            elif not artifact.get('optional'):
+                raise _ResolutionError('Input artifact "{}" is not set.'.format(artifact['name']))
+
+        outputs = template.get('outputs', {})
+        output_parameter_paths = {}
+        for parameter in outputs.get('parameters', []):
+            container_path = parameter.get('valueFrom', {}).get('path')
+            if container_path:
+                output_parameter_paths[parameter['name']] = local_path(container_path)
+                path_map[container_path] = local_path(container_path)
+        output_artifact_paths = {}
+        for artifact in outputs.get('artifacts', []):
+            output_artifact_paths[artifact['name']] = local_path(artifact['path'])
+            path_map[artifact['path']] = local_path(artifact['path'])
+        for path in path_map.values():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def lookup(name: str) -> Optional[str]:
+            if name.startswith('inputs.parameters.'):
+                return input_parameters.get(name[len('inputs.parameters.'):])
+            if name == 'pod.name':
+                return task_result.task_id
+            return self.lookup_global(name)
+
+        container = template['container']
+        command = [_resolve_placeholders(str(part), lookup) for part in container.get('command', [])]
+        args = [_resolve_placeholders(str(part), lookup) for part in container.get('args', [])]
+        env = {}
+        for env_var in container.get('env', []):
+            if 'value' in env_var:
+                env[env_var['name']] = _resolve_placeholders(str(env_var['value']), lookup)
+            elif env_var.get('valueFrom', {}).get('fieldRef', {}).get('fieldPath') == 'metadata.name':
+                env[env_var['name']] = task_result.task_id
+            elif env_var.get('valueFrom', {}).get('fieldRef', {}).get('fieldPath') == 'metadata.namespace':
+                env[env_var['name']] = 'local'
+
+        runtime = self.runner._container_runtime
+        if runtime:
+            full_command = [runtime, 'run', '--rm']
+            mounted_dirs = set()
+            for container_path, path in sorted(path_map.items()):
+                if container_path in [artifact['path'] for artifact in inputs.get('artifacts', [])]:
+                    full_command += ['-v', '{}:{}:ro'.format(path, container_path)]
+                else:
+                    container_dir = os.path.dirname(container_path)
+                    if container_dir not in mounted_dirs:
+                        mounted_dirs.add(container_dir)
+                        full_command += ['-v', '{}:{}'.format(os.path.dirname(path), container_dir)]
+            for name, value in env.items():
+                full_command += ['-e', '{}={}'.format(name, value)]
+            if container.get('workingDir'):
+                full_command += ['-w', container['workingDir']]
+            if command:
+                full_command += ['--entrypoint', command[0], container['image']] + command[1:] + args
+            else:
+                full_command += [container['image']] + args
+            process_env = None
+            cwd = None
+        else:
+            if not command:
+                raise _ResolutionError(
+                    'The container of template "{}" does not specify the command. '
+                    'Set container_runtime to run it using the image entrypoint.'.format(template['name']))
+            # The container paths are replaced with the local paths. Longer paths first, so that the prefixes do not clash.
+            def map_paths(text: str) -> str:
+                for container_path in sorted(path_map, key=len, reverse=True):
+                    text = text.replace(container_path, path_map[container_path])
+                return text
+            full_command = [map_paths(part) for part in command + args]
+            process_env = dict(os.environ)
+            process_env.update({name: map_paths(value) for name, value in env.items()})
+            if self._bin_dir:
+                process_env['PATH'] = self._bin_dir + os.pathsep + process_env.get('PATH', '')
+            cwd = task_dir
+
+        cache = self.runner._cache
+        cache_key = None
+        if cache:
+            max_staleness_seconds = self.runner._max_cache_staleness_seconds
+            template_max_staleness = template.get('metadata', {}).get('annotations', {}).get('pipelines.kubeflow.org/max_cache_staleness')
+            if template_max_staleness:
+                template_max_staleness_seconds = parse_duration(template_max_staleness)
+                if max_staleness_seconds is None or template_max_staleness_seconds < max_staleness_seconds:
+                    max_staleness_seconds = template_max_staleness_seconds
+            if max_staleness_seconds != 0:
+                # The upstream output paths are used since the cache already knows their hashes.
+                input_artifact_paths = {
+                    artifact['name']: artifacts[artifact['name']]
+                    for artifact in inputs.get('artifacts', []) if artifact['name'] in artifacts
+                }
+                cache_key = cache.calculate_key(template, input_parameters, input_artifact_paths)
+                entry = cache.get(cache_key, max_staleness_seconds)
+                if entry:
+                    task_result.cached = True
+                    with open(task_result.log_path, 'w') as log_file:
+                        log_file.write('The outputs were taken from the execution cache.\n')
+                    return 'Succeeded', _TaskOutputs(
+                        parameters=dict(entry['parameters']),
+                        artifacts=cache.restore_artifacts(entry, output_artifact_paths),
+                    )
+
+        retry_limit = int(template.get('retryStrategy', {}).get('limit', 0) or 0)
+        timeout = template.get('activeDeadlineSeconds')
+        for attempt in range(retry_limit + 1):
+            with open(task_result.log_path, 'w') as log_file:
+                try:
+                    return_code = subprocess.run(
+                        full_command, stdout=log_file, stderr=subprocess.STDOUT,
+                        env=process_env, cwd=cwd, timeout=float(timeout) if timeout else None,
+                    ).returncode
+                except subprocess.TimeoutExpired:
+                    return_code = None
+            if return_code == 0:
+                break
+        if return_code != 0:
+            task_result.error = 'Timed out' if return_code is None else 'Exit code {}'.format(return_code)
+            return 'Failed', None
+
+        task_outputs = _TaskOutputs()
+        for name, path in output_parameter_paths.items():
+            if not os.path.exists(path):
+                task_result.error = 'Output parameter file "{}" was not created.'.format(name)
+                return 'Failed', None
+            with open(path, 'r') as f:
+                task_outputs.parameters[name] = f.read()
+        for name, path in output_artifact_paths.items():
+            if os.path.exists(path):
+                task_outputs.artifacts[name] = path
+        if cache_key:
+            cache.put(cache_key, task_outputs.parameters, task_outputs.artifacts)
+        return 'Succeeded', task_outputs
+
+
+class _DagExecution:
+    def __init__(self, workflow: _WorkflowExecution, execution_id: str, template: dict, parameters: Dict[str, str], artifacts: Dict[str, str], on_done: Callable):
+        self._workflow = workflow
+        self._execution_id = execution_id
+        self._template = template
+        self._parameters = {
+            parameter['name']: parameters.get(parameter['name'], parameter.get('value'))
+            for parameter in template.get('inputs', {}).get('parameters', [])
+        }
+        self._artifacts = artifacts
+        self._on_done = on_done
+        self._tasks = {task['name']: task for task in template['dag']['tasks']}
+        self._states = {}  # type: Dict[str, str]
+        self._outputs = {}  # type: Dict[str, _TaskOutputs]
+        self._scheduling = False
+        self._needs_scheduling = False
+        self._done = False
+
+    def _child_id(self, task_name: str) -> str:
+        return self._execution_id + '.' + task_name if self._execution_id else task_name
+
+    def start(self):
+        self._schedule()
+
+    def _schedule(self):
+        if self._scheduling:
+            # Completions reported synchronously while starting the tasks.
+            self._needs_scheduling = True
+            return
+        self._scheduling = True
+        try:
+            self._needs_scheduling = True
+            while self._needs_scheduling:
+                self._needs_scheduling = False
+                for name, task in self._tasks.items():
+                    if name in self._states:
+                        continue
+                    dependency_states = [self._states.get(dependency) for dependency in task.get('dependencies', [])]
+                    if any(state in (None, 'Running') for state in dependency_states):
+                        continue
+                    if any(state in ('Failed', 'Omitted') for state in dependency_states):
+                        self._finish_task(name, 'Omitted', None)
+                        continue
+                    self._start_task(name, task)
+        finally:
+            self._scheduling = False
+
+        if not self._done and len(self._states) == len(self._tasks) and 'Running' not in self._states.values():
+            self._done = True
+            self._finish()
+
+    def _lookup(self, name: str, item=None) -> Optional[str]:
+        if name.startswith('inputs.parameters.'):
+            return self._parameters.get(name[len('inputs.parameters.'):])
+        if name.startswith('tasks.'):
+            parts = name.split('.')
+            if len(parts) == 5 and parts[2] == 'outputs' and parts[3] == 'parameters':
+                outputs = self._outputs.get(parts[1])
+                if outputs is None or parts[4] not in outputs.parameters:
+                    raise _ResolutionError('Cannot resolve "{{{{{}}}}}": the task "{}" did not produce it.'.format(name, parts[1]))
+                return outputs.parameters[parts[4]]
+            return None
+        if item is not None and (name == 'item' or name.startswith('item.')):
+            value = item
+            for key in name.split('.')[1:]:
+                value = value[key]
+            return _item_to_string(value)
+        return self._workflow.lookup_global(name)
+
+    def _resolve_artifact(self, reference: str) -> Optional[str]:
+        match = re.match(r'^{{\s*(inputs\.artifacts\.([^.}]+)|tasks\.([^.}]+)\.outputs\.artifacts\.([^.}]+))\s*}}$', reference)
+        if not match:
+            raise _ResolutionError('Unsupported artifact reference: "{}".'.format(reference))
+        if match.group(2):
+            return self._artifacts.get(match.group(2))
+        outputs = self._outputs.get(match.group(3))
+        if outputs is None or match.group(4) not in outputs.artifacts:
+            raise _ResolutionError('Cannot resolve "{}": the task "{}" did not produce it.'.format(reference, match.group(3)))
+        return outputs.artifacts[match.group(4)]
+
+    def _resolve_arguments(self, task: dict, item=None):
+        arguments = task.get('arguments', {})
+        parameters = {
+            parameter['name']: _resolve_placeholders(str(parameter.get('value', '')), lambda name: self._lookup(name, item))
+            for parameter in arguments.get('parameters', [])
+        }
+        artifacts = {}
+        for artifact in arguments.get('artifacts', []):
+            if 'from' in artifact:
+                path = self._resolve_artifact(artifact['from'])
+                if path is not None:
+                    artifacts[artifact['name']] = path
+        return parameters, artifacts
+
+    def _start_task(self, name: str, task: dict):
+        self._states[name] = 'Running'
+        try:
+            if 'when' in task:
+                condition = _resolve_placeholders(task['when'], self._lookup)
+                if not _evaluate_condition(condition):
+                    self._finish_task(name, 'Skipped', None)
+                    return
+
+            if 'withItems' in task or 'withParam' in task:
+                if 'withItems' in task:
+                    items = task['withItems']
+                else:
+                    items = json.loads(_resolve_placeholders(task['withParam'], self._lookup))
+                    if not isinstance(items, list):
+                        raise _ResolutionError('withParam value of task "{}" is not a JSON list.'.format(name))
+                iterations = [self._resolve_arguments(task, item) for item in items]
+            else:
+                iterations = None
+                parameters, artifacts = self._resolve_arguments(task)
+        except (_ResolutionError, ValueError, KeyError, TypeError) as e:
+            task_result = LocalTaskResult(self._child_id(name), task['template'], 'Failed')
+            task_result.error = str(e)
+            logging.error('Task "%s" has failed: %s', task_result.task_id, e)
+            self._workflow.task_results.append(task_result)
+            self._finish_task(name, 'Failed', None)
+            return
+
+        if iterations is None:
+            self._workflow.start_template(
+                self._child_id(name), task['template'], parameters, artifacts,
+                lambda status, outputs: self._finish_task(name, status, outputs))
+            return
+
+        if not iterations:
+            self._finish_task(name, 'Succeeded', _TaskOutputs())
+            return
+        iteration_results = [None] * len(iterations)
+
+        def on_iteration_done(index, status, outputs):
+            iteration_results[index] = (status, outputs)
+            if all(iteration_results):
+                statuses = [status for status, _ in iteration_results]
+                # Like Argo, the output parameters of the loop iterations are aggregated in JSON lists.
+                aggregated_outputs = _TaskOutputs()
+                if all(status == 'Succeeded' for status in statuses):
+                    parameter_names = set.intersection(*[set(outputs.parameters) for _, outputs in iteration_results])
+                    for parameter_name in parameter_names:
+                        aggregated_outputs.parameters[parameter_name] = json.dumps(
+                            [outputs.parameters[parameter_name] for _, outputs in iteration_results])
+                self._finish_task(name, 'Failed' if 'Failed' in statuses else 'Succeeded', aggregated_outputs)
+
+        for index, (parameters, artifacts) in enumerate(iterations):
+            self._workflow.start_template(
+                '{}({})'.format(self._child_id(name), index), task['template'], parameters, artifacts,
+                lambda status, outputs, index=index: on_iteration_done(index, status, outputs))
+
+    def _finish_task(self, name: str, status: str, outputs: Optional[_TaskOutputs]):
+        if status in ('Skipped', 'Omitted'):
+            self._workflow.task_results.append(LocalTaskResult(self._child_id(name), self._tasks[name]['template'], status))
+        self._states[name] = status
+        if outputs is not None:
+            self._outputs[name] = outputs
+        self._schedule()
+
+    def _finish(self):
+        status = 'Succeeded'
+        if any(state in ('Failed', 'Omitted') for state in self._states.values()):
+            status = 'Failed'
+        outputs = _TaskOutputs()
+        template_outputs = self._template.get('outputs', {})
+        for parameter in template_outputs.get('parameters', []):
+            try:
+                outputs.parameters[parameter['name']] = _resolve_placeholders(
+                    parameter.get('valueFrom', {}).get('parameter', ''), self._lookup)
+            except _ResolutionError:
+                # The producer task was skipped.
+                pass
+        for artifact in template_outputs.get('artifacts', []):
+            try:
+                path = self._resolve_artifact(artifact.get('from', ''))
+            except _ResolutionError:
+                path = None
+            if path is not None:
+                outputs.artifacts[artifact['name']] = path
+        self._on_done(status, outputs)
@@ -14,10 +14,11 @@
 
 __all__ = [
     'run_pipeline_func_on_cluster',
+    'run_pipeline_func_locally',
 ]
 
 
-from typing import Mapping, Callable
+from typing import Any, Mapping, Callable
 
 from . import Client
 from . import dsl
@@ -52,3 +53,61 @@ def run_pipeline_func_on_cluster(
     '''
     kfp_client = kfp_client or Client()
     return kfp_client.create_run_from_pipeline_func(pipeline_func, arguments, run_name, experiment_name, pipeline_conf)
+
+
+def run_pipeline_func_locally(
+    pipeline_func: Callable,
+    arguments: Mapping[str, Any] = None,
+    output_dir: str = None,
+    max_parallelism: int = None,
+    container_runtime: str = None,
+    cache_dir: str = None,
+    max_cache_staleness: str = None,
+    pipeline_conf: dsl.PipelineConf = None):
+    '''Runs pipeline on the local machine.
+
+    This command compiles the pipeline function and executes the tasks locally,
+    running up to max_parallelism tasks at the same time. The output artifacts
+    are passed between the tasks using hard links in the output directory.
+
+    Feature stage:
+    [Alpha](https://github.com/kubeflow/pipelines/blob/07328e5094ac2981d3059314cc848fbb71437a76/docs/release/feature-stages.md#alpha)
+
+    Args:
+      pipeline_func: A function that describes a pipeline by calling components
+      and composing them into execution graph.
+      arguments: Arguments to the pipeline function provided as a dict.
+      output_dir: Optional. The directory where the task outputs and logs are
+        stored. A temporary directory is created if not set.
+      max_parallelism: Optional. The maximum number of the concurrently running
+        tasks. Defaults to the number of CPUs.
+      container_runtime: Optional. The container runtime executable (e.g.
+        "docker" or "podman"). When set, the tasks are run in containers.
+        Otherwise the container commands are run directly on the local machine,
+        which works for the lightweight Python components.
+      cache_dir: Optional. Enables the execution caching. The outputs of the
+        tasks are stored in this directory and reused by the later runs when the
+        component, the input arguments and the input artifact contents match.
+      max_cache_staleness: Optional. The maximum age of the reused cached
+        outputs as an RFC3339 duration (e.g. "P30DT1H22M3S").
+      pipeline_conf: Optional. kfp.dsl.PipelineConf instance. Can specify op
+        transforms, image pull secrets and other pipeline-level configuration
+        options.
+
+    Returns:
+      LocalRunResult with the run status and the outputs and timing of every task.
+    '''
+    from .compiler import Compiler
+    from ._local_cache import LocalExecutionCache
+    from ._local_runner import LocalRunner
+
+    workflow = Compiler()._create_workflow(pipeline_func, pipeline_conf=pipeline_conf)
+    runner = LocalRunner(
+        workflow,
+        run_dir=output_dir,
+        max_parallelism=max_parallelism,
+        container_runtime=container_runtime,
+        cache=LocalExecutionCache(cache_dir) if cache_dir else None,
+        max_cache_staleness=max_cache_staleness,
+    )
+    return runner.run(arguments)
@@ -0,0 +1,246 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Auth token cache shared by the clients.
+
+The tokens are cached in memory and in a JSON file keyed by the token source,
+so the clients of the process and the concurrently running processes reuse
+the same token instead of making an OAuth round-trip every time a client is
+created. The file is locked while a token is fetched, so the processes that
+need the same token at the same time fetch it only once.
+
+A token is refreshed in a background thread shortly before it expires, as
+long as it has been used since it was fetched, so the requests of the clients
+do not wait for the refresh.
+"""
+
+__all__ = [
+    'TokenCache',
+    'get_default_token_cache',
+]
+
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+_DEFAULT_CACHE_PATH = os.path.expanduser('~/.config/kfp/token_cache.json')
+# The tokens refresh slightly before they expire, so the requests never use an
+# expired token.
+_DEFAULT_REFRESH_MARGIN_SECONDS = 5 * 60
+# The lifetime of the tokens without the known expiry time. The Google access
+# and ID tokens live for 1 hour.
+_DEFAULT_TOKEN_LIFETIME_SECONDS = 60 * 60
+_REFRESH_RETRY_SECONDS = 30
+
+# Fetches the token. Returns the token and its expiry time as a Unix timestamp
+# (None if unknown) or None if there is no token.
+TokenFetcher = Callable[[], Optional[Tuple[str, Optional[float]]]]
+
+
+class _CachedToken:
+
+    def __init__(self, token: str, expiry: float):
+        self.token = token
+        self.expiry = expiry
+        self.used = False
+        self.refresh_timer = None
+
+
+class TokenCache:
+    """Caches the auth tokens and refreshes them before they expire.
+
+    Args:
+        cache_path: The JSON file shared by the processes. If None, the tokens
+            are only shared by the clients of the current process.
+        refresh_margin_seconds: How long before the expiry the tokens are
+            refreshed.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = _DEFAULT_CACHE_PATH,
+        refresh_margin_seconds: float = _DEFAULT_REFRESH_MARGIN_SECONDS,
+    ):
+        self._cache_path = cache_path
+        self._refresh_margin_seconds = refresh_margin_seconds
+        self._tokens = {}
+        self._lock = threading.RLock()
+        # Serializes the fetches of the foreground and the background threads.
+        self._fetch_lock = threading.Lock()
+
+    def get_token(self, key: str, fetch_token: TokenFetcher) -> Optional[str]:
+        """Returns the cached token or fetches a new one.
+
+        Args:
+            key: The cache key that identifies the token source (the
+                credentials and the audience).
+            fetch_token: Fetches the token when there is no fresh cached one.
+
+        Returns:
+            The token or None if fetch_token did not return a token.
+        """
+        with self._lock:
+            cached_token = self._tokens.get(key)
+            if cached_token is None or not self._is_fresh(cached_token.expiry):
+                cached_token = self._load_or_fetch_token(key, fetch_token)
+                if cached_token is None:
+                    return None
+            cached_token.used = True
+            return cached_token.token
+
+    def clear(self):
+        """Forgets the tokens cached in memory and stops refreshing them."""
+        with self._lock:
+            for cached_token in self._tokens.values():
+                if cached_token.refresh_timer:
+                    cached_token.refresh_timer.cancel()
+            self._tokens.clear()
+
+    def _is_fresh(self, expiry: float) -> bool:
+        return time.time() < expiry - self._refresh_margin_seconds
+
+    def _load_or_fetch_token(self, key: str, fetch_token: TokenFetcher) -> Optional[_CachedToken]:
+        entry = self._load_or_fetch_entry(key, fetch_token)
+        if entry is None:
+            return None
+        return self._set_token(key, fetch_token, entry)
+
+    def _load_or_fetch_entry(self, key: str, fetch_token: TokenFetcher) -> Optional[dict]:
+        with self._fetch_lock, self._lock_cache_file():
+            entry = self._read_cache_file().get(key)
+            if entry and self._is_fresh(entry['expiry']):
+                # Another process has already fetched the token.
+                return entry
+            fetch_result = fetch_token()
+            if not fetch_result or not fetch_result[0]:
+                return None
+            token, expiry = fetch_result
+            if expiry is None:
+                expiry = time.time() + _DEFAULT_TOKEN_LIFETIME_SECONDS
+            entry = {'token': token, 'expiry': expiry}
+            self._update_cache_file(key, entry)
+            return entry
+
+    def _set_token(self, key: str, fetch_token: TokenFetcher, entry: dict) -> _CachedToken:
+        previous_token = self._tokens.get(key)
+        if previous_token and previous_token.refresh_timer:
+            previous_token.refresh_timer.cancel()
+        cached_token = _CachedToken(entry['token'], entry['expiry'])
+        self._tokens[key] = cached_token
+        # The tokens that are fetched already close to their expiry are not
+        # refreshed in a loop.
+        refresh_time = max(cached_token.expiry - self._refresh_margin_seconds, time.time() + _REFRESH_RETRY_SECONDS)
+        self._schedule_refresh(key, fetch_token, cached_token, refresh_time)
+        return cached_token
+
+    def _schedule_refresh(self, key: str, fetch_token: TokenFetcher, cached_token: _CachedToken, refresh_time: float):
+        timer = threading.Timer(
+            max(0, refresh_time - time.time()), self._refresh_token,
+            args=(key, fetch_token, cached_token))
+        timer.daemon = True
+        cached_token.refresh_timer = timer
+        timer.start()
+
+    def _refresh_token(self, key: str, fetch_token: TokenFetcher, cached_token: _CachedToken):
+        with self._lock:
+            # Nobody has used the token since it was fetched, so the next
+            # get_token call fetches a new one.
+            if self._tokens.get(key) is not cached_token or not cached_token.used:
+                return
+        # The clients keep using the current token while the new one is
+        # fetched.
+        try:
+            entry = self._load_or_fetch_entry(key, fetch_token)
+        except Exception as e:
+            logging.warning('Failed to refresh the auth token: %s', e)
+            entry = None
+        with self._lock:
+            if self._tokens.get(key) is not cached_token:
+                return
+            if entry is not None:
+                self._set_token(key, fetch_token, entry)
+            elif time.time() + _REFRESH_RETRY_SECONDS < cached_token.expiry:
+                self._schedule_refresh(key, fetch_token, cached_token, time.time() + _REFRESH_RETRY_SECONDS)
+
+    @contextlib.contextmanager
+    def _lock_cache_file(self):
+        if not self._cache_path or fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+        with open(self._cache_path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_cache_file(self) -> dict:
+        if not self._cache_path:
+            return {}
+        try:
+            with open(self._cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_cache_file(self, key: str, entry: dict):
+        if not self._cache_path:
+            return
+        entries = {
+            other_key: other_entry
+            for other_key, other_entry in self._read_cache_file().items()
+            if other_entry.get('expiry', 0) > time.time()
+        }
+        entries[key] = entry
+        cache_dir = os.path.dirname(self._cache_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # The tokens are secrets. mkstemp creates the file readable only by
+            # the user.
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix='.token_cache')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self._cache_path)
+        except OSError as e:
+            logging.warning('Failed to write the auth token cache %s: %s', self._cache_path, e)
+
+
+_default_token_cache = None
+_default_token_cache_lock = threading.Lock()
+
+
+def get_default_token_cache() -> TokenCache:
+    """Returns the token cache shared by the clients of the process.
+
+    The cache file can be changed using the KFP_TOKEN_CACHE_PATH environment
+    variable. Setting it to an empty string disables the cache file.
+    """
+    global _default_token_cache
+    with _default_token_cache_lock:
+        if _default_token_cache is None:
+            _default_token_cache = TokenCache(
+                cache_path=os.environ.get('KFP_TOKEN_CACHE_PATH', _DEFAULT_CACHE_PATH) or None)
+        return _default_token_cache
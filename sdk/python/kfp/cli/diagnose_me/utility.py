@@ -14,9 +14,24 @@
 # limitations under the License.
 """Supporting tools and classes for diagnose_me."""
 
+from concurrent import futures
 import json
 import subprocess
-from typing import List, Text
+import time
+from typing import Callable, Hashable, Iterator, List, Mapping, Optional, Text, Tuple
+
+# Timeout applied to the commands that are executed without an explicit one.
+_default_timeout = None
+
+
+def set_default_timeout(timeout: Optional[float]):
+  """Sets the default timeout in seconds of the executed commands.
+
+  Args:
+    timeout: The timeout in seconds. None disables the timeout.
+  """
+  global _default_timeout
+  _default_timeout = timeout
 
 
 class ExecutorResponse(object):
@@ -30,10 +45,13 @@ class ExecutorResponse(object):
   represent the underlying data instaed of dict for various response types.
   """
 
-  def execute_command(self, command_list: List[Text]):
+  def execute_command(self,
+                      command_list: List[Text],
+                      timeout: Optional[float] = None):
     """Executes the command in command_list.
 
-    sets values for _stdout,_std_err, and returncode accordingly.
+    sets values for _stdout,_std_err, and returncode accordingly. The command
+    is killed and reported as failed when it does not finish in time.
 
     TODO(): This method is kept in ExecutorResponse for simplicity, however this
     deviates from MVP design pattern. It should be factored out in future.
@@ -41,23 +59,42 @@ class ExecutorResponse(object):
     Args:
       command_list: A List of strings that represts the command and parameters
         to be executed.
+      timeout: Timeout in seconds. The default timeout set by
+        set_default_timeout is used if not specified.
 
     Returns:
       Instance of utility.ExecutorResponse.
     """
-
+    if timeout is None:
+      timeout = _default_timeout
+    self._timed_out = False
+    start_time = time.monotonic()
     try:
       # TODO() switch to process.run to simplify the code.
       process = subprocess.Popen(
           command_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-      stdout, stderr = process.communicate()
-      self._stdout = stdout.decode('utf-8')
-      self._stderr = stderr.decode('utf-8')
-      self._returncode = process.returncode
+      try:
+        stdout, stderr = process.communicate(timeout=timeout)
+        self._stdout = stdout.decode('utf-8')
+        self._stderr = stderr.decode('utf-8')
+        self._returncode = process.returncode
+      except subprocess.TimeoutExpired:
+        # The output is not collected, since the orphaned child processes of
+        # the command can keep the pipes open.
+        process.kill()
+        process.wait()
+        process.stdout.close()
+        process.stderr.close()
+        self._timed_out = True
+        self._stdout = ''
+        self._stderr = 'Command "%s" timed out after %s seconds.' % (
+            ' '.join(command_list), timeout)
+        self._returncode = process.returncode
     except OSError as e:
       self._stderr = e
       self._stdout = ''
       self._returncode = e.errno
+    self._latency = time.monotonic() - start_time
     self._parse_raw_input()
     return self
 
@@ -88,3 +125,42 @@ class ExecutorResponse(object):
   @property
   def stderr(self):
     return self._stderr
+
+  @property
+  def timed_out(self) -> bool:
+    """Returns true if the command was killed after the timeout."""
+    return getattr(self, '_timed_out', False)
+
+  @property
+  def latency(self) -> Optional[float]:
+    """Execution time of the command in seconds."""
+    return getattr(self, '_latency', None)
+
+
+def execute_in_parallel(
+    tasks: Mapping[Hashable, Callable[[], ExecutorResponse]],
+    max_workers: int,
+    on_completed: Optional[Callable[[Hashable, ExecutorResponse], None]] = None
+) -> Iterator[Tuple[Hashable, ExecutorResponse]]:
+  """Executes the tasks concurrently using a bounded thread pool.
+
+  Args:
+    tasks: Functions returning the command responses keyed by the command.
+    max_workers: The maximum number of concurrently executed tasks.
+    on_completed: Called with the key and the response of every task as soon as
+      it completes (in the completion order). Can be used to report progress.
+
+  Yields:
+    (key, response) pairs in the order of tasks. Every pair is yielded as soon
+    as its task and all the preceding ones complete.
+  """
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    future_to_key = {
+        executor.submit(task): key for key, task in tasks.items()
+    }
+    if on_completed:
+      for future in future_to_key:
+        future.add_done_callback(
+            lambda future: on_completed(future_to_key[future], future.result()))
+    for future, key in future_to_key.items():
+      yield key, future.result()
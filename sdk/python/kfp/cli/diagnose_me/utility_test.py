@@ -14,6 +14,9 @@
 # limitations under the License.
 """Tests for diagnose_me.utility."""
 
+import sys
+import threading
+import time
 import unittest
 from . import utility
 
@@ -38,6 +41,65 @@ class UtilityTest(unittest.TestCase):
     self.assertEqual(response._json, '"non-json string"')
     self.assertEqual(response._parsed_output, 'non-json string')
 
+  def test_execute_command_latency(self):
+    """Testing the command output and execution time are captured."""
+    response = utility.ExecutorResponse().execute_command(
+        [sys.executable, '-c', 'print(\'{"key": 1}\')'])
+
+    self.assertFalse(response.has_error)
+    self.assertFalse(response.timed_out)
+    self.assertEqual(response.parsed_output, {'key': 1})
+    self.assertGreater(response.latency, 0)
+
+  def test_execute_command_timeout(self):
+    """Testing the hung commands are killed after the timeout."""
+    response = utility.ExecutorResponse().execute_command(
+        [sys.executable, '-c', 'import time; time.sleep(60)'], timeout=0.5)
+
+    self.assertTrue(response.has_error)
+    self.assertTrue(response.timed_out)
+    self.assertIn('timed out', response.stderr)
+    self.assertLess(response.latency, 30)
+
+  def test_execute_in_parallel(self):
+    """Testing the results keep the task order and the tasks run concurrently."""
+    running_count = 0
+    max_running_count = 0
+    lock = threading.Lock()
+
+    def make_task(delay):
+
+      def task():
+        nonlocal running_count, max_running_count
+        with lock:
+          running_count += 1
+          max_running_count = max(max_running_count, running_count)
+        time.sleep(delay)
+        with lock:
+          running_count -= 1
+        response = utility.ExecutorResponse()
+        response._stdout = str(delay)
+        response._returncode = 0
+        response._parse_raw_input()
+        return response
+
+      return task
+
+    delays = [0.3, 0.1, 0.2, 0.0, 0.1]
+    completed = []
+    results = list(
+        utility.execute_in_parallel(
+            {index: make_task(delay) for index, delay in enumerate(delays)},
+            max_workers=2,
+            on_completed=lambda key, response: completed.append(key)))
+
+    self.assertEqual([key for key, _ in results], [0, 1, 2, 3, 4])
+    self.assertEqual([response.parsed_output for _, response in results],
+                     delays)
+    self.assertEqual(sorted(completed), [0, 1, 2, 3, 4])
+    self.assertNotEqual(completed, [0, 1, 2, 3, 4])
+    self.assertEqual(max_running_count, 2)
+
 
 if __name__ == '__main__':
   unittest.main()
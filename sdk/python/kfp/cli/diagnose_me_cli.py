@@ -1,15 +1,27 @@
 # Lint as: python3
 """CLI interface for KFP diagnose_me tool."""
 
+import functools
 import json as json_library
 import sys
-from typing import Dict, Text
+import threading
+from typing import Dict, List, Text
 import click
 from .diagnose_me import dev_env
 from .diagnose_me import gcp
 from .diagnose_me import kubernetes_cluster as k8
 from .diagnose_me import utility
 
+_DEFAULT_PARALLELISM = 8
+_DEFAULT_TIMEOUT_SECONDS = 60
+
+# Command groups that can be selected using --only.
+_COMMAND_GROUPS = {
+    'gcp': list(gcp.Commands),
+    'kubernetes': list(k8.Commands),
+    'dev_env': list(dev_env.Commands),
+}
+
 
 @click.group()
 def diagnose_me():
@@ -34,14 +46,36 @@ def diagnose_me():
     type=Text,
     help='Namespace to use for Kubernetes cluster.all-namespaces is used if not specified.'
 )
+@click.option(
+    '--only',
+    type=Text,
+    multiple=True,
+    help='Collect only the specified commands (e.g. GET_PODS) or command '
+    'groups (%s). Can be repeated or comma separated. All commands are '
+    'collected if not specified.' % ', '.join(_COMMAND_GROUPS))
+@click.option(
+    '--parallelism',
+    type=click.IntRange(min=1),
+    default=_DEFAULT_PARALLELISM,
+    show_default=True,
+    help='Maximum number of commands executed concurrently.')
+@click.option(
+    '--timeout',
+    type=click.FloatRange(min=0),
+    default=_DEFAULT_TIMEOUT_SECONDS,
+    show_default=True,
+    help='Timeout in seconds of every command. 0 disables the timeout.')
 @click.pass_context
-def diagnose_me(ctx, json, project_id, namespace):
+def diagnose_me(ctx, json, project_id, namespace, only, parallelism, timeout):
   """Runs environment diagnostic with specified parameters.
 
   Feature stage:
   [Alpha](https://github.com/kubeflow/pipelines/blob/07328e5094ac2981d3059314cc848fbb71437a76/docs/release/feature-stages.md#alpha)
 
   """
+  commands = _select_commands(only)
+  utility.set_default_timeout(timeout or None)
+
   # validate kubectl, gcloud , and gsutil exist
   local_env_gcloud_sdk = gcp.get_gcp_configuration(
       gcp.Commands.GET_GCLOUD_VERSION,
@@ -57,20 +91,79 @@ def diagnose_me(ctx, json, project_id, namespace):
   click.echo('Collecting diagnostic information ...', file=sys.stderr)
 
   # default behaviour dump all configurations
-  results = {}
-  for gcp_command in gcp.Commands:
-    results[gcp_command] = gcp.get_gcp_configuration(
-        gcp_command, project_id=project_id, human_readable=not json)
+  tasks = {}
+  for command in commands:
+    if isinstance(command, gcp.Commands):
+      tasks[command] = functools.partial(
+          gcp.get_gcp_configuration,
+          command,
+          project_id=project_id,
+          human_readable=not json)
+    elif isinstance(command, k8.Commands):
+      tasks[command] = functools.partial(
+          k8.get_kubectl_configuration, command, human_readable=not json)
+    else:
+      tasks[command] = functools.partial(
+          dev_env.get_dev_env_configuration, command, human_readable=not json)
+
+  completed_count = 0
+  progress_lock = threading.Lock()
+
+  def report_progress(command, response: utility.ExecutorResponse):
+    nonlocal completed_count
+    with progress_lock:
+      completed_count += 1
+      click.echo(
+          '[%d/%d] %s %s in %.2fs' %
+          (completed_count, len(tasks), command.name,
+           'timed out' if response.timed_out else
+           'failed' if response.has_error else 'done', response.latency or 0),
+          file=sys.stderr)
+
+  results = utility.execute_in_parallel(
+      tasks, max_workers=parallelism, on_completed=report_progress)
+  if json:
+    print_to_sdtout(dict(results), human_readable=False)
+  else:
+    # The sections are printed in the command order as soon as they are ready.
+    for command, response in results:
+      if not response.has_error:
+        print_to_sdtout({command: response}, human_readable=True)
 
-  for k8_command in k8.Commands:
-    results[k8_command] = k8.get_kubectl_configuration(
-        k8_command, human_readable=not json)
 
-  for dev_env_command in dev_env.Commands:
-    results[dev_env_command] = dev_env.get_dev_env_configuration(
-        dev_env_command, human_readable=not json)
+def _select_commands(only: List[Text]) -> List:
+  """Returns the commands selected by the --only values in the default order.
 
-  print_to_sdtout(results, not json)
+  Args:
+    only: Command names or command group names. Every value can contain
+      several comma separated names. All commands are selected if empty.
+
+  Raises:
+    click.BadParameter: if a name is not a known command or command group.
+  """
+  all_commands = [
+      command for group in _COMMAND_GROUPS.values() for command in group
+  ]
+  names = [
+      name.strip() for value in only for name in value.split(',')
+      if name.strip()
+  ]
+  if not names:
+    return all_commands
+
+  commands_by_name = {command.name: command for command in all_commands}
+  selected = set()
+  for name in names:
+    if name.lower() in _COMMAND_GROUPS:
+      selected.update(_COMMAND_GROUPS[name.lower()])
+    elif name.upper() in commands_by_name:
+      selected.add(commands_by_name[name.upper()])
+    else:
+      raise click.BadParameter(
+          'Unknown command or command group "%s". Known names: %s.' %
+          (name, ', '.join(list(_COMMAND_GROUPS) + list(commands_by_name))),
+          param_hint='--only')
+  return [command for command in all_commands if command in selected]
 
 
 def print_to_sdtout(results: Dict[str, utility.ExecutorResponse],
@@ -81,12 +174,17 @@ def print_to_sdtout(results: Dict[str, utility.ExecutorResponse],
     results: A dictionary with key:command names and val: Execution response
     human_readable: Print results in human readable format. If set to True
       command names will be printed as visual delimiters in new lines. If False
-      results are printed as a dictionary with command as key.
+      results are printed as a dictionary with command as key. The execution
+      time of every command in seconds is printed under the "latency_seconds"
+      key.
   """
 
   output_dict = {}
+  latency_dict = {}
   human_readable_result = []
   for key, val in results.items():
+    latency_dict[key.name] = (
+        round(val.latency, 3) if val.latency is not None else None)
     if val.has_error:
       output_dict[
           key.
@@ -101,6 +199,7 @@ def print_to_sdtout(results: Dict[str, utility.ExecutorResponse],
   if human_readable:
     result = '\n'.join(human_readable_result)
   else:
+    output_dict['latency_seconds'] = latency_dict
     result = json_library.dumps(
         output_dict, sort_keys=True, indent=2, separators=(',', ': '))
 
@@ -0,0 +1,342 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batch compilation of many pipelines across a pool of warm worker processes.
+
+Each `dsl-compile` invocation pays for importing the SDK and the user module.
+When compiling hundreds of pipelines, the batch mode amortizes the SDK import
+over a pool of long-lived workers and shares downloaded component files
+between them through an on-disk cache.
+"""
+
+import concurrent.futures
+import glob
+import importlib
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from typing import Iterable, List, NamedTuple, Optional, TextIO
+
+from ..components._yaml_utils import load_yaml
+
+
+class BatchCompileEntry(NamedTuple):
+  """A single pipeline to compile in batch mode.
+
+  Exactly one of `py` (path to a python file) and `module` (importable module
+  name) must be specified.
+  """
+  output: str
+  py: Optional[str] = None
+  module: Optional[str] = None
+  function: Optional[str] = None
+
+
+class BatchCompileResult(NamedTuple):
+  entry: BatchCompileEntry
+  duration_seconds: float
+  error: Optional[str] = None
+
+
+def load_manifest(manifest_path: str) -> List[BatchCompileEntry]:
+  """Loads batch entries from a YAML or JSON manifest file.
+
+  The manifest is a list of mappings with the `output` key and either the
+  `py` or the `module` key, plus an optional `function` key. Relative `py`
+  and `output` paths are resolved against the manifest directory.
+
+  Example::
+
+    - py: pipelines/training.py
+      output: out/training.yaml
+    - module: my_project.pipelines.scoring
+      function: scoring_pipeline
+      output: out/scoring.tar.gz
+  """
+  with open(manifest_path, 'r') as manifest_file:
+    manifest = load_yaml(manifest_file.read())
+  if isinstance(manifest, dict):
+    manifest = manifest.get('pipelines')
+  if not isinstance(manifest, list):
+    raise ValueError(
+        'The manifest "{}" must contain a list of pipeline entries.'.format(
+            manifest_path))
+
+  base_dir = os.path.dirname(os.path.abspath(manifest_path))
+  entries = []
+  for index, item in enumerate(manifest):
+    if not isinstance(item, dict):
+      raise ValueError('Manifest entry #{} must be a mapping. Got: {}'.format(
+          index, item))
+    unknown_keys = set(item) - set(BatchCompileEntry._fields)
+    if unknown_keys:
+      raise ValueError('Manifest entry #{} has unknown keys: {}'.format(
+          index, sorted(unknown_keys)))
+    if not item.get('output'):
+      raise ValueError('Manifest entry #{} is missing "output".'.format(index))
+    if bool(item.get('py')) == bool(item.get('module')):
+      raise ValueError(
+          'Manifest entry #{} must specify exactly one of "py" and "module".'
+          .format(index))
+    py = item.get('py')
+    entries.append(
+        BatchCompileEntry(
+            output=os.path.join(base_dir, item['output']),
+            py=os.path.join(base_dir, py) if py else None,
+            module=item.get('module'),
+            function=item.get('function'),
+        ))
+  return entries
+
+
+def entries_from_globs(
+    patterns: Iterable[str],
+    output_dir: str,
+    output_extension: str = '.yaml',
+) -> List[BatchCompileEntry]:
+  """Creates batch entries for every python file matching the glob patterns.
+
+  The output file for `<dir>/<name>.py` is `<output_dir>/<name><extension>`.
+  """
+  py_files = sorted(
+      set(
+          os.path.abspath(path)
+          for pattern in patterns
+          for path in glob.glob(pattern, recursive=True)
+          if path.endswith('.py')))
+  entries = []
+  seen_outputs = {}
+  for py_file in py_files:
+    name = os.path.splitext(os.path.basename(py_file))[0]
+    output = os.path.join(output_dir, name + output_extension)
+    if output in seen_outputs:
+      raise ValueError(
+          'Files "{}" and "{}" would both be compiled to "{}". '
+          'Use a manifest to specify the output paths.'.format(
+              seen_outputs[output], py_file, output))
+    seen_outputs[output] = py_file
+    entries.append(BatchCompileEntry(output=output, py=py_file))
+  return entries
+
+
+def _init_worker(component_cache_dir: Optional[str]):
+  # Warming up the SDK once per worker so that every compilation only pays
+  # for importing the user module.
+  import kfp.components
+  import kfp.dsl
+  import kfp.compiler
+  if component_cache_dir:
+    kfp.components._components._set_component_cache_dir(component_cache_dir)
+
+
+def _is_module_owned_by_entry(module, entry: BatchCompileEntry,
+                              module_name: Optional[str]) -> bool:
+  if entry.py:
+    module_file = getattr(module, '__file__', None)
+    entry_dir = os.path.dirname(os.path.abspath(entry.py))
+    return bool(module_file) and os.path.abspath(module_file).startswith(
+        entry_dir + os.sep)
+  top_level_package = entry.module.split('.')[0]
+  return module_name == top_level_package or module_name.startswith(
+      top_level_package + '.')
+
+
+def _compile_entry(entry: BatchCompileEntry, type_check: bool,
+                   deduplicate_templates: bool = False,
+                   deterministic: bool = False) -> BatchCompileResult:
+  from .main import PipelineCollectorContext, _compile_pipeline_function
+
+  start_time = time.time()
+  modules_before = set(sys.modules)
+  module_name = None
+  try:
+    output_dir = os.path.dirname(os.path.abspath(entry.output))
+    os.makedirs(output_dir, exist_ok=True)
+    with PipelineCollectorContext() as pipeline_funcs:
+      if entry.py:
+        py_dir = os.path.dirname(os.path.abspath(entry.py))
+        module_name = os.path.splitext(os.path.basename(entry.py))[0]
+        sys.path.insert(0, py_dir)
+        try:
+          spec = importlib.util.spec_from_file_location(module_name, entry.py)
+          module = importlib.util.module_from_spec(spec)
+          sys.modules[module_name] = module
+          spec.loader.exec_module(module)
+        finally:
+          sys.path.remove(py_dir)
+      else:
+        importlib.import_module(entry.module)
+    _compile_pipeline_function(pipeline_funcs, entry.function, entry.output,
+                               type_check, deduplicate_templates, deterministic)
+    error = None
+  except Exception:
+    error = traceback.format_exc()
+  finally:
+    # Workers are reused, so the user modules must not leak into the next
+    # compilation (different pipelines often have same-named helper modules).
+    for name in set(sys.modules) - modules_before:
+      if _is_module_owned_by_entry(sys.modules[name], entry, name):
+        del sys.modules[name]
+    if module_name:
+      sys.modules.pop(module_name, None)
+  return BatchCompileResult(
+      entry=entry,
+      duration_seconds=time.time() - start_time,
+      error=error,
+  )
+
+
+def _describe_entry(entry: BatchCompileEntry) -> str:
+  source = entry.py or entry.module
+  if entry.function:
+    source += ':' + entry.function
+  return '{} -> {}'.format(source, entry.output)
+
+
+def compile_batch(
+    entries: List[BatchCompileEntry],
+    type_check: bool = True,
+    parallelism: Optional[int] = None,
+    component_cache_dir: Optional[str] = None,
+    progress_stream: Optional[TextIO] = None,
+    deduplicate_templates: bool = False,
+    deterministic: bool = False,
+) -> List[BatchCompileResult]:
+  """Compiles many pipelines using a pool of worker processes.
+
+  Args:
+    entries: The pipelines to compile.
+    type_check: Whether to enable the type check.
+    parallelism: The number of worker processes. Defaults to the number of
+      CPUs. With parallelism of 1 the pipelines are compiled in the current
+      process.
+    component_cache_dir: Directory for the component file cache shared by the
+      workers. Component files loaded by URL are downloaded only once.
+      Defaults to a temporary directory that is removed after the batch.
+    progress_stream: Stream to report the per-pipeline timing to.
+    deduplicate_templates: Whether to share the templates of the tasks that
+      only differ in the argument values.
+    deterministic: Whether to compile the pipelines deterministically, so that
+      the same pipelines always produce the same package bytes.
+
+  Returns:
+    The list of results in the order of the entries.
+  """
+  parallelism = parallelism or os.cpu_count() or 1
+  parallelism = min(parallelism, max(len(entries), 1))
+  temp_cache_dir = None
+  if component_cache_dir is None:
+    temp_cache_dir = tempfile.mkdtemp(prefix='kfp_component_cache_')
+    component_cache_dir = temp_cache_dir
+
+  results = [None] * len(entries)
+
+  def report(index: int, result: BatchCompileResult):
+    results[index] = result
+    if progress_stream is None:
+      return
+    finished_count = sum(1 for result in results if result is not None)
+    progress_stream.write('[{}/{}] {} {:7.2f}s  {}\n'.format(
+        finished_count,
+        len(entries),
+        'FAILED' if result.error else 'OK    ',
+        result.duration_seconds,
+        _describe_entry(result.entry),
+    ))
+    progress_stream.flush()
+
+  try:
+    if parallelism == 1:
+      import kfp.components
+      old_cache_store = kfp.components._components._component_cache_store
+      _init_worker(component_cache_dir)
+      try:
+        for index, entry in enumerate(entries):
+          report(index, _compile_entry(entry, type_check, deduplicate_templates,
+                                       deterministic))
+      finally:
+        kfp.components._components._component_cache_store = old_cache_store
+    else:
+      with concurrent.futures.ProcessPoolExecutor(
+          max_workers=parallelism,
+          initializer=_init_worker,
+          initargs=(component_cache_dir,),
+      ) as executor:
+        future_to_index = {
+            executor.submit(_compile_entry, entry, type_check,
+                            deduplicate_templates, deterministic): index
+            for index, entry in enumerate(entries)
+        }
+        for future in concurrent.futures.as_completed(future_to_index):
+          index = future_to_index[future]
+          try:
+            result = future.result()
+          except Exception:
+            # The worker process died (e.g. killed by the OOM killer).
+            result = BatchCompileResult(
+                entry=entries[index],
+                duration_seconds=0,
+                error=traceback.format_exc(),
+            )
+          report(index, result)
+  finally:
+    if temp_cache_dir:
+      shutil.rmtree(temp_cache_dir, ignore_errors=True)
+
+  return results
+
+
+def format_batch_report(results: List[BatchCompileResult],
+                        wall_time_seconds: Optional[float] = None) -> str:
+  """Formats the summary and the aggregated error report for a batch."""
+  failed_results = [result for result in results if result.error]
+  lines = []
+  for result in failed_results:
+    lines.append('=' * 80)
+    lines.append('FAILED: ' + _describe_entry(result.entry))
+    lines.append(result.error.rstrip())
+  if failed_results:
+    lines.append('=' * 80)
+  summary = 'Compiled {} of {} pipelines'.format(
+      len(results) - len(failed_results), len(results))
+  if failed_results:
+    summary += ', {} failed'.format(len(failed_results))
+  summary += '. Total compilation time: {:.2f}s'.format(
+      sum(result.duration_seconds for result in results))
+  if wall_time_seconds is not None:
+    summary += ', wall time: {:.2f}s'.format(wall_time_seconds)
+  lines.append(summary + '.')
+  return '\n'.join(lines)
+
+
+def write_timing_report(results: List[BatchCompileResult], path: str):
+  """Writes the per-pipeline timing and status as JSON."""
+  with open(path, 'w') as report_file:
+    json.dump(
+        [{
+            'py': result.entry.py,
+            'module': result.entry.module,
+            'function': result.entry.function,
+            'output': result.entry.output,
+            'duration_seconds': round(result.duration_seconds, 3),
+            'succeeded': result.error is None,
+            'error': result.error,
+        } for result in results],
+        report_file,
+        indent=2,
+    )
@@ -87,27 +87,27 @@ def fix_big_data_passing(workflow: dict) -> dict:
                 else:
                     template_input_to_parent_constant_arguments.setdefault((task_template_name, task_input_name), set()).add(argument_value)
 
-            # Indexing DAG outputs (Does DSL compiler produce them?)
-            for dag_output in task.get('outputs', {}).get('parameters', {}):
-                dag_output_name = dag_output['name']
-                output_value = dag_output['value']
-                argument_placeholder_parts = deconstruct_single_placeholder(output_value)
-                placeholder_type = argument_placeholder_parts[0]
-                if not argument_placeholder_parts: # Argument is considered to be constant string
-                    raise RuntimeError('Constant DAG output values are not supported for now.')
-                if placeholder_type == 'inputs':
-                    raise RuntimeError('Pass-through DAG inputs/outputs are not supported')
-                elif placeholder_type == 'tasks':
-                    upstream_task_name = argument_placeholder_parts[1]
-                    assert argument_placeholder_parts[2] == 'outputs'
-                    assert argument_placeholder_parts[3] == 'parameters'
-                    upstream_output_name = argument_placeholder_parts[4]
-                    upstream_template_name = task_name_to_template_name[upstream_task_name]
-                    dag_output_to_parent_template_outputs.setdefault((dag_template_name, dag_output_name), set()).add((upstream_template_name, upstream_output_name))
-                elif placeholder_type == 'item' or placeholder_type == 'workflow' or placeholder_type == 'pod':
-                    raise RuntimeError('DAG output value "{}" is not supported.'.format(output_value))
-                else:
-                    raise AssertionError('Unexpected placeholder type "{}".'.format(placeholder_type))
+        # Indexing DAG outputs. The DSL compiler produces them for the groups (e.g. loops and conditions) whose task outputs are consumed outside.
+        for dag_output in template.get('outputs', {}).get('parameters', []):
+            dag_output_name = dag_output['name']
+            output_value = dag_output.get('valueFrom', {}).get('parameter', '')
+            argument_placeholder_parts = deconstruct_single_placeholder(output_value)
+            if not argument_placeholder_parts: # Argument is considered to be constant string
+                raise RuntimeError('Constant DAG output values are not supported for now.')
+            placeholder_type = argument_placeholder_parts[0]
+            if placeholder_type == 'inputs':
+                raise RuntimeError('Pass-through DAG inputs/outputs are not supported')
+            elif placeholder_type == 'tasks':
+                upstream_task_name = argument_placeholder_parts[1]
+                assert argument_placeholder_parts[2] == 'outputs'
+                assert argument_placeholder_parts[3] == 'parameters'
+                upstream_output_name = argument_placeholder_parts[4]
+                upstream_template_name = task_name_to_template_name[upstream_task_name]
+                dag_output_to_parent_template_outputs.setdefault((dag_template_name, dag_output_name), set()).add((upstream_template_name, upstream_output_name))
+            elif placeholder_type == 'item' or placeholder_type == 'workflow' or placeholder_type == 'pod':
+                raise RuntimeError('DAG output value "{}" is not supported.'.format(output_value))
+            else:
+                raise AssertionError('Unexpected placeholder type "{}".'.format(placeholder_type))
     # Finshed indexing the DAGs
 
     # 2. Search for direct data consumers in container/resource templates and some DAG task attributes (e.g. conditions and loops) to find out which inputs are directly consumed as parameters/artifacts.
@@ -0,0 +1,175 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import copy
+import gzip
+import json
+import warnings
+
+from ..components._naming import _make_name_unique_by_adding_index
+
+
+_LOADER_IMAGE = 'python:3.7-alpine'
+_ITEMS_DATA_PATH = '/tmp/inputs/items/data'
+_ITEMS_OUTPUT_PATH = '/tmp/outputs/items/data'
+# Argo reports the output parameters through a pod annotation and Kubernetes
+# limits the total size of the annotations to 256 KiB. The items are passed as
+# a JSON string inside the JSON annotation value, so they are counted escaped.
+# The rest of the limit is left for the other annotations.
+MAX_ITEMS_OUTPUT_BYTES = 128 * 1024
+
+# Converts the gzipped JSON lines to the JSON array consumed by withParam.
+_LOAD_ITEMS_PROGRAM = '''
+import base64
+import gzip
+import os
+import sys
+
+with open(sys.argv[1], "rb") as f:
+    lines = gzip.decompress(base64.b64decode(f.read())).decode("utf-8").splitlines()
+os.makedirs(os.path.dirname(sys.argv[2]), exist_ok=True)
+with open(sys.argv[2], "w") as f:
+    f.write("[" + ",".join(lines) + "]")
+'''
+
+
+def _split_items_lines(items_lines: list, max_output_bytes: int) -> list:
+    """Splits the item lines into the parts whose loader output fits into max_output_bytes.
+
+    Returns:
+        The list of the parts or None if a single item does not fit.
+    """
+    parts = []
+    part = []
+    # The escaped JSON array: the quotes of the string and the array brackets.
+    part_size = 4
+    for line in items_lines:
+        # The escaped item and the comma.
+        line_size = len(json.dumps(line)) - 2 + 1
+        if 4 + line_size > max_output_bytes:
+            return None
+        if part and part_size + line_size > max_output_bytes:
+            parts.append(part)
+            part = []
+            part_size = 4
+        part.append(line)
+        part_size += line_size
+    parts.append(part)
+    return parts
+
+
+def externalize_loop_items(workflow: dict, threshold_bytes: int, max_output_bytes: int = MAX_ITEMS_OUTPUT_BYTES) -> dict:
+    '''externalize_loop_items moves the big static loop item lists out of the DAG tasks.
+
+    The compiler inlines the static ParallelFor item lists into the withItems attribute of the loop tasks.
+    The item lists with thousands of items make the workflow big and slow to upload, store and render.
+
+    Every withItems list that is bigger than threshold_bytes (when serialized as JSON) is compressed to gzipped JSON lines.
+    The compressed data is passed as a raw input artifact to a generated loader task that outputs the items as a JSON array.
+    The loop task then iterates over the loader task output using withParam.
+    The lists that contain Argo placeholders (e.g. the pipeline parameters) stay inline.
+
+    The loader output is limited to max_output_bytes (escaped), since Argo passes the output parameters through a pod annotation.
+    The bigger lists are split between several loop tasks with their own loader tasks.
+    The lists that cannot be split (the loop outputs are used or a single item is too big) stay inline.
+
+    Args:
+        workflow: The workflow to modify. Modified in place.
+        threshold_bytes: The minimum serialized size of the externalized item lists.
+        max_output_bytes: The maximum escaped size of the item lists output by a loader task.
+
+    Returns:
+        The modified workflow.
+    '''
+    templates = workflow['spec']['templates']
+    template_names = set(template['name'] for template in templates)
+    loader_templates = []
+    for template in templates:
+        dag_tasks = template.get('dag', {}).get('tasks', [])
+        task_names = set(task['name'] for task in dag_tasks)
+        added_tasks = []
+        for task in list(dag_tasks):
+            items = task.get('withItems')
+            if not items:
+                continue
+            items_lines = [json.dumps(item, sort_keys=True) for item in items]
+            if sum(len(line) + 1 for line in items_lines) < threshold_bytes:
+                continue
+            if any('{{' in line for line in items_lines):
+                continue
+
+            parts = _split_items_lines(items_lines, max_output_bytes)
+            if parts is None:
+                warnings.warn('The items of the loop task "{}" stay inline, since an item is too big to be loaded at runtime.'.format(task['name']))
+                continue
+            if len(parts) > 1 and '{{tasks.%s.outputs.' % task['name'] in json.dumps(template):
+                warnings.warn('The items of the loop task "{}" stay inline, since they need to be split and the loop outputs are used.'.format(task['name']))
+                continue
+
+            original_task = copy.deepcopy(task)
+            del original_task['withItems']
+            part_tasks = [task]
+            for _ in parts[1:]:
+                part_task = copy.deepcopy(original_task)
+                part_task['name'] = _make_name_unique_by_adding_index(task['name'], task_names | template_names, '-')
+                task_names.add(part_task['name'])
+                part_tasks.append(part_task)
+                added_tasks.append(part_task)
+            if len(part_tasks) > 1:
+                # The tasks that depend on the loop depend on all its parts.
+                part_names = [part_task['name'] for part_task in part_tasks]
+                for other_task in dag_tasks + added_tasks:
+                    if task['name'] in other_task.get('dependencies', []):
+                        other_task['dependencies'] = sorted(set(other_task['dependencies']) | set(part_names))
+
+            for part_task, part_lines in zip(part_tasks, parts):
+                loader_name = _make_name_unique_by_adding_index(part_task['name'] + '-items', task_names | template_names, '-')
+                task_names.add(loader_name)
+                template_names.add(loader_name)
+                output_name = loader_name + '-items'
+                compressed_items = gzip.compress('\n'.join(part_lines).encode('utf-8'), mtime=0)
+                loader_templates.append({
+                    'name': loader_name,
+                    'container': {
+                        'image': _LOADER_IMAGE,
+                        'command': ['python3', '-u', '-c', _LOAD_ITEMS_PROGRAM, _ITEMS_DATA_PATH, _ITEMS_OUTPUT_PATH],
+                    },
+                    'inputs': {
+                        'artifacts': [{
+                            'name': 'items',
+                            'path': _ITEMS_DATA_PATH,
+                            'raw': {'data': base64.b64encode(compressed_items).decode('ascii')},
+                        }],
+                    },
+                    'outputs': {
+                        'parameters': [{
+                            'name': output_name,
+                            'valueFrom': {'path': _ITEMS_OUTPUT_PATH},
+                        }],
+                    },
+                })
+                added_tasks.append({
+                    'name': loader_name,
+                    'template': loader_name,
+                })
+
+                part_task.pop('withItems', None)
+                part_task['withParam'] = '{{tasks.%s.outputs.parameters.%s}}' % (loader_name, output_name)
+                part_task['dependencies'] = sorted(part_task.get('dependencies', []) + [loader_name])
+        if added_tasks:
+            dag_tasks.extend(added_tasks)
+            dag_tasks.sort(key=lambda task: task['name'])
+    templates.extend(loader_templates)
+    return workflow
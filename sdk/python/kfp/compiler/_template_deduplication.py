@@ -0,0 +1,329 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+
+from ..components._naming import _make_name_unique_by_adding_index
+
+
+TemplateDeduplicationReport = NamedTuple('TemplateDeduplicationReport', [
+    ('template_count_before', int),
+    ('template_count_after', int),
+    ('deduplicated_template_count', int),
+    ('size_before', int),
+    ('size_after', int),
+])
+
+
+_placeholder_regex = re.compile(r'({{[^}]*}})')
+_input_parameter_reference_regex = re.compile(r'{{inputs\.parameters\.([-\w]+)}}')
+_input_artifact_reference_regex = re.compile(r'{{inputs\.artifacts\.([-\w]+)')
+_task_output_reference_regex = re.compile(r'tasks\.([-\w]+)\.outputs\.(parameters|artifacts)\.([-\w]+)')
+
+# Marks the literal string parts that can be replaced by the task arguments.
+_argument_marker = '{{kfp-template-argument}}'
+# Stands for the template name in the names of the template outputs.
+_template_name_marker = '{{kfp-template-name}}'
+
+
+def deduplicate_templates(workflow: dict) -> Tuple[dict, TemplateDeduplicationReport]:
+    '''deduplicate_templates replaces the container templates that only differ in the argument values with shared templates.
+
+    The compiler creates a separate template for every task even when many tasks are created from the same component.
+    Such templates repeat the whole container specification (including the inline program code of the lightweight components) and only differ in the template name, the names of the inputs and outputs and the constant argument values.
+    The size of such workflows can exceed the Kubernetes object size limit.
+
+    Implementation:
+    1. Canonicalize the container templates: remove the template name and give the inputs and outputs position-based names.
+    2. Group the canonical templates that are the same except for the literal parts of the container command-line, environment variable values and annotations.
+    3. For each group with several templates, create a shared template where the literal parts that differ are replaced with new input parameters and name the template by its content hash.
+    4. Point the DAG tasks to the shared templates. Pass the literal values as task arguments and rename the task arguments and the output references.
+
+    The exit handler template is never deduplicated since it cannot receive arguments.
+
+    Args:
+        workflow: The compiled workflow.
+    Returns:
+        The rewritten workflow and the deduplication report.
+    '''
+    size_before = _get_workflow_size(workflow)
+    workflow = copy.deepcopy(workflow)
+    templates = workflow['spec']['templates']
+    exit_handler_template_name = workflow['spec'].get('onExit')
+
+    # 1 + 2. Canonicalizing and grouping the container templates
+    template_groups = OrderedDict() # skeleton -> List[_CanonicalTemplate]
+    for template in templates:
+        if 'container' not in template or template['name'] == exit_handler_template_name:
+            continue
+        canonical_template = _canonicalize_template(template)
+        skeleton = json.dumps(_make_template_skeleton(canonical_template.template), sort_keys=True)
+        template_groups.setdefault(skeleton, []).append(canonical_template)
+
+    # 3. Creating the shared templates
+    template_names = set(template['name'] for template in templates)
+    replaced_templates = {} # template name -> _ReplacedTemplate
+    shared_templates = []
+    for canonical_templates in template_groups.values():
+        if len(canonical_templates) < 2:
+            continue
+        shared_template, template_arguments = _make_shared_template([canonical_template.template for canonical_template in canonical_templates])
+        content_hash = hashlib.sha256(json.dumps(shared_template, sort_keys=True).encode('utf-8')).hexdigest()
+        shared_template_name = _make_name_unique_by_adding_index(canonical_templates[0].name + '-' + content_hash[:10], template_names, '-')
+        template_names.add(shared_template_name)
+        shared_template = json.loads(json.dumps(shared_template).replace(_template_name_marker, shared_template_name))
+        shared_template['name'] = shared_template_name
+        shared_templates.append(shared_template)
+        for canonical_template, arguments in zip(canonical_templates, template_arguments):
+            replaced_templates[canonical_template.name] = _ReplacedTemplate(
+                shared_template_name=shared_template_name,
+                input_renames=canonical_template.input_renames,
+                output_renames={
+                    old_name: new_name.replace(_template_name_marker, shared_template_name)
+                    for old_name, new_name in canonical_template.output_renames.items()
+                },
+                arguments=arguments,
+            )
+
+    # 4. Rewriting the DAG tasks
+    for template in templates:
+        if 'dag' in template:
+            _rewrite_dag_template(template, replaced_templates)
+
+    templates[:] = [template for template in templates if template['name'] not in replaced_templates] + shared_templates
+    templates.sort(key=lambda template: template['name'])
+
+    report = TemplateDeduplicationReport(
+        template_count_before=len(templates) + len(replaced_templates) - len(shared_templates),
+        template_count_after=len(templates),
+        deduplicated_template_count=len(replaced_templates),
+        size_before=size_before,
+        size_after=_get_workflow_size(workflow),
+    )
+    return workflow, report
+
+
+def format_template_deduplication_report(report: TemplateDeduplicationReport) -> str:
+    size_reduction = 1 - report.size_after / report.size_before if report.size_before else 0
+    return 'Replaced {} templates with shared templates. Templates: {} -> {}. Workflow size: {} -> {} bytes ({:.1%} smaller).'.format(
+        report.deduplicated_template_count,
+        report.template_count_before,
+        report.template_count_after,
+        report.size_before,
+        report.size_after,
+        size_reduction,
+    )
+
+
+_CanonicalTemplate = NamedTuple('_CanonicalTemplate', [
+    ('name', str),
+    ('template', dict),
+    ('input_renames', Dict[Tuple[str, str], str]), # (parameters|artifacts, old name) -> new name
+    ('output_renames', Dict[Tuple[str, str], str]), # (parameters|artifacts, old name) -> new name (with the template name marker)
+])
+
+
+_ReplacedTemplate = NamedTuple('_ReplacedTemplate', [
+    ('shared_template_name', str),
+    ('input_renames', Dict[Tuple[str, str], str]),
+    ('output_renames', Dict[Tuple[str, str], str]),
+    ('arguments', Dict[str, str]),
+])
+
+
+def _get_workflow_size(workflow: dict) -> int:
+    # Kubernetes stores the objects as JSON, so the object size limits apply to the JSON size.
+    return len(json.dumps(workflow, separators=(',', ':')).encode('utf-8'))
+
+
+def _map_strings(obj, func, path: tuple = ()):
+    if isinstance(obj, str):
+        return func(obj, path)
+    if isinstance(obj, dict):
+        return {key: _map_strings(value, func, path + (key,)) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_map_strings(value, func, path + (index,)) for index, value in enumerate(obj)]
+    return obj
+
+
+def _is_parametrizable_path(path: tuple) -> bool:
+    # Argo substitutes the input parameter placeholders in these fields when creating the pod.
+    return (
+        path[:2] in [('container', 'command'), ('container', 'args'), ('metadata', 'annotations')]
+        or (path[:2] == ('container', 'env') and path[-1] == 'value')
+    )
+
+
+def _split_literal_parts(value: str) -> List[str]:
+    # The even parts are the literal strings and the odd parts are the placeholders.
+    return _placeholder_regex.split(value)
+
+
+def _canonicalize_template(template: dict) -> _CanonicalTemplate:
+    template_name = template['name']
+    template_body = {key: value for key, value in template.items() if key not in ['name', 'inputs']}
+    template_body_text = json.dumps(template_body, sort_keys=True)
+    inputs = template.get('inputs', {})
+
+    # The input parameter names depend on the upstream tasks, so the parameters are ordered by their first use.
+    def parameter_use_position(name):
+        position = template_body_text.find('{{inputs.parameters.' + name + '}}')
+        return (position < 0, position, name)
+    input_parameter_names = sorted((parameter['name'] for parameter in inputs.get('parameters', [])), key=parameter_use_position)
+    input_artifacts = sorted(inputs.get('artifacts', []), key=lambda artifact: (artifact.get('path', ''), artifact['name']))
+    input_renames = {}
+    for index, name in enumerate(input_parameter_names):
+        input_renames[('parameters', name)] = 'input-{}'.format(index)
+    for index, artifact in enumerate(input_artifacts):
+        input_renames[('artifacts', artifact['name'])] = 'input-artifact-{}'.format(index)
+
+    # The output names are prefixed with the template name.
+    output_renames = {}
+    output_name_prefix = template_name + '-'
+    for output_kind in ['parameters', 'artifacts']:
+        for output in template.get('outputs', {}).get(output_kind, []):
+            if output['name'].startswith(output_name_prefix):
+                output_renames[(output_kind, output['name'])] = _template_name_marker + '-' + output['name'][len(output_name_prefix):]
+
+    def rename_references(value: str, path: tuple) -> str:
+        value = _input_parameter_reference_regex.sub(
+            lambda match: '{{inputs.parameters.' + input_renames.get(('parameters', match.group(1)), match.group(1)) + '}}',
+            value,
+        )
+        value = _input_artifact_reference_regex.sub(
+            lambda match: '{{inputs.artifacts.' + input_renames.get(('artifacts', match.group(1)), match.group(1)),
+            value,
+        )
+        return value
+
+    canonical_template = _map_strings(template_body, rename_references)
+    canonical_inputs = {}
+    if input_parameter_names:
+        canonical_inputs['parameters'] = [{'name': input_renames[('parameters', name)]} for name in input_parameter_names]
+    if input_artifacts:
+        canonical_inputs['artifacts'] = []
+        for artifact in input_artifacts:
+            artifact = copy.deepcopy(artifact)
+            artifact['name'] = input_renames[('artifacts', artifact['name'])]
+            canonical_inputs['artifacts'].append(artifact)
+    if canonical_inputs:
+        canonical_template['inputs'] = canonical_inputs
+    for output_kind in ['parameters', 'artifacts']:
+        for output in canonical_template.get('outputs', {}).get(output_kind, []):
+            output['name'] = output_renames.get((output_kind, output['name']), output['name'])
+
+    return _CanonicalTemplate(
+        name=template_name,
+        template=canonical_template,
+        input_renames=input_renames,
+        output_renames=output_renames,
+    )
+
+
+def _make_template_skeleton(template: dict):
+    def replace_literal_parts(value: str, path: tuple):
+        if not _is_parametrizable_path(path):
+            return value
+        parts = _split_literal_parts(value)
+        parts[::2] = [_argument_marker] * len(parts[::2])
+        return parts
+    return _map_strings(template, replace_literal_parts)
+
+
+def _get_literal_parts(template: dict) -> Dict[tuple, str]:
+    literal_parts = OrderedDict()
+    def collect_literal_parts(value: str, path: tuple):
+        if _is_parametrizable_path(path):
+            for index, part in enumerate(_split_literal_parts(value)[::2]):
+                literal_parts[path + (index * 2,)] = part
+        return value
+    _map_strings(template, collect_literal_parts)
+    return literal_parts
+
+
+def _make_shared_template(templates: List[dict]) -> Tuple[dict, List[Dict[str, str]]]:
+    '''Replaces the literal parts that differ between the templates with input parameters.
+
+    Returns:
+        The shared template and the argument values for each of the original templates.
+    '''
+    literal_parts_list = [_get_literal_parts(template) for template in templates]
+    parameter_names = OrderedDict() # part path -> parameter name
+    for part_path in literal_parts_list[0]:
+        if len(set(literal_parts[part_path] for literal_parts in literal_parts_list)) > 1:
+            parameter_names[part_path] = 'argument-{}'.format(len(parameter_names))
+
+    def replace_literal_parts(value: str, path: tuple):
+        if not _is_parametrizable_path(path):
+            return value
+        parts = _split_literal_parts(value)
+        for index in range(0, len(parts), 2):
+            parameter_name = parameter_names.get(path + (index,))
+            if parameter_name:
+                parts[index] = '{{inputs.parameters.' + parameter_name + '}}'
+        return ''.join(parts)
+
+    shared_template = _map_strings(templates[0], replace_literal_parts)
+    if parameter_names:
+        inputs = shared_template.setdefault('inputs', {})
+        inputs['parameters'] = inputs.get('parameters', []) + [{'name': name} for name in parameter_names.values()]
+
+    template_arguments = [
+        {parameter_name: literal_parts[part_path] for part_path, parameter_name in parameter_names.items()}
+        for literal_parts in literal_parts_list
+    ]
+    return shared_template, template_arguments
+
+
+def _rewrite_dag_template(template: dict, replaced_templates: Dict[str, _ReplacedTemplate]):
+    tasks = template['dag']['tasks']
+    task_name_to_replaced_template = {task['name']: replaced_templates[task['template']] for task in tasks if task['template'] in replaced_templates}
+    if not task_name_to_replaced_template:
+        return
+
+    for task in tasks:
+        replaced_template = task_name_to_replaced_template.get(task['name'])
+        if not replaced_template:
+            continue
+        task['template'] = replaced_template.shared_template_name
+        arguments = task.setdefault('arguments', {})
+        for argument_kind in ['parameters', 'artifacts']:
+            for argument in arguments.get(argument_kind, []):
+                argument['name'] = replaced_template.input_renames.get((argument_kind, argument['name']), argument['name'])
+        if replaced_template.arguments:
+            arguments['parameters'] = arguments.get('parameters', []) + [
+                {'name': name, 'value': value} for name, value in replaced_template.arguments.items()
+            ]
+        for argument_kind in ['parameters', 'artifacts']:
+            if argument_kind in arguments:
+                arguments[argument_kind].sort(key=lambda argument: argument['name'])
+
+    # Updating the references to the renamed outputs of the tasks
+    def rename_output_references(value: str, path: tuple) -> str:
+        def rename_output_reference(match):
+            task_name, output_kind, output_name = match.groups()
+            replaced_template = task_name_to_replaced_template.get(task_name)
+            if replaced_template:
+                output_name = replaced_template.output_renames.get((output_kind, output_name), output_name)
+            return 'tasks.{}.outputs.{}.{}'.format(task_name, output_kind, output_name)
+        return _task_output_reference_regex.sub(rename_output_reference, value)
+
+    template['dag'] = _map_strings(template['dag'], rename_output_references)
+    if 'outputs' in template:
+        template['outputs'] = _map_strings(template['outputs'], rename_output_references)
@@ -0,0 +1,180 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Writing and reading the workflow packages without buffering their content.
+
+The workflow YAML is emitted directly into the package file (or the package
+member) stream and is parsed directly from it, so the memory use does not
+grow with the package size.
+"""
+
+import gzip
+import io
+import tarfile
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional, Text
+
+import yaml
+
+from ..components._yaml_utils import dump_yaml
+
+_PIPELINE_YAML_FILE_NAME = 'pipeline.yaml'
+_DEFAULT_TAR_GZ_COMPRESSION_LEVEL = 9
+
+# The LibYAML-based loader is much faster. It is not available in all PyYAML installations.
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class _BufferedTextWriter:
+  """Joins the small writes of the YAML emitter into bigger chunks.
+
+  The emitter writes every token separately, which is slow for the encoding
+  and compressing streams.
+  """
+
+  _CHUNK_SIZE = 1024 * 1024
+
+  def __init__(self, stream):
+    self._stream = stream
+    self._chunks = []
+    self._size = 0
+
+  def write(self, text: Text):
+    self._chunks.append(text)
+    self._size += len(text)
+    if self._size >= self._CHUNK_SIZE:
+      self.flush()
+
+  def flush(self):
+    self._stream.write(''.join(self._chunks))
+    self._chunks = []
+    self._size = 0
+
+
+def _dump_yaml_to_stream(workflow: Dict[Text, Any], stream):
+  writer = _BufferedTextWriter(stream)
+  dump_yaml(workflow, writer)
+  writer.flush()
+
+
+def _is_tar_gz(package_path: Text) -> bool:
+  return package_path.endswith('.tar.gz') or package_path.endswith('.tgz')
+
+
+def _is_yaml(package_path: Text) -> bool:
+  return package_path.endswith('.yaml') or package_path.endswith('.yml')
+
+
+def write_workflow_package(workflow: Dict[Text, Any],
+                           package_path: Text,
+                           compression_level: Optional[int] = None):
+  """Writes the workflow to a .yaml, .zip or .tar.gz package file.
+
+  The packages are reproducible: the archive headers do not contain the time
+  or the package file name.
+
+  Args:
+    workflow: Workflow spec of the pipeline.
+    package_path: Path of the package file. The extension specifies the
+      format.
+    compression_level: The compression level (0-9) of the .zip and .tar.gz
+      packages. Defaults to 9 for .tar.gz and to the zlib default for .zip.
+  """
+  if _is_tar_gz(package_path):
+    if compression_level is None:
+      compression_level = _DEFAULT_TAR_GZ_COMPRESSION_LEVEL
+    # The tar member header contains the member size, so the YAML is spooled
+    # to a temporary file before being added to the archive.
+    with tempfile.TemporaryFile() as yaml_file:
+      yaml_text_stream = io.TextIOWrapper(yaml_file, encoding='utf-8')
+      _dump_yaml_to_stream(workflow, yaml_text_stream)
+      yaml_text_stream.flush()
+      yaml_text_stream.detach()
+      tarinfo = tarfile.TarInfo(_PIPELINE_YAML_FILE_NAME)
+      tarinfo.size = yaml_file.tell()
+      yaml_file.seek(0)
+      with open(package_path, 'wb') as package_file, \
+          gzip.GzipFile(filename='', mode='wb', fileobj=package_file,
+                        compresslevel=compression_level, mtime=0) as gzip_file, \
+          tarfile.open(fileobj=gzip_file, mode='w') as tar:
+        tar.addfile(tarinfo, fileobj=yaml_file)
+  elif package_path.endswith('.zip'):
+    with zipfile.ZipFile(package_path, 'w') as zip_file:
+      zipinfo = zipfile.ZipInfo(_PIPELINE_YAML_FILE_NAME)
+      zipinfo.compress_type = zipfile.ZIP_DEFLATED
+      # ZipFile.open only takes the compression level from the ZipInfo.
+      zipinfo._compresslevel = compression_level
+      with zip_file.open(zipinfo, 'w') as member_file, \
+          io.TextIOWrapper(member_file, encoding='utf-8') as yaml_text_stream:
+        _dump_yaml_to_stream(workflow, yaml_text_stream)
+  elif _is_yaml(package_path):
+    with open(package_path, 'w') as yaml_file:
+      _dump_yaml_to_stream(workflow, yaml_file)
+  else:
+    raise ValueError(
+        'The output path '+ package_path +
+        ' should ends with one of the following formats: '
+        '[.tar.gz, .tgz, .zip, .yaml, .yml]')
+
+
+def _choose_pipeline_yaml_file(file_list: List[Text]) -> Text:
+  yaml_files = [file for file in file_list if file.endswith('.yaml')]
+  if len(yaml_files) == 0:
+    raise ValueError('Invalid package. Missing pipeline yaml file in the package.')
+
+  if _PIPELINE_YAML_FILE_NAME in yaml_files:
+    return _PIPELINE_YAML_FILE_NAME
+  else:
+    if len(yaml_files) == 1:
+      return yaml_files[0]
+    raise ValueError('Invalid package. There is no pipeline.yaml file and there are multiple yaml files.')
+
+
+def read_workflow_package(package_path: Text) -> Dict[Text, Any]:
+  """Reads the workflow from a .yaml, .zip or .tar.gz package file.
+
+  The workflow is parsed directly from the (decompressed) package stream.
+
+  Args:
+    package_path: Path of the package file. The extension specifies the
+      format.
+
+  Returns:
+    The workflow dictionary.
+  """
+  if _is_tar_gz(package_path):
+    with tarfile.open(package_path, 'r:gz') as tar:
+      # Reading the pipeline.yaml as soon as it is found. Seeking back in the
+      # gzip stream would decompress the package again.
+      yaml_members = {}
+      for member in tar:
+        if not member.isfile():
+          continue
+        if member.name == _PIPELINE_YAML_FILE_NAME:
+          with tar.extractfile(member) as f:
+            return yaml.load(f, Loader=_SafeLoader)
+        yaml_members[member.name] = member
+      pipeline_yaml_file = _choose_pipeline_yaml_file(list(yaml_members))
+      with tar.extractfile(yaml_members[pipeline_yaml_file]) as f:
+        return yaml.load(f, Loader=_SafeLoader)
+  elif package_path.endswith('.zip'):
+    with zipfile.ZipFile(package_path, 'r') as zip_file:
+      pipeline_yaml_file = _choose_pipeline_yaml_file(zip_file.namelist())
+      with zip_file.open(pipeline_yaml_file) as f:
+        return yaml.load(f, Loader=_SafeLoader)
+  elif _is_yaml(package_path):
+    with open(package_path, 'rb') as f:
+      return yaml.load(f, Loader=_SafeLoader)
+  else:
+    raise ValueError('The package_file '+ package_path + ' should end with one of the following formats: [.tar.gz, .tgz, .zip, .yaml, .yml]')
@@ -16,10 +16,8 @@ import json
 from collections import defaultdict, OrderedDict
 from deprecated import deprecated
 import inspect
-import tarfile
 import uuid
 import warnings
-import zipfile
 from typing import Callable, Set, List, Text, Dict, Tuple, Any, Union, Optional
 
 import kfp
@@ -819,6 +817,8 @@ class Compiler(object):
       pipeline_description: Text=None,
       params_list: List[dsl.PipelineParam]=None,
       pipeline_conf: dsl.PipelineConf = None,
+      deduplicate_templates: bool = False,
+      deterministic: bool = False,
       ) -> Dict[Text, Any]:
     """ Internal implementation of create_workflow."""
     params_list = params_list or []
@@ -851,7 +851,9 @@ class Compiler(object):
           break
       args_list.append(dsl.PipelineParam(sanitize_k8s_name(arg_name, True), param_type=arg_type))
 
-    with dsl.Pipeline(pipeline_name) as dsl_pipeline:
+    dsl_pipeline = dsl.Pipeline(pipeline_name)
+    dsl_pipeline.deterministic_naming = deterministic
+    with dsl_pipeline:
       pipeline_func(*args_list)
 
     pipeline_conf = pipeline_conf or dsl_pipeline.conf # Configuration passed to the compiler is overriding. Unfortunately, it's not trivial to detect whether the dsl_pipeline.conf was ever modified.
@@ -895,14 +897,25 @@ class Compiler(object):
     workflow = _data_passing_rewriter.add_pod_name_passing(workflow,
                                                            output_directory)
 
+    if pipeline_conf.loop_items_externalization_threshold is not None:
+      from ._loop_items_externalization import externalize_loop_items
+      workflow = externalize_loop_items(workflow, pipeline_conf.loop_items_externalization_threshold)
+
     if pipeline_conf and pipeline_conf.data_passing_method != None:
       workflow = pipeline_conf.data_passing_method(workflow)
 
+    self._template_deduplication_report = None
+    if deduplicate_templates:
+      from ._template_deduplication import deduplicate_templates as _deduplicate_templates
+      workflow, self._template_deduplication_report = _deduplicate_templates(workflow)
+
     metadata = workflow.setdefault('metadata', {})
     annotations = metadata.setdefault('annotations', {})
 
     annotations['pipelines.kubeflow.org/kfp_sdk_version'] = kfp.__version__
-    annotations['pipelines.kubeflow.org/pipeline_compilation_time'] = datetime.datetime.now().isoformat()
+    # The compilation time would make the deterministically compiled packages differ.
+    if not deterministic:
+      annotations['pipelines.kubeflow.org/pipeline_compilation_time'] = datetime.datetime.now().isoformat()
     annotations['pipelines.kubeflow.org/pipeline_spec'] = json.dumps(pipeline_meta.to_dict(), sort_keys=True)
 
     # Labels might be logged better than annotations so adding some information here as well
@@ -947,7 +960,7 @@ class Compiler(object):
     """Compile the given pipeline function into workflow."""
     return self._create_workflow(pipeline_func=pipeline_func, pipeline_conf=pipeline_conf)
 
-  def compile(self, pipeline_func, package_path, type_check=True, pipeline_conf: dsl.PipelineConf = None):
+  def compile(self, pipeline_func, package_path, type_check=True, pipeline_conf: dsl.PipelineConf = None, deduplicate_templates: bool = False, deterministic: bool = False, compression_level: int = None):
     """Compile the given pipeline function into workflow yaml.
 
     Args:
@@ -958,6 +971,17 @@ class Compiler(object):
       pipeline_conf: PipelineConf instance. Can specify op transforms, image
         pull secrets and other pipeline-level configuration options. Overrides
         any configuration that may be set by the pipeline.
+      deduplicate_templates: Whether to replace the container templates that
+        only differ in the argument values (e.g. the tasks created from the
+        same component) with shared templates. Reduces the workflow size.
+      deterministic: Whether to derive the generated names (e.g. the loop
+        names) from the pipeline structure instead of random values and to
+        omit the compilation time. Compiling the same pipeline then always
+        produces the same package bytes, which allows caching and
+        deduplicating the packages.
+      compression_level: The compression level (0-9) of the .zip and
+        .tar.gz packages. Defaults to 9 for .tar.gz and to the zlib default
+        for .zip.
     """
     import kfp
     type_check_old_value = kfp.TYPE_CHECK
@@ -966,44 +990,27 @@ class Compiler(object):
       self._create_and_write_workflow(
           pipeline_func=pipeline_func,
           pipeline_conf=pipeline_conf,
-          package_path=package_path)
+          package_path=package_path,
+          deduplicate_templates=deduplicate_templates,
+          deterministic=deterministic,
+          compression_level=compression_level)
     finally:
       kfp.TYPE_CHECK = type_check_old_value
 
   @staticmethod
-  def _write_workflow(workflow: Dict[Text, Any], package_path: Text = None):
+  def _write_workflow(workflow: Dict[Text, Any], package_path: Text = None, compression_level: int = None):
     """Dump pipeline workflow into yaml spec and write out in the format specified by the user.
 
     Args:
       workflow: Workflow spec of the pipline, dict.
       package_path: file path to be written. If not specified, a yaml_text string will be returned.
+      compression_level: The compression level (0-9) of the .zip and .tar.gz packages.
     """
-    yaml_text = dump_yaml(workflow)
-
     if package_path is None:
-      return yaml_text
-
-    if package_path.endswith('.tar.gz') or package_path.endswith('.tgz'):
-      from contextlib import closing
-      from io import BytesIO
-      with tarfile.open(package_path, "w:gz") as tar:
-          with closing(BytesIO(yaml_text.encode())) as yaml_file:
-            tarinfo = tarfile.TarInfo('pipeline.yaml')
-            tarinfo.size = len(yaml_file.getvalue())
-            tar.addfile(tarinfo, fileobj=yaml_file)
-    elif package_path.endswith('.zip'):
-      with zipfile.ZipFile(package_path, "w") as zip:
-        zipinfo = zipfile.ZipInfo('pipeline.yaml')
-        zipinfo.compress_type = zipfile.ZIP_DEFLATED
-        zip.writestr(zipinfo, yaml_text)
-    elif package_path.endswith('.yaml') or package_path.endswith('.yml'):
-      with open(package_path, 'w') as yaml_file:
-        yaml_file.write(yaml_text)
-    else:
-      raise ValueError(
-          'The output path '+ package_path +
-          ' should ends with one of the following formats: '
-          '[.tar.gz, .tgz, .zip, .yaml, .yml]')
+      return dump_yaml(workflow)
+
+    from ._workflow_package import write_workflow_package
+    write_workflow_package(workflow, package_path, compression_level)
 
   def _create_and_write_workflow(
       self,
@@ -1012,7 +1019,10 @@ class Compiler(object):
       pipeline_description: Text=None,
       params_list: List[dsl.PipelineParam]=None,
       pipeline_conf: dsl.PipelineConf=None,
-      package_path: Text=None
+      package_path: Text=None,
+      deduplicate_templates: bool=False,
+      deterministic: bool=False,
+      compression_level: int=None,
   ) -> None:
     """Compile the given pipeline function and dump it to specified file format."""
     workflow = self._create_workflow(
@@ -1020,8 +1030,10 @@ class Compiler(object):
         pipeline_name,
         pipeline_description,
         params_list,
-        pipeline_conf)
-    self._write_workflow(workflow, package_path)
+        pipeline_conf,
+        deduplicate_templates,
+        deterministic)
+    self._write_workflow(workflow, package_path, compression_level)
     _validate_workflow(workflow)
 
 
@@ -1032,8 +1044,10 @@ def _validate_workflow(workflow: dict):
     if 'value' not in argument:
       argument['value'] = ''
 
-  yaml_text = dump_yaml(workflow)
-  if '{{pipelineparam' in yaml_text:
+  # The YAML is only scanned, so that the validation does not keep another copy of the workflow in memory.
+  unresolved_param_detector = _SubstringDetector('{{pipelineparam')
+  dump_yaml(workflow, unresolved_param_detector)
+  if unresolved_param_detector.found:
     raise RuntimeError(
         '''Internal compiler error: Found unresolved PipelineParam.
 Please create a new issue at https://github.com/kubeflow/pipelines/issues attaching the pipeline code and the pipeline package.'''
@@ -1051,7 +1065,24 @@ Please create a new issue at https://github.com/kubeflow/pipelines/issues attach
       warnings.warn("Cannot validate the compiled workflow. Found the argo program in PATH, but it's not usable. argo v2.4.3 should work.")
     
     if has_working_argo_lint:
-      _run_argo_lint(yaml_text)
+      _run_argo_lint(dump_yaml(workflow))
+
+
+class _SubstringDetector:
+  """Text stream that detects a substring in the written text without storing the text."""
+
+  def __init__(self, substring: str):
+    self._substring = substring
+    self._tail = ''
+    self.found = False
+
+  def write(self, text: str):
+    if self.found:
+      return
+    text = self._tail + text
+    self.found = self._substring in text
+    # Keeping the end of the text that can be the beginning of the substring.
+    self._tail = text[max(len(text) - len(self._substring) + 1, 0):]
 
 
 def _run_argo_lint(yaml_text: str):
@@ -21,6 +21,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from deprecated.sphinx import deprecated
 
 
@@ -39,17 +40,56 @@ def parse_arguments():
                       help='The namespace for the pipeline function')
   parser.add_argument('--output',
                       type=str,
-                      required=True,
                       help='local path to the output workflow yaml file.')
   parser.add_argument('--disable-type-check',
                       action='store_true',
                       help='disable the type check, default is enabled.')
+  parser.add_argument('--deduplicate-templates',
+                      action='store_true',
+                      help='share the templates of the tasks that only differ '
+                      'in the argument values and report the size reduction.')
+  parser.add_argument('--deterministic',
+                      action='store_true',
+                      help='derive the generated names from the pipeline '
+                      'structure and omit the compilation time, so that the '
+                      'same pipeline always produces the same output bytes.')
+
+  batch_group = parser.add_argument_group(
+      'batch mode',
+      'Compile many pipelines using a pool of worker processes.')
+  batch_group.add_argument('--manifest',
+                           type=str,
+                           help='path to a YAML or JSON file with a list of '
+                           '{py|module, function, output} entries to compile.')
+  batch_group.add_argument('--py-glob',
+                           type=str,
+                           action='append',
+                           help='glob pattern of py files to compile. '
+                           'Can be specified multiple times. Requires --output-dir.')
+  batch_group.add_argument('--output-dir',
+                           type=str,
+                           help='output directory for the files matched by --py-glob.')
+  batch_group.add_argument('--output-format',
+                           type=str,
+                           default='.yaml',
+                           choices=['.yaml', '.yml', '.zip', '.tar.gz', '.tgz'],
+                           help='output file extension for the files matched by --py-glob.')
+  batch_group.add_argument('--parallelism',
+                           type=int,
+                           help='number of worker processes. Defaults to the number of CPUs.')
+  batch_group.add_argument('--component-cache-dir',
+                           type=str,
+                           help='directory to cache the component files loaded by URL. '
+                           'Defaults to a temporary directory.')
+  batch_group.add_argument('--timing-report',
+                           type=str,
+                           help='path to write the per-pipeline timing report JSON to.')
 
   args = parser.parse_args()
   return args
 
 
-def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check):
+def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check, deduplicate_templates=False, deterministic=False):
   if len(pipeline_funcs) == 0:
     raise ValueError('A function with @dsl.pipeline decorator is required in the py file.')
 
@@ -65,7 +105,11 @@ def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_
   else:
     pipeline_func = pipeline_funcs[0]
 
-  kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check)
+  compiler = kfp.compiler.Compiler()
+  compiler.compile(pipeline_func, output_path, type_check, deduplicate_templates=deduplicate_templates, deterministic=deterministic)
+  if deduplicate_templates:
+    from ._template_deduplication import format_template_deduplication_report
+    print(format_template_deduplication_report(compiler._template_deduplication_report))
 
 
 class PipelineCollectorContext():
@@ -82,24 +126,69 @@ class PipelineCollectorContext():
     dsl._pipeline._pipeline_decorator_handler = self.old_handler
 
 
-def compile_pyfile(pyfile, function_name, output_path, type_check):
+def compile_pyfile(pyfile, function_name, output_path, type_check, deduplicate_templates=False, deterministic=False):
   sys.path.insert(0, os.path.dirname(pyfile))
   try:
     filename = os.path.basename(pyfile)
     with PipelineCollectorContext() as pipeline_funcs:
       __import__(os.path.splitext(filename)[0])
-    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check)
+    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check, deduplicate_templates, deterministic)
   finally:
     del sys.path[0]
 
 
+def compile_batch_from_args(args) -> bool:
+  """Compiles the pipelines specified by the batch mode arguments.
+
+  Returns:
+    True if all pipelines were compiled successfully.
+  """
+  from . import _batch_compile
+
+  entries = []
+  if args.manifest:
+    entries.extend(_batch_compile.load_manifest(args.manifest))
+  if args.py_glob:
+    if not args.output_dir:
+      raise ValueError('The --output-dir option must be specified with --py-glob.')
+    entries.extend(_batch_compile.entries_from_globs(
+        args.py_glob, args.output_dir, args.output_format))
+  if not entries:
+    raise ValueError('No pipelines to compile were found.')
+
+  start_time = time.time()
+  results = _batch_compile.compile_batch(
+      entries,
+      type_check=not args.disable_type_check,
+      parallelism=args.parallelism,
+      component_cache_dir=args.component_cache_dir,
+      progress_stream=sys.stdout,
+      deduplicate_templates=args.deduplicate_templates,
+      deterministic=args.deterministic,
+  )
+  print(_batch_compile.format_batch_report(results, time.time() - start_time))
+  if args.timing_report:
+    _batch_compile.write_timing_report(results, args.timing_report)
+  return all(result.error is None for result in results)
+
+
 def main():
   args = parse_arguments()
+  if args.manifest or args.py_glob:
+    if args.py:
+      raise ValueError('The --py option cannot be used in the batch mode.')
+    if not compile_batch_from_args(args):
+      sys.exit(1)
+    return
   if args.py is None:
     raise ValueError('The --py option must be specified.')
+  if args.output is None:
+    raise ValueError('The --output option must be specified.')
   compile_pyfile(
       args.py,
       args.function,
       args.output,
       not args.disable_type_check,
+      args.deduplicate_templates,
+      args.deterministic,
   )
@@ -12,8 +12,37 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ._airflow_op import *
-from ._components import *
-from ._python_op import *
-from ._python_to_graph_component import *
-from ._component_store import *
+# The public names are loaded from the submodules on first access (PEP 562).
+# Component programs import kfp.components, so this keeps their startup fast.
+_attribute_to_module = {
+    # ._airflow_op
+    'create_component_from_airflow_op': '._airflow_op',
+    # ._components
+    'load_component': '._components',
+    'load_component_from_text': '._components',
+    'load_component_from_url': '._components',
+    'load_component_from_file': '._components',
+    # ._python_op
+    'create_component_from_func': '._python_op',
+    'func_to_container_op': '._python_op',
+    'func_to_component_text': '._python_op',
+    'default_base_image_or_builder': '._python_op',
+    'InputArtifact': '._python_op',
+    'InputPath': '._python_op',
+    'InputTextFile': '._python_op',
+    'InputBinaryFile': '._python_op',
+    'OutputArtifact': '._python_op',
+    'OutputPath': '._python_op',
+    'OutputTextFile': '._python_op',
+    'OutputBinaryFile': '._python_op',
+    # ._python_to_graph_component
+    'create_graph_component_from_pipeline_func': '._python_to_graph_component',
+    # ._component_store
+    'ComponentStore': '._component_store',
+}
+
+__all__ = list(_attribute_to_module)
+
+from ._lazy_import import attach_lazy_attributes as _attach_lazy_attributes
+__getattr__, __dir__ = _attach_lazy_attributes(
+    __name__, globals(), _attribute_to_module)
@@ -129,15 +129,38 @@ def _load_component_spec_from_file(path) -> ComponentSpec:
         return _load_component_spec_from_yaml_or_zip_bytes(component_stream.read())
 
 
+# Optional on-disk cache of the component files loaded by URL.
+# Can be shared by multiple processes (e.g. batch compilation workers).
+_component_cache_store = None
+
+
+def _set_component_cache_dir(cache_dir: Optional[str]):
+    """Enables (or disables when None) caching the component files loaded by URL."""
+    global _component_cache_store
+    if cache_dir is None:
+        _component_cache_store = None
+    else:
+        from ._key_value_store import KeyValueStore
+        _component_cache_store = KeyValueStore(cache_dir=cache_dir)
+
+
 def _load_component_spec_from_url(url: str, auth=None):
     if url is None:
         raise TypeError
 
     url = _fix_component_uri(url)
 
+    cache_store = _component_cache_store
+    if cache_store is not None:
+        data = cache_store.try_get_value_bytes(url)
+        if data is not None:
+            return _load_component_spec_from_yaml_or_zip_bytes(data)
+
     import requests
     resp = requests.get(url, auth=auth)
     resp.raise_for_status()
+    if cache_store is not None:
+        cache_store.store_value_bytes(url, resp.content)
     return _load_component_spec_from_yaml_or_zip_bytes(resp.content)
 
 
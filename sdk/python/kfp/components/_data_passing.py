@@ -18,6 +18,8 @@ __all__ = [
     'get_deserializer_code_for_type',
     'get_deserializer_code_for_type_struct',
     'get_serializer_func_for_type_struct',
+    'get_file_reader_func_for_type_struct',
+    'get_file_writer_func_for_type_struct',
 ]
 
 
@@ -66,8 +68,13 @@ def _serialize_bool(bool_value: bool) -> str:
 
 
 def _deserialize_bool(s) -> bool:
-    from distutils.util import strtobool
-    return strtobool(s) == 1
+    # Same values as distutils.util.strtobool, which is slow to import and deprecated.
+    s = s.lower()
+    if s in ('y', 'yes', 't', 'true', 'on', '1'):
+        return True
+    if s in ('n', 'no', 'f', 'false', 'off', '0'):
+        return False
+    raise ValueError('invalid truth value %r' % (s,))
 
 
 _bool_deserializer_definitions = inspect.getsource(_deserialize_bool)
@@ -123,9 +130,68 @@ type_name_to_deserializer = {type_name: (converter.deserializer_code, converter.
 type_name_to_serializer = {type_name: converter.serializer for converter in _converters for type_name in converter.type_names}
 
 
+# Binary and columnar data cannot be passed as strings. The file converters write the returned objects to the output files and read the input files into objects.
+# The Python types are referenced by name since numpy, pandas and pyarrow are only needed inside the component container.
+FileConverter = NamedTuple('FileConverter', [
+    ('python_type_names', Sequence[str]),
+    ('type_names', Sequence[str]),
+    ('writer', Callable[[Any, str], None]),
+    ('reader', Callable[[str], Any]),
+])
+
+
+def _write_numpy_array(array, path: str):
+    import numpy
+    # Passing a file object since numpy.save appends ".npy" to the paths that do not have it.
+    with open(path, 'wb') as f:
+        numpy.save(f, array, allow_pickle=False)
+
+
+def _read_numpy_array(path: str):
+    import numpy
+    # The array is memory-mapped (copy-on-write), so only the accessed parts are read from the disk.
+    return numpy.load(path, mmap_mode='c', allow_pickle=False)
+
+
+def _write_pandas_dataframe_to_parquet(df, path: str):
+    df.to_parquet(path)
+
+
+def _read_pandas_dataframe_from_parquet(path: str):
+    import pyarrow.parquet
+    return pyarrow.parquet.read_table(path, memory_map=True).to_pandas()
+
+
+def _write_arrow_table_to_feather(table, path: str):
+    import pyarrow.feather
+    # Uncompressed Feather (Arrow IPC) files can be read without copying.
+    pyarrow.feather.write_feather(table, path, compression='uncompressed')
+
+
+def _read_arrow_table_from_feather(path: str):
+    import pyarrow
+    return pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+
+
+_file_converters = [
+    FileConverter(['numpy.ndarray'], ['NumpyArray'], _write_numpy_array, _read_numpy_array),
+    FileConverter(['pandas.core.frame.DataFrame', 'pandas.DataFrame'], ['ApacheParquet'], _write_pandas_dataframe_to_parquet, _read_pandas_dataframe_from_parquet),
+    FileConverter(['pyarrow.lib.Table', 'pyarrow.Table'], ['ApacheArrowFeather'], _write_arrow_table_to_feather, _read_arrow_table_from_feather),
+]
+
+
+python_type_name_to_type_name = {python_type_name: converter.type_names[0] for converter in _file_converters for python_type_name in converter.python_type_names}
+type_name_to_file_reader = {type_name: converter.reader for converter in _file_converters for type_name in converter.type_names}
+type_name_to_file_writer = {type_name: converter.writer for converter in _file_converters for type_name in converter.type_names}
+
+
 def get_canonical_type_struct_for_type(typ) -> str:
     try:
-        return type_to_type_name.get(typ, None)
+        type_struct = type_to_type_name.get(typ, None)
+        if type_struct:
+            return type_struct
+        python_type_name = typ if isinstance(typ, str) else typ.__module__ + '.' + typ.__qualname__
+        return python_type_name_to_type_name.get(python_type_name, None)
     except:
         return None
 
@@ -158,6 +224,20 @@ def get_serializer_func_for_type_struct(type_struct) -> str:
         return None
 
 
+def get_file_reader_func_for_type_struct(type_struct) -> Callable[[str], Any]:
+    try:
+        return type_name_to_file_reader.get(type_struct, None)
+    except:
+        return None
+
+
+def get_file_writer_func_for_type_struct(type_struct) -> Callable[[Any, str], None]:
+    try:
+        return type_name_to_file_writer.get(type_struct, None)
+    except:
+        return None
+
+
 def serialize_value(value, type_name: str) -> str:
     '''serialize_value converts the passed value to string based on the serializer associated with the passed type_name'''
     if isinstance(value, str):
@@ -1,4 +1,6 @@
 import hashlib
+import os
+import tempfile
 from pathlib import Path
 
 
@@ -31,14 +33,27 @@ class KeyValueStore:
                     '"{}" != new key "{}"'.format(cache_key_file_path, old_key, key)
                 )
             if cache_value_file_path.exists():
-                old_data = cache_value_file_path.write_bytes()
+                old_data = cache_value_file_path.read_bytes()
                 if data != old_data:
                     # TODO: Add options to raise error when overwriting the value.
                     pass
-        cache_value_file_path.write_bytes(data)
-        cache_key_file_path.write_text(key)
+        # The store can be shared by concurrent processes, so the files are
+        # written atomically to never expose partially written data to readers.
+        self._write_file_atomically(cache_value_file_path, data)
+        self._write_file_atomically(cache_key_file_path, key.encode('utf-8'))
         return cache_id
 
+    def _write_file_atomically(self, path: Path, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=str(self.cache_dir), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, str(path))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
     def try_get_value_text(self, key: str) -> str:
         result = self.try_get_value_bytes(key)
         if result is None:
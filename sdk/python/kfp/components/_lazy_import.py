@@ -0,0 +1,72 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers for lazily loading package attributes (PEP 562).
+
+Importing some of the SDK submodules is expensive (e.g. the Kubernetes client
+or the generated API client). Packages use these helpers to only import such
+submodules when one of their attributes is accessed for the first time.
+"""
+
+import importlib
+import importlib.util
+import sys
+from typing import Callable, List, Mapping, Tuple
+
+
+def attach_lazy_attributes(
+    package_name: str,
+    package_globals: dict,
+    attribute_to_module: Mapping[str, str],
+) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """Creates the module-level `__getattr__` and `__dir__` for a package.
+
+    Args:
+        package_name: The `__name__` of the package.
+        package_globals: The `globals()` of the package. Loaded attributes are
+            cached there, so `__getattr__` is only called once per attribute.
+        attribute_to_module: Maps the attribute names to the relative names of
+            the submodules that define them. Any other submodule of the package
+            is also loaded when accessed as an attribute.
+
+    Module-level `__getattr__` requires Python 3.7. On older versions all the
+    attributes are loaded eagerly.
+
+    Returns:
+        A tuple of the `__getattr__` and `__dir__` functions.
+    """
+
+    def __getattr__(name: str):
+        module_name = attribute_to_module.get(name)
+        if module_name is not None:
+            module = importlib.import_module(module_name, package_name)
+            value = module if module_name == '.' + name else getattr(module, name)
+        else:
+            # Submodules used to be imported eagerly and available as attributes.
+            full_module_name = package_name + '.' + name
+            if name.startswith('__') or importlib.util.find_spec(
+                    full_module_name) is None:
+                raise AttributeError('module {!r} has no attribute {!r}'.format(
+                    package_name, name))
+            value = importlib.import_module(full_module_name)
+        package_globals[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(package_globals) | set(attribute_to_module))
+
+    if sys.version_info < (3, 7):
+        for name in attribute_to_module:
+            __getattr__(name)
+
+    return __getattr__, __dir__
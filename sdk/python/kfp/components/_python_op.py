@@ -29,7 +29,7 @@ __all__ = [
 
 from ._yaml_utils import dump_yaml
 from ._components import _create_task_factory_from_component_spec
-from ._data_passing import serialize_value, get_deserializer_code_for_type_struct, get_serializer_func_for_type_struct, get_canonical_type_struct_for_type
+from ._data_passing import serialize_value, get_deserializer_code_for_type_struct, get_serializer_func_for_type_struct, get_canonical_type_struct_for_type, get_file_reader_func_for_type_struct, get_file_writer_func_for_type_struct
 from ._naming import _make_name_unique_by_adding_index
 from .structures import *
 from . import _structures as structures
@@ -37,7 +37,7 @@ from . import _structures as structures
 import inspect
 from pathlib import Path
 import textwrap
-from typing import Callable, List, Mapping, Optional, TypeVar
+from typing import Callable, List, Mapping, NamedTuple, Optional, TypeVar
 import warnings
 
 import docstring_parser
@@ -118,6 +118,12 @@ def _parent_dirs_maker_that_returns_open_file(mode: str, encoding: str = None):
     return make_parent_dirs_and_return_path
 
 
+def _file_opener(mode: str):
+    def open_file(file_path: str):
+        return open(file_path, mode=mode)
+    return open_file
+
+
 default_base_image_or_builder='python:3.7'
 
 
@@ -297,7 +303,7 @@ def _extract_component_interface(func: Callable) -> ComponentSpec:
     def annotation_to_type_struct(annotation):
         if not annotation or annotation == inspect.Parameter.empty:
             return None
-        if hasattr(annotation, 'to_dict'):
+        if hasattr(annotation, 'to_dict') and not isinstance(annotation, type): # Classes like pandas.DataFrame also have the to_dict method
             annotation = annotation.to_dict()
         if isinstance(annotation, dict):
             return annotation
@@ -439,7 +445,143 @@ def _extract_component_interface(func: Callable) -> ComponentSpec:
     return component_spec
 
 
-def _func_to_component_spec(func, extra_code='', base_image : str = None, packages_to_install: List[str] = None, modules_to_capture: List[str] = None, use_code_pickling=False) -> ComponentSpec:
+_ParserArgument = NamedTuple('_ParserArgument', [
+    ('flag', str),
+    ('dest', str),
+    ('type', str),
+    ('required', bool),
+])
+
+_output_paths_flag = '----output-paths'
+
+
+def _make_argparse_code_lines(prog: str, description: str, parser_arguments: List[_ParserArgument], output_paths_nargs: int) -> List[str]:
+    code_lines = [
+        'import argparse',
+        '_parser = argparse.ArgumentParser(prog={prog_repr}, description={description_repr})'.format(
+            prog_repr=repr(prog or ''),
+            description_repr=repr(description or ''),
+        ),
+    ]
+    for argument in parser_arguments:
+        code_lines.append('_parser.add_argument("{param_flag}", dest="{param_var}", type={param_type}, required={is_required}, default=argparse.SUPPRESS)'.format(
+            param_flag=argument.flag,
+            param_var=argument.dest,
+            param_type=argument.type,
+            is_required=str(argument.required),
+        ))
+    if output_paths_nargs:
+        code_lines.append('_parser.add_argument("{param_flag}", dest="{param_var}", type=str, nargs={nargs})'.format(
+            param_flag=_output_paths_flag,
+            param_var='_output_paths',
+            nargs=output_paths_nargs,
+        ))
+    code_lines.append('_parsed_args = vars(_parser.parse_args())')
+    return code_lines
+
+
+def _make_minimal_arg_parse_code_lines(prog: str, parser_arguments: List[_ParserArgument], output_paths_nargs: int) -> List[str]:
+    # Parses the command-line produced by the component without importing argparse.
+    code_lines = [
+        'import sys',
+        '_arg_specs = {',
+    ]
+    code_lines.extend(
+        '    "{}": ("{}", {}, {}),'.format(argument.flag, argument.dest, argument.type, argument.required)
+        for argument in parser_arguments
+    )
+    code_lines.append('}')
+    code_lines.extend([
+        '_parsed_args = {}',
+        '_argv = sys.argv[1:]',
+        'while _argv:',
+        '    _flag = _argv.pop(0)',
+    ])
+    if output_paths_nargs:
+        code_lines.extend([
+            '    if _flag == "{}":'.format(_output_paths_flag),
+            '        _parsed_args["_output_paths"] = _argv[:{}]'.format(output_paths_nargs),
+            '        del _argv[:{}]'.format(output_paths_nargs),
+            '        continue',
+        ])
+    error_prefix = repr((prog or '') + ': error: ')
+    code_lines.extend([
+        '    if _flag not in _arg_specs or not _argv:',
+        '        sys.exit({} + "unrecognized or incomplete argument: " + _flag)'.format(error_prefix),
+        '    _dest, _type, _required = _arg_specs[_flag]',
+        '    _parsed_args[_dest] = _type(_argv.pop(0))',
+        '_missing_flags = [_flag for _flag, (_dest, _type, _required) in _arg_specs.items() if _required and _dest not in _parsed_args]',
+        'if _missing_flags:',
+        '    sys.exit({} + "the following arguments are required: " + ", ".join(_missing_flags))'.format(error_prefix),
+    ])
+    return code_lines
+
+
+_fast_startup_program_path = '/tmp/kfp_component_program.py'
+
+# Executes the program passed as the next command-line argument without
+# writing it to a file. The source is put into the linecache, so stack traces
+# and `inspect.getsource` still work.
+_fast_startup_bootstrap_code = '''\
+import sys
+_kfp_program_source = sys.argv.pop(1)
+_kfp_program_code = None
+{bytecode_loading_code}\
+import linecache
+linecache.cache[{program_path!r}] = (len(_kfp_program_source), None, _kfp_program_source.splitlines(True), {program_path!r})
+if _kfp_program_code is None:
+    _kfp_program_code = compile(_kfp_program_source, {program_path!r}, 'exec')
+sys.argv[0] = __file__ = {program_path!r}
+del _kfp_program_source
+exec(_kfp_program_code)
+'''
+
+# The bytecode format only changes between Python minor versions.
+_fast_startup_bytecode_loading_code = '''\
+_kfp_program_bytecode = sys.argv.pop(1)
+if sys.implementation.cache_tag == {cache_tag!r}:
+    import binascii, marshal
+    _kfp_program_code = marshal.loads(binascii.a2b_base64(_kfp_program_bytecode))
+del _kfp_program_bytecode
+'''
+
+
+# Linux limits the length of every command-line argument to 128 KiB including
+# the terminating null byte (MAX_ARG_STRLEN). Longer arguments make the container
+# fail to start with E2BIG.
+_max_command_line_argument_length = 128 * 1024 - 1
+
+
+def _make_fast_startup_command(full_source: str, embed_bytecode: bool) -> List[str]:
+    bytecode_loading_code = ''
+    bytecode_args = []
+    if embed_bytecode:
+        import base64
+        import marshal
+        import sys
+        program_code = compile(full_source, _fast_startup_program_path, 'exec', dont_inherit=True)
+        encoded_bytecode = base64.b64encode(marshal.dumps(program_code)).decode('ascii')
+        if len(encoded_bytecode) > _max_command_line_argument_length:
+            warnings.warn(
+                'The program bytecode is too big to be passed as a command-line argument ({} bytes encoded, the limit is {}). '
+                'The bytecode is not embedded and the program source is compiled when the component starts.'.format(
+                    len(encoded_bytecode), _max_command_line_argument_length))
+        else:
+            bytecode_loading_code = _fast_startup_bytecode_loading_code.format(
+                cache_tag=sys.implementation.cache_tag,
+            )
+            bytecode_args = [encoded_bytecode]
+
+    bootstrap_code = _fast_startup_bootstrap_code.format(
+        bytecode_loading_code=bytecode_loading_code,
+        program_path=_fast_startup_program_path,
+    )
+    # -X frozen_modules=on makes the interpreter use the frozen stdlib startup modules where available (Python 3.11+). Older versions ignore unknown -X options.
+    # -S (skip the site module) is not used since the packages installed in the image or by packages_to_install must stay importable.
+    return ['python3', '-u', '-X', 'frozen_modules=on', '-c', bootstrap_code, full_source] + bytecode_args
+
+
+def _func_to_component_spec(func, extra_code='', base_image : str = None, packages_to_install: List[str] = None, modules_to_capture: List[str] = None, use_code_pickling=False, use_fast_startup=False, embed_bytecode=False) -> ComponentSpec:
     '''Takes a self-contained python function and converts it to component.
 
     Args:
@@ -450,10 +592,15 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
         packages_to_install: Optional. List of [versioned] python packages to pip install before executing the user function.
         modules_to_capture: Optional. List of module names that will be captured (instead of just referencing) during the dependency scan. By default the :code:`func.__module__` is captured.
         use_code_pickling: Specifies whether the function code should be captured using pickling as opposed to source code manipulation. Pickling has better support for capturing dependencies, but is sensitive to version mismatch between python in component creation environment and runtime image.
+        use_fast_startup: Optional. Starts the program directly with python3 (without the shell and the temporary program file) using a small bootstrap. The image must have python3 in PATH.
+        embed_bytecode: Optional. Requires use_fast_startup. Also embeds the program bytecode compiled by the current interpreter. The bytecode is used when the image has the same Python version, otherwise the source is compiled.
 
     Returns:
         A :py:class:`kfp.components.structures.ComponentSpec` instance.
     '''
+    if embed_bytecode and not use_fast_startup:
+        raise ValueError('embed_bytecode requires use_fast_startup.')
+
     decorator_base_image = getattr(func, '_component_base_image', None)
     if decorator_base_image is not None:
         if base_image is not None and decorator_base_image != base_image:
@@ -502,8 +649,14 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
         if passing_style is InputPath:
             return 'str'
         elif passing_style is InputTextFile:
+            if use_fast_startup:
+                pre_func_definitions.add(inspect.getsource(_file_opener))
+                return _file_opener.__name__ + "('rt')"
             return "argparse.FileType('rt')"
         elif passing_style is InputBinaryFile:
+            if use_fast_startup:
+                pre_func_definitions.add(inspect.getsource(_file_opener))
+                return _file_opener.__name__ + "('rb')"
             return "argparse.FileType('rb')"
         # For Output* we cannot use the build-in argparse.FileType objects since they do not create parent directories.
         elif passing_style is OutputPath:
@@ -520,6 +673,20 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
             return _parent_dirs_maker_that_returns_open_file.__name__ + "('wb')"
         raise NotImplementedError('Unexpected data passing style: "{}".'.format(str(passing_style)))
 
+    def get_file_reader_and_register_definitions(type_name) -> Optional[str]:
+        file_reader_func = get_file_reader_func_for_type_struct(type_name)
+        if file_reader_func:
+            definitions.add(inspect.getsource(file_reader_func))
+            return file_reader_func.__name__
+        return None
+
+    def get_file_writer_and_register_definitions(type_name) -> Optional[str]:
+        file_writer_func = get_file_writer_func_for_type_struct(type_name)
+        if file_writer_func:
+            definitions.add(inspect.getsource(file_writer_func))
+            return file_writer_func.__name__
+        return None
+
     def get_serializer_and_register_definitions(type_name) -> str:
         serializer_func = get_serializer_func_for_type_struct(type_name)
         if serializer_func:
@@ -531,28 +698,25 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
             return serializer_func.__name__
         return 'str'
 
-    arg_parse_code_lines = [
-        'import argparse',
-        '_parser = argparse.ArgumentParser(prog={prog_repr}, description={description_repr})'.format(
-            prog_repr=repr(component_spec.name or ''),
-            description_repr=repr(component_spec.description or ''),
-        ),
-    ]
     outputs_passed_through_func_return_tuple = [output for output in component_outputs if output._passing_style is None]
     file_outputs_passed_using_func_parameters = [output for output in component_outputs if output._passing_style is not None]
     arguments = []
+    parser_arguments = []
     for input in component_inputs + file_outputs_passed_using_func_parameters:
         param_flag = "--" + input.name.replace("_", "-")
         is_required = isinstance(input, OutputSpec) or not input.optional
-        line = '_parser.add_argument("{param_flag}", dest="{param_var}", type={param_type}, required={is_required}, default=argparse.SUPPRESS)'.format(
-            param_flag=param_flag,
-            param_var=input._parameter_name, # Not input.name, since the inputs could have been renamed
-            param_type=get_argparse_type_for_input_file(input._passing_style) or get_deserializer_and_register_definitions(input.type),
-            is_required=str(is_required),
-        )
-        arg_parse_code_lines.append(line)
-
-        if input._passing_style in [InputPath, InputTextFile, InputBinaryFile]:
+        # Binary and columnar data (e.g. NumPy arrays and DataFrames) is passed as a file and read into an object.
+        file_reader_code = None
+        if input._passing_style is None and isinstance(input, InputSpec):
+            file_reader_code = get_file_reader_and_register_definitions(input.type)
+        parser_arguments.append(_ParserArgument(
+            flag=param_flag,
+            dest=input._parameter_name, # Not input.name, since the inputs could have been renamed
+            type=get_argparse_type_for_input_file(input._passing_style) or file_reader_code or get_deserializer_and_register_definitions(input.type),
+            required=is_required,
+        ))
+
+        if input._passing_style in [InputPath, InputTextFile, InputBinaryFile] or file_reader_code:
             arguments_for_input = [param_flag, InputPathPlaceholder(input.name)]
         elif input._passing_style in [OutputPath, OutputTextFile, OutputBinaryFile]:
             arguments_for_input = [param_flag, OutputPathPlaceholder(input.name)]
@@ -571,30 +735,31 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
                 )
             )
 
+    output_paths_nargs = len(outputs_passed_through_func_return_tuple)
     if outputs_passed_through_func_return_tuple:
-        param_flag="----output-paths"
-        output_param_var="_output_paths"
-        line = '_parser.add_argument("{param_flag}", dest="{param_var}", type=str, nargs={nargs})'.format(
-            param_flag=param_flag,
-            param_var=output_param_var,
-            nargs=len(outputs_passed_through_func_return_tuple),
-        )
-        arg_parse_code_lines.append(line)
-        arguments.append(param_flag)
+        arguments.append(_output_paths_flag)
         arguments.extend(OutputPathPlaceholder(output.name) for output in outputs_passed_through_func_return_tuple)
 
+    if use_fast_startup:
+        arg_parse_code_lines = _make_minimal_arg_parse_code_lines(component_spec.name, parser_arguments, output_paths_nargs)
+    else:
+        arg_parse_code_lines = _make_argparse_code_lines(component_spec.name, component_spec.description, parser_arguments, output_paths_nargs)
+
     output_serialization_expression_strings = []
+    output_file_writer_expression_strings = []
     for output in outputs_passed_through_func_return_tuple:
-        serializer_call_str = get_serializer_and_register_definitions(output.type)
+        file_writer_call_str = get_file_writer_and_register_definitions(output.type)
+        if file_writer_call_str:
+            serializer_call_str = 'None'
+        else:
+            serializer_call_str = get_serializer_and_register_definitions(output.type)
         output_serialization_expression_strings.append(serializer_call_str)
+        output_file_writer_expression_strings.append(file_writer_call_str or 'None')
 
     pre_func_code = '\n'.join(list(pre_func_definitions))
 
     arg_parse_code_lines = list(definitions) + arg_parse_code_lines
 
-    arg_parse_code_lines.append(
-        '_parsed_args = vars(_parser.parse_args())',
-    )
     if outputs_passed_through_func_return_tuple:
         arg_parse_code_lines.append(
             '_output_files = _parsed_args.pop("_output_paths", [])',
@@ -613,6 +778,18 @@ def _func_to_component_spec(func, extra_code='', base_image : str = None, packag
 
     output_serialization_code = ''.join('    {},\n'.format(s) for s in output_serialization_expression_strings)
 
+    output_file_writers_code = ''
+    output_file_writing_code = ''
+    if any(s != 'None' for s in output_file_writer_expression_strings):
+        output_file_writers_code = '_output_file_writers = [\n{}]\n'.format(
+            ''.join('    {},\n'.format(s) for s in output_file_writer_expression_strings)
+        )
+        output_file_writing_code = '''\
+    if _output_file_writers[idx]:
+        _output_file_writers[idx](_outputs[idx], output_file)
+        continue
+'''
+
     full_output_handling_code = '''
 
 {outputs_to_list_code}
@@ -621,17 +798,22 @@ _output_serializers = [
 {output_serialization_code}
 ]
 
+{output_file_writers_code}
+
 import os
 for idx, output_file in enumerate(_output_files):
     try:
         os.makedirs(os.path.dirname(output_file))
     except OSError:
         pass
+{output_file_writing_code}\
     with open(output_file, 'w') as f:
         f.write(_output_serializers[idx](_outputs[idx]))
 '''.format(
         output_serialization_code=output_serialization_code,
         outputs_to_list_code=outputs_to_list_code,
+        output_file_writers_code=output_file_writers_code,
+        output_file_writing_code=output_file_writing_code,
     )
 
     full_source = \
@@ -665,21 +847,26 @@ _outputs = {func_name}(**_parsed_args)
         package_install_command_line = 'PIP_DISABLE_PIP_VERSION_CHECK=1 python3 -m pip install --quiet --no-warn-script-location {}'.format(' '.join([repr(str(package)) for package in packages_to_install]))
         package_preinstallation_command = ['sh', '-c', '({pip_install} || {pip_install} --user) && "$0" "$@"'.format(pip_install=package_install_command_line)]
 
+    if use_fast_startup:
+        program_command = _make_fast_startup_command(full_source, embed_bytecode)
+    else:
+        program_command = [
+            'sh',
+            '-ec',
+            # Writing the program code to a file.
+            # This is needed for Python to show stack traces and for `inspect.getsource` to work (used by PyTorch JIT and this module for example).
+            textwrap.dedent('''\
+                program_path=$(mktemp)
+                printf "%s" "$0" > "$program_path"
+                python3 -u "$program_path" "$@"
+            '''),
+            full_source,
+        ]
+
     component_spec.implementation=ContainerImplementation(
         container=ContainerSpec(
             image=base_image,
-            command=package_preinstallation_command + [
-                'sh',
-                '-ec',
-                # Writing the program code to a file.
-                # This is needed for Python to show stack traces and for `inspect.getsource` to work (used by PyTorch JIT and this module for example).
-                textwrap.dedent('''\
-                    program_path=$(mktemp)
-                    printf "%s" "$0" > "$program_path"
-                    python3 -u "$program_path" "$@"
-                '''),
-                full_source,
-            ],
+            command=package_preinstallation_command + program_command,
             args=arguments,
         )
     )
@@ -830,6 +1017,8 @@ def create_component_from_func(
     base_image: str = None,
     packages_to_install: List[str] = None,
     annotations: Optional[Mapping[str, str]] = None,
+    use_fast_startup: bool = False,
+    embed_bytecode: bool = False,
 ):
     '''Converts a Python function to a component and returns a task factory
     (a function that accepts arguments and returns a task object).
@@ -840,6 +1029,8 @@ def create_component_from_func(
         output_component_file: Optional. Write a component definition to a local file. The produced component file can be loaded back by calling :code:`load_component_from_file` or :code:`load_component_from_uri`.
         packages_to_install: Optional. List of [versioned] python packages to pip install before executing the user function.
         annotations: Optional. Allows adding arbitrary key-value data to the component specification.
+        use_fast_startup: Optional. Reduces the container startup overhead by starting the program directly with python3 instead of going through the shell and a temporary program file. The image must have python3 in PATH.
+        embed_bytecode: Optional. Requires use_fast_startup. Embeds the program bytecode compiled by the current Python interpreter into the component. The bytecode is used when the image has the same Python version (otherwise the program source is compiled as usual).
 
     Returns:
         A factory function with a strongly-typed signature taken from the python function.
@@ -928,6 +1119,8 @@ def create_component_from_func(
         func=func,
         base_image=base_image,
         packages_to_install=packages_to_install,
+        use_fast_startup=use_fast_startup,
+        embed_bytecode=embed_bytecode,
     )
     if annotations:
         component_spec.metadata = structures.MetadataSpec(
@@ -30,7 +30,8 @@ def load_yaml(stream):
         return yaml.load(stream, OrderedLoader)
     return ordered_load(stream)
 
-def dump_yaml(data):
+def dump_yaml(data, stream=None):
+    #Writes the YAML to the text stream when specified. Otherwise returns the YAML string.
     #See https://stackoverflow.com/questions/5121931/in-python-how-can-you-load-yaml-mappings-as-ordereddicts/21912744#21912744
 
     def ordered_dump(data, stream=None, Dumper=yaml.Dumper, **kwds):
@@ -56,4 +57,4 @@ def dump_yaml(data):
         OrderedDumper.add_representer(str, represent_str_or_text)
 
         return yaml.dump(data, stream, OrderedDumper, **kwds)
-    return ordered_dump(data, default_flow_style=None)
+    return ordered_dump(data, stream, default_flow_style=None)
@@ -82,6 +82,34 @@ class LoadComponentTestCase(unittest.TestCase):
         self.assertEqual(resolved_cmd.args[0], str(arg1))
         self.assertEqual(resolved_cmd.args[1], str(arg2))
 
+    def test_load_component_from_url_uses_component_cache(self):
+        component_path = Path(__file__).parent / 'test_data' / 'python_add.component.yaml'
+        component_url = 'https://raw.githubusercontent.com/some/repo/components/component_group/python_add/component.yaml'
+        component_bytes = component_path.read_bytes()
+        requested_urls = []
+
+        def mock_response_factory(url, params=None, **kwargs):
+            requested_urls.append(url)
+            response = requests.Response()
+            response.url = url
+            response.status_code = 200
+            response._content = component_bytes
+            return response
+
+        import tempfile
+        from ..components import _components
+        with tempfile.TemporaryDirectory() as cache_dir:
+            _components._set_component_cache_dir(cache_dir)
+            try:
+                with mock.patch('requests.get', mock_response_factory):
+                    task_factory1 = comp.load_component_from_url(component_url)
+                    task_factory2 = comp.load_component_from_url(component_url)
+            finally:
+                _components._set_component_cache_dir(None)
+
+        self.assertEqual(requested_urls, [component_url])
+        self.assertEqual(task_factory1.component_spec._digest, task_factory2.component_spec._digest)
+
     def test_loading_minimal_component(self):
         component_text = '''\
 implementation:
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib.util
 import subprocess
 import sys
 import tempfile
@@ -19,6 +20,7 @@ import unittest
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Callable, NamedTuple, Sequence
+from unittest import mock
 
 from .. import components as comp
 from ..components import InputPath, InputTextFile, InputBinaryFile, OutputPath, OutputTextFile, OutputBinaryFile
@@ -952,6 +954,117 @@ class PythonOpTestCase(unittest.TestCase):
         task_factory = comp.create_component_from_func(my_func)
         self.helper_test_component_using_local_call(task_factory, arguments={}, expected_output_values={})
 
+    def test_fast_startup(self):
+        def get_source_and_negate(flag: bool, a: float) -> NamedTuple('Outputs', [('negated', bool), ('doubled', float), ('source_lines', int)]):
+            import inspect
+            import sys
+            source_lines = len(inspect.getsource(sys.modules['__main__']).splitlines())
+            return (not flag, a * 2, source_lines)
+
+        for embed_bytecode in [False, True]:
+            with self.subTest(embed_bytecode=embed_bytecode):
+                task_factory = comp.create_component_from_func(get_source_and_negate, use_fast_startup=True, embed_bytecode=embed_bytecode)
+                command = task_factory.component_spec.implementation.container.command
+                self.assertEqual(command[0], 'python3')
+                self.assertNotIn('sh', command)
+                self.assertEqual(len(command), 8 if embed_bytecode else 7)
+
+                source_lines = len(command[6].splitlines())
+                self.helper_test_component_using_local_call(
+                    task_factory,
+                    arguments={'flag': True, 'a': 3},
+                    expected_output_values={'negated': 'False', 'doubled': '6.0', 'source_lines': str(source_lines)},
+                )
+
+    def test_fast_startup_embedded_bytecode_python_version_mismatch(self):
+        task_factory = comp.create_component_from_func(add_two_numbers, use_fast_startup=True, embed_bytecode=True)
+        command = task_factory.component_spec.implementation.container.command
+        # Simulating the bytecode compiled by a different Python version. The source must be used instead.
+        command[5] = command[5].replace(sys.implementation.cache_tag, 'other-python-version')
+        command[7] = 'invalid bytecode'
+        self.helper_test_component_using_local_call(task_factory, arguments={'a': 3, 'b': 5}, expected_output_values={'Output': '8.0'})
+
+    def test_fast_startup_bytecode_over_argument_length_limit_is_not_embedded(self):
+        with mock.patch('kfp.components._python_op._max_command_line_argument_length', 100), \
+                self.assertWarns(UserWarning):
+            task_factory = comp.create_component_from_func(add_two_numbers, use_fast_startup=True, embed_bytecode=True)
+        command = task_factory.component_spec.implementation.container.command
+        self.assertEqual(len(command), 7)
+        self.assertNotIn('marshal', command[5])
+        self.helper_test_component_using_local_call(task_factory, arguments={'a': 3, 'b': 5}, expected_output_values={'Output': '8.0'})
+
+    def test_fail_on_embed_bytecode_without_fast_startup(self):
+        with self.assertRaises(ValueError):
+            comp.create_component_from_func(add_two_numbers, embed_bytecode=True)
+
+    def test_binary_and_columnar_type_names(self):
+        def process_data(
+            array: 'numpy.ndarray',
+            table: 'pyarrow.Table',
+            data_path: InputPath('ApacheParquet'),
+        ) -> 'pandas.DataFrame':
+            pass
+
+        task_factory = comp.create_component_from_func(process_data)
+        component_spec = task_factory.component_spec
+        self.assertEqual([input.type for input in component_spec.inputs], ['NumpyArray', 'ApacheArrowFeather', 'ApacheParquet'])
+        self.assertEqual(component_spec.outputs[0].type, 'ApacheParquet')
+        # The objects are passed as files
+        self.assertEqual(
+            [type(arg).__name__ for arg in component_spec.implementation.container.args if not isinstance(arg, str)],
+            ['InputPathPlaceholder', 'InputPathPlaceholder', 'InputPathPlaceholder', 'OutputPathPlaceholder'],
+        )
+
+    @unittest.skipIf(
+        any(importlib.util.find_spec(module) is None for module in ['numpy', 'pandas', 'pyarrow']),
+        'numpy, pandas and pyarrow are required',
+    )
+    def test_binary_and_columnar_data_passing(self):
+        import numpy
+        import pandas
+        import pyarrow
+
+        def make_array(size: int) -> numpy.ndarray:
+            import numpy
+            return numpy.arange(size, dtype=numpy.float64)
+
+        def make_dataframe(array: numpy.ndarray, scale: float) -> pandas.DataFrame:
+            import pandas
+            array[0] = 100 # The memory-mapped array is copy-on-write
+            return pandas.DataFrame({'x': array * scale})
+
+        def make_table(df: 'ApacheParquet') -> pyarrow.Table:
+            import pyarrow
+            return pyarrow.Table.from_pandas(df)
+
+        def get_sum(table: pyarrow.Table) -> float:
+            return float(sum(table.column('x').to_pylist()))
+
+        for use_fast_startup in [False, True]:
+            with self.subTest(use_fast_startup=use_fast_startup), tempfile.TemporaryDirectory() as temp_dir_name:
+                previous_output_path = None
+                for func, arguments in [
+                    (make_array, {'size': 4}),
+                    (make_dataframe, {'array': '', 'scale': 2}),
+                    (make_table, {'df': ''}),
+                    (get_sum, {'table': ''}),
+                ]:
+                    task_factory = comp.create_component_from_func(func, use_fast_startup=use_fast_startup)
+                    step_dir = Path(temp_dir_name) / func.__name__
+                    with components_override_input_output_dirs_context(str(step_dir / 'inputs'), str(step_dir / 'outputs')):
+                        task = task_factory(**arguments)
+                        resolved_cmd = _resolve_command_line_and_paths(task.component_ref.spec, task.arguments)
+                    # Passing the previous output file to the file input
+                    for input_path in (resolved_cmd.input_paths or {}).values():
+                        Path(input_path).parent.mkdir(parents=True)
+                        Path(input_path).write_bytes(previous_output_path.read_bytes())
+                    full_command = resolved_cmd.command + resolved_cmd.args
+                    full_command = [sys.executable if arg == 'python3' else arg for arg in full_command]
+                    subprocess.run(full_command, check=True)
+                    previous_output_path = Path(resolved_cmd.output_paths['Output'])
+
+                self.assertEqual(previous_output_path.read_text(), '212.0')
+
     def test_end_to_end_python_component_pipeline(self):
         #Defining the Python function
         def add(a: float, b: float) -> float:
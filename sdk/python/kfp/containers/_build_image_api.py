@@ -17,16 +17,16 @@ __all__ = [
 ]
 
 
+import hashlib
 import logging
 import os
 import re
 import shutil
 import sys
 import tempfile
+from typing import Dict, List, Union
 
-import requests
-
-from ._cache import calculate_recursive_dir_hash, try_read_value_from_cache, write_value_to_cache
+from ._cache import calculate_file_hashes, calculate_path_hashes_digest, try_read_value_from_cache, write_value_to_cache
 from ._container_builder import ContainerBuilder
 
 
@@ -39,13 +39,111 @@ _container_work_dir = '/python_env'
 default_image_builder = ContainerBuilder()
 
 
-def _generate_dockerfile_text(context_dir: str, dockerfile_path: str, base_image: str = None) -> str:
+# These directories are never captured, even without .dockerignore.
+_always_ignored_dir_names = {'.git'}
+
+
+class _DockerIgnore:
+    '''Matches the paths relative to the working directory against the .dockerignore patterns.
+
+    See https://docs.docker.com/engine/reference/builder/#dockerignore-file
+    A path is ignored if it or any of its parent directories matches the last matching pattern.
+    '''
+    def __init__(self, patterns: List[str]):
+        self._rules = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            is_exception = pattern.startswith('!')
+            if is_exception:
+                pattern = pattern[1:].strip()
+            pattern = os.path.normpath(pattern).replace(os.sep, '/').lstrip('/')
+            self._rules.append((re.compile(_translate_dockerignore_pattern(pattern)), is_exception))
+        self._has_exceptions = any(is_exception for _, is_exception in self._rules)
+
+    @classmethod
+    def from_dir(cls, dir_path: str) -> '_DockerIgnore':
+        dockerignore_path = os.path.join(dir_path, '.dockerignore')
+        if not os.path.exists(dockerignore_path):
+            return cls([])
+        with open(dockerignore_path, 'r') as f:
+            return cls(f.read().splitlines())
+
+    def is_ignored(self, rel_path: str) -> bool:
+        path_parts = rel_path.split('/')
+        candidate_paths = ['/'.join(path_parts[:i]) for i in range(1, len(path_parts) + 1)]
+        ignored = False
+        for regex, is_exception in self._rules:
+            if any(regex.match(path) for path in candidate_paths):
+                ignored = not is_exception
+        return ignored
+
+    def can_prune_dir(self, rel_dir_path: str) -> bool:
+        # The exception patterns can re-include files inside the ignored directories.
+        return not self._has_exceptions and self.is_ignored(rel_dir_path)
+
+
+def _translate_dockerignore_pattern(pattern: str) -> str:
+    '''Translates a .dockerignore pattern (Go filepath.Match syntax + "**") to a regular expression.'''
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**', i):
+            i += 2
+            if pattern.startswith('/', i):
+                # "**/" matches zero or more directories
+                i += 1
+                regex += '(?:.*/)?'
+            else:
+                regex += '.*'
+            continue
+        if char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end < 0:
+                regex += re.escape(char)
+            else:
+                regex += pattern[i:end + 1]
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex + '$'
+
+
+def _collect_context_files(working_dir: str, file_filter_re: str) -> Dict[str, str]:
+    '''Returns the files that need to be captured in the build context: relative path -> local path.'''
+    docker_ignore = _DockerIgnore.from_dir(working_dir)
+    context_files = {}
+    for dirpath, dirnames, filenames in os.walk(working_dir):
+        rel_dirpath = os.path.relpath(dirpath, working_dir)
+        rel_dirpath = '' if rel_dirpath == '.' else rel_dirpath.replace(os.sep, '/') + '/'
+        # Pruning the walk so that the ignored directories (e.g. virtual environments or data) are not even listed.
+        dirnames[:] = [
+            dirname for dirname in dirnames
+            if dirname not in _always_ignored_dir_names and not docker_ignore.can_prune_dir(rel_dirpath + dirname)
+        ]
+        for file_name in filenames:
+            if re.match(file_filter_re, file_name) or file_name == 'requirements.txt':
+                rel_path = rel_dirpath + file_name
+                if not docker_ignore.is_ignored(rel_path):
+                    context_files[rel_path] = os.path.join(dirpath, file_name)
+    return context_files
+
+
+def _generate_dockerfile_text(requirements_file_exists: bool, base_image: str = None) -> str:
     # Generating the Dockerfile
     logging.info('Generating the Dockerfile')
 
     requirements_rel_path = 'requirements.txt'
-    requirements_path = os.path.join(context_dir, requirements_rel_path)
-    requirements_file_exists = os.path.exists(requirements_path)
 
     if not base_image:
         base_image = default_base_image
@@ -80,6 +178,11 @@ def build_image_from_working_dir(
     The function generates Dockerfile that starts from a python container image, install packages from requirements.txt (if present) and copies all the captured python files to the container image.
     The Dockerfile can be overridden by placing a custom Dockerfile in the root of the working directory.
 
+    The files and directories matching the patterns in the :code:`.dockerignore` file in the root of the working directory are not captured.
+    The ignored directories (and :code:`.git`) are not scanned at all.
+
+    The built image is cached by the hash of the captured files. When nothing has changed since the previous build, the previously built image is returned without building.
+
     Args:
         image_name: Optional. The image repo name where the new container image will be pushed. The name will be generated if not not set.
         working_dir: Optional. The directory that will be captured. The current directory will be used if omitted.
@@ -101,43 +204,61 @@ def build_image_from_working_dir(
         The full name of the container image including the hash digest. E.g. :code:`gcr.io/my-org/my-image@sha256:86c1...793c`.
     '''
     current_dir = working_dir or os.getcwd()
-    with tempfile.TemporaryDirectory() as context_dir:
-        logging.info('Creating the build context directory: {}'.format(context_dir))
-
-        # Copying all *.py and requirements.txt files
-        for dirpath, dirnames, filenames in os.walk(current_dir):
-            dst_dirpath = os.path.join(context_dir, os.path.relpath(dirpath, current_dir))
-            os.makedirs(dst_dirpath, exist_ok=True)
-            for file_name in filenames:
-                if re.match(file_filter_re, file_name) or file_name == 'requirements.txt':
-                    src_path = os.path.join(dirpath, file_name)
-                    dst_path = os.path.join(dst_dirpath, file_name)
-                    shutil.copy(src_path, dst_path)
-
-        src_dockerfile_path = os.path.join(current_dir, 'Dockerfile')
-        dst_dockerfile_path = os.path.join(context_dir, 'Dockerfile')
-        if os.path.exists(src_dockerfile_path):
-            if base_image:
-                raise ValueError('Cannot specify base_image when using custom Dockerfile (which already specifies the base image).')
-            shutil.copy(src_dockerfile_path, dst_dockerfile_path)
-        else:
-            dockerfile_text = _generate_dockerfile_text(context_dir, dst_dockerfile_path, base_image)
-            with open(dst_dockerfile_path, 'w') as f:
-                f.write(dockerfile_text)
-        
-        cache_name = 'build_image_from_working_dir'
-        cache_key = calculate_recursive_dir_hash(context_dir)
-        cached_image_name = try_read_value_from_cache(cache_name, cache_key)
-        if cached_image_name:
-            return cached_image_name
-
-        if builder is None:
-            builder = default_image_builder
-        image_name = builder.build(
-            local_dir=context_dir,
+
+    # Capturing *.py and requirements.txt files
+    context_files = _collect_context_files(current_dir, file_filter_re)  # type: Dict[str, Union[str, bytes]]
+
+    src_dockerfile_path = os.path.join(current_dir, 'Dockerfile')
+    if os.path.exists(src_dockerfile_path):
+        if base_image:
+            raise ValueError('Cannot specify base_image when using custom Dockerfile (which already specifies the base image).')
+        context_files['Dockerfile'] = src_dockerfile_path
+    else:
+        dockerfile_text = _generate_dockerfile_text('requirements.txt' in context_files, base_image)
+        context_files['Dockerfile'] = dockerfile_text.encode('utf-8')
+
+    # The build context is identified by the hashes of the captured files.
+    # Only the new and the modified files are read since the file hashes are cached.
+    path_hashes = calculate_file_hashes(
+        current_dir, [rel_path for rel_path, source in context_files.items() if not isinstance(source, bytes)])
+    for rel_path, source in context_files.items():
+        if isinstance(source, bytes):
+            path_hashes[rel_path] = hashlib.sha256(source).hexdigest()
+    cache_name = 'build_image_from_working_dir'
+    cache_key = calculate_path_hashes_digest(path_hashes)
+    if image_name:
+        # The same context pushed to a different repository is a different image.
+        cache_key = hashlib.sha256((cache_key + '\t' + image_name).encode('utf-8')).hexdigest()
+    cached_image_name = try_read_value_from_cache(cache_name, cache_key)
+    if cached_image_name:
+        logging.info('Reusing the image built from the same context: {}'.format(cached_image_name))
+        return cached_image_name
+
+    if builder is None:
+        builder = default_image_builder
+    if hasattr(builder, '_build_from_files'):
+        # Streaming the captured files into the context tarball without copying them.
+        image_name = builder._build_from_files(
+            files=context_files,
             target_image=image_name,
             timeout=timeout,
         )
-        if image_name:
-            write_value_to_cache(cache_name, cache_key, image_name)
-        return image_name
+    else:
+        with tempfile.TemporaryDirectory() as context_dir:
+            logging.info('Creating the build context directory: {}'.format(context_dir))
+            for rel_path, source in context_files.items():
+                dst_path = os.path.join(context_dir, rel_path)
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                if isinstance(source, bytes):
+                    with open(dst_path, 'wb') as f:
+                        f.write(source)
+                else:
+                    shutil.copy(source, dst_path)
+            image_name = builder.build(
+                local_dir=context_dir,
+                target_image=image_name,
+                timeout=timeout,
+            )
+    if image_name:
+        write_value_to_cache(cache_name, cache_key, image_name)
+    return image_name
@@ -12,10 +12,20 @@
 # See the License for the speci
 
 import hashlib
+import json
 import os
 import shutil
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+# Files modified more recently than this are not put into the file hash cache.
+# Their modification time can still change without changing the size and the modification time
+# when the file system timestamp resolution is coarse.
+_RECENTLY_MODIFIED_FILE_SECONDS = 2
 
 
 def calculate_file_hash(file_path: str):
@@ -30,14 +40,8 @@ def calculate_file_hash(file_path: str):
     return sha.hexdigest()
 
 
-def calculate_recursive_dir_hash(root_dir_path: str):
-    path_hashes = {}
-    for dirpath, dirnames, filenames in os.walk(root_dir_path):
-        for file_name in filenames:
-            file_path = os.path.join(dirpath, file_name)
-            rel_file_path = os.path.relpath(file_path, root_dir_path)
-            file_hash = calculate_file_hash(file_path)
-            path_hashes[rel_file_path] = file_hash
+def calculate_path_hashes_digest(path_hashes: Dict[str, str]) -> str:
+    '''Calculates the combined hash of the relative file paths and their content hashes.'''
     binary_path_hash_lines = sorted(path.encode('utf-8') + b'\t' + path_hash.encode('utf-8') + b'\n' for path, path_hash in path_hashes.items())
     binary_path_hash_doc = b''.join(binary_path_hash_lines)
 
@@ -45,15 +49,86 @@ def calculate_recursive_dir_hash(root_dir_path: str):
     return full_hash
 
 
+def calculate_file_hashes(root_dir_path: str, rel_file_paths: Iterable[str], max_workers: int = None) -> Dict[str, str]:
+    '''Calculates the hashes of the files under the root directory.
+
+    The files are hashed in parallel. The hashes are cached on disk keyed by the file size and modification time,
+    so only the new and the changed files are read again when the same directory is hashed next time.
+    '''
+    root_dir_path = os.path.abspath(root_dir_path)
+    hash_cache_path = _get_cache_dir() / 'file_hashes' / (hashlib.sha256(root_dir_path.encode('utf-8')).hexdigest() + '.json')
+    try:
+        old_hash_cache = json.loads(hash_cache_path.read_text())
+    except (OSError, ValueError):
+        old_hash_cache = {}
+
+    new_hash_cache = {}
+    path_hashes = {}
+    paths_to_hash = []
+    now = time.time()
+    for rel_file_path in rel_file_paths:
+        stat = os.stat(os.path.join(root_dir_path, rel_file_path))
+        file_key = [stat.st_size, stat.st_mtime_ns]
+        cached_entry = old_hash_cache.get(rel_file_path)
+        if cached_entry and cached_entry[:2] == file_key:
+            path_hashes[rel_file_path] = cached_entry[2]
+            new_hash_cache[rel_file_path] = cached_entry
+            continue
+        paths_to_hash.append(rel_file_path)
+        if now - stat.st_mtime > _RECENTLY_MODIFIED_FILE_SECONDS:
+            new_hash_cache[rel_file_path] = file_key
+
+    file_hashes = _calculate_file_hashes_in_parallel(
+        [os.path.join(root_dir_path, path) for path in paths_to_hash], max_workers)
+    for rel_file_path, file_hash in zip(paths_to_hash, file_hashes):
+        path_hashes[rel_file_path] = file_hash
+        if rel_file_path in new_hash_cache:
+            new_hash_cache[rel_file_path] = new_hash_cache[rel_file_path] + [file_hash]
+
+    if new_hash_cache != old_hash_cache:
+        try:
+            hash_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Writing atomically since several processes can hash the same directory.
+            temp_hash_cache_path = hash_cache_path.with_name(hash_cache_path.name + '.' + str(os.getpid()) + '.tmp')
+            temp_hash_cache_path.write_text(json.dumps(new_hash_cache))
+            os.replace(str(temp_hash_cache_path), str(hash_cache_path))
+        except OSError:
+            pass
+
+    return path_hashes
+
+
+def calculate_recursive_dir_hash(root_dir_path: str):
+    rel_file_paths = []
+    for dirpath, dirnames, filenames in os.walk(root_dir_path):
+        for file_name in filenames:
+            file_path = os.path.join(dirpath, file_name)
+            rel_file_paths.append(os.path.relpath(file_path, root_dir_path))
+    file_hashes = _calculate_file_hashes_in_parallel([os.path.join(root_dir_path, path) for path in rel_file_paths])
+    return calculate_path_hashes_digest(dict(zip(rel_file_paths, file_hashes)))
+
+
+def _calculate_file_hashes_in_parallel(file_paths: List[str], max_workers: int = None) -> List[str]:
+    if len(file_paths) <= 1:
+        return [calculate_file_hash(file_path) for file_path in file_paths]
+    # hashlib releases the GIL while hashing, so the threads hash the files in parallel.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(calculate_file_hash, file_paths))
+
+
+def _get_cache_dir() -> Path:
+    return Path(tempfile.gettempdir())
+
+
 def try_read_value_from_cache(cache_type: str, key: str) -> str:
-    cache_file_path = Path(tempfile.tempdir) / cache_type / key
+    cache_file_path = _get_cache_dir() / cache_type / key
     if cache_file_path.exists():
         return cache_file_path.read_text()
     return None
 
 
 def write_value_to_cache(cache_type: str, key: str, value: str):
-    cache_file_path = Path(tempfile.tempdir) / cache_type / key
+    cache_file_path = _get_cache_dir() / cache_type / key
     if cache_file_path.exists():
         old_value = cache_file_path.read_text()
         if value != old_value:
@@ -64,6 +139,6 @@ def write_value_to_cache(cache_type: str, key: str, value: str):
 
 
 def clear_cache(cache_type: str):
-    cache_file_path = Path(tempfile.tempdir) / cache_type
+    cache_file_path = _get_cache_dir() / cache_type
     if cache_file_path.exists():
         shutil.rmtree(cache_file_path)
@@ -16,15 +16,20 @@ __all__ = [
     'ContainerBuilder',
 ]
 
+import io
 import logging
 import tarfile
 import tempfile
+import time
 import os
 import uuid
+from typing import Callable, Mapping, Union
 
 SERVICEACCOUNT_NAMESPACE = '/var/run/secrets/kubernetes.io/serviceaccount/namespace'
 GCS_STAGING_BLOB_DEFAULT_PREFIX = 'kfp_container_build_staging'
 GCR_DEFAULT_IMAGE_SUFFIX = 'kfp_container'
+# The compressed build context is only written to disk when it's larger than this.
+_MAX_IN_MEMORY_CONTEXT_SIZE = 64 * 1024 * 1024
 
 def _get_project_id():
   import requests
@@ -163,37 +168,74 @@ class ContainerBuilder(object):
       target_image (str): The container image name where the data will be pushed. Can include tag. If not specified, the function will use the default_image_name specified when creating ContainerBuilder.
       timeout (int): time out in seconds. Default: 1000
     """
+    return self._build(
+      add_context_to_tarball=lambda tarball: tarball.add(local_dir, arcname=''),
+      docker_filename=docker_filename,
+      target_image=target_image,
+      timeout=timeout,
+    )
+
+  def _build_from_files(self, files: Mapping[str, Union[str, bytes]], docker_filename : str = 'Dockerfile', target_image=None, timeout=1000):
+    """Builds the image from the files without copying them to a local build directory first.
+
+    Args:
+      files: Maps the paths inside the build context to the local file paths or to the file contents (bytes).
+      docker_filename (str): the path of the Dockerfile inside the build context
+      target_image (str): The container image name where the data will be pushed.
+      timeout (int): time out in seconds. Default: 1000
+    """
+    def add_files_to_tarball(tarball):
+      for archive_path, source in sorted(files.items()):
+        if isinstance(source, bytes):
+          tarinfo = tarfile.TarInfo(archive_path)
+          tarinfo.size = len(source)
+          tarinfo.mtime = time.time()
+          tarinfo.mode = 0o644
+          tarball.addfile(tarinfo, io.BytesIO(source))
+        else:
+          # Opening the file so that the symlinks are followed like shutil.copy does.
+          with open(source, 'rb') as f:
+            tarball.addfile(tarball.gettarinfo(arcname=archive_path, fileobj=f), f)
+
+    return self._build(
+      add_context_to_tarball=add_files_to_tarball,
+      docker_filename=docker_filename,
+      target_image=target_image,
+      timeout=timeout,
+    )
+
+  def _build(self, add_context_to_tarball: Callable[[tarfile.TarFile], None], docker_filename, target_image, timeout):
     target_image = target_image or self._get_default_image_name()
-    # Prepare build context
-    with tempfile.TemporaryDirectory() as local_build_dir:
-      from ._gcs_helper import GCSHelper
-      logging.info('Generate build files.')
-      local_tarball_path = os.path.join(local_build_dir, 'docker.tmp.tar.gz')
-      self._wrap_dir_in_tarball(local_tarball_path, local_dir)
+    from ._gcs_helper import GCSHelper
+    logging.info('Generate build files.')
+    # Prepare build context. The tarball is compressed while being written and is only spilled to disk when it's large.
+    with tempfile.SpooledTemporaryFile(max_size=_MAX_IN_MEMORY_CONTEXT_SIZE) as tarball_file:
+      with tarfile.open(fileobj=tarball_file, mode='w:gz') as tarball:
+        add_context_to_tarball(tarball)
       # Upload to the context
       context = os.path.join(self._get_staging_location(), str(uuid.uuid4()) + '.tar.gz')
-      GCSHelper.upload_gcs_file(local_tarball_path, context)
-
-      # Run kaniko job
-      kaniko_spec = self._generate_kaniko_spec(context=context,
-                                               docker_filename=docker_filename,
-                                               target_image=target_image)
-      logging.info('Start a kaniko job for build.')
-      from ._k8s_job_helper import K8sJobHelper
-      k8s_helper = K8sJobHelper()
-      result_pod_obj = k8s_helper.run_job(kaniko_spec, timeout)
-      logging.info('Kaniko job complete.')
-
-      # Clean up
-      GCSHelper.remove_gcs_blob(context)
-
-      # Returning image name with digest
-      (image_repo, _, image_tag) = target_image.partition(':')
-      # When Kaniko build completes successfully, the termination message is the hash digest of the newly built image. Otherwise it's empty. See https://github.com/GoogleContainerTools/kaniko#--digest-file https://kubernetes.io/docs/tasks/debug-application-cluster/determine-reason-pod-failure/#customizing-the-termination-message
-      termination_message = [status.state.terminated.message for status in result_pod_obj.status.container_statuses if status.name == 'kaniko'][0] # Note: Using status.state instead of status.last_state since last_state entries can still be None
-      image_digest = termination_message
-      if not image_digest.startswith('sha256:'):
-        raise RuntimeError("Kaniko returned invalid image digest: {}".format(image_digest))
-      strict_image_name = image_repo + '@' + image_digest
-      logging.info('Built and pushed image: {}.'.format(strict_image_name))
-      return strict_image_name
+      GCSHelper.upload_gcs_file_obj(tarball_file, context)
+
+    # Run kaniko job
+    kaniko_spec = self._generate_kaniko_spec(context=context,
+                                             docker_filename=docker_filename,
+                                             target_image=target_image)
+    logging.info('Start a kaniko job for build.')
+    from ._k8s_job_helper import K8sJobHelper
+    k8s_helper = K8sJobHelper()
+    result_pod_obj = k8s_helper.run_job(kaniko_spec, timeout)
+    logging.info('Kaniko job complete.')
+
+    # Clean up
+    GCSHelper.remove_gcs_blob(context)
+
+    # Returning image name with digest
+    (image_repo, _, image_tag) = target_image.partition(':')
+    # When Kaniko build completes successfully, the termination message is the hash digest of the newly built image. Otherwise it's empty. See https://github.com/GoogleContainerTools/kaniko#--digest-file https://kubernetes.io/docs/tasks/debug-application-cluster/determine-reason-pod-failure/#customizing-the-termination-message
+    termination_message = [status.state.terminated.message for status in result_pod_obj.status.container_statuses if status.name == 'kaniko'][0] # Note: Using status.state instead of status.last_state since last_state entries can still be None
+    image_digest = termination_message
+    if not image_digest.startswith('sha256:'):
+      raise RuntimeError("Kaniko returned invalid image digest: {}".format(image_digest))
+    strict_image_name = image_repo + '@' + image_digest
+    logging.info('Built and pushed image: {}.'.format(strict_image_name))
+    return strict_image_name
@@ -46,6 +46,16 @@ class GCSHelper(object):
     blob = GCSHelper.get_blob_from_gcs_uri(gcs_path)
     blob.upload_from_filename(local_path)
 
+  @staticmethod
+  def upload_gcs_file_obj(file_obj, gcs_path):
+    """
+    Args:
+      file_obj: file object to upload from the beginning
+      gcs_path (str) : gcs blob path
+    """
+    blob = GCSHelper.get_blob_from_gcs_uri(gcs_path)
+    blob.upload_from_file(file_obj, rewind=True)
+
   @staticmethod
   def write_to_gcs_path(path: str, content: str) -> None:
     """Writes serialized content to a GCS location.
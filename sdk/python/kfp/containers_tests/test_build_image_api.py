@@ -15,6 +15,7 @@ import os
 import re
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from typing import Callable
@@ -103,6 +104,69 @@ COPY . .
         self.assertEqual(builder.invocations_count, 2)
 
 
+    def test_dockerignore(self):
+        with tempfile.TemporaryDirectory() as context_dir:
+            context_path = Path(context_dir)
+            for rel_path in ['main.py', 'lib/file1.py', 'lib/test_file1.py', 'venv/lib/site.py', 'data/a/b.py', 'data/keep.py', '.git/hooks/hook.py']:
+                (context_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                (context_path / rel_path).write_text('#py file')
+            (context_path / '.dockerignore').write_text('\n'.join([
+                '# Comment',
+                'venv',
+                '**/test_*.py',
+                'data/**',
+                '!data/keep.py',
+            ]))
+            expected_file_paths = {
+                'Dockerfile',
+                'main.py',
+                str(Path('lib') / 'file1.py'),
+                str(Path('data') / 'keep.py'),
+            }
+            def file_paths_check(file_paths):
+                self.assertEqual(file_paths, expected_file_paths)
+
+            from kfp.containers._cache import clear_cache
+            clear_cache('build_image_from_working_dir')
+            builder = MockImageBuilder(file_paths_check=file_paths_check)
+            build_image_from_working_dir(working_dir=context_dir, base_image='python:3.6.5', builder=builder)
+
+    def test_image_cache_reuses_file_hashes(self):
+        from kfp.containers import _cache
+        _cache.clear_cache('build_image_from_working_dir')
+        builder = InvocationCountingDummyImageBuilder()
+        with prepare_context_dir(py_content='py1') as context_dir:
+            # The hashes of the recently modified files are not cached
+            old_time = time.time() - 100
+            for dirpath, dirnames, filenames in os.walk(context_dir):
+                for file_name in filenames:
+                    os.utime(os.path.join(dirpath, file_name), (old_time, old_time))
+            build_image_from_working_dir(working_dir=context_dir, base_image='python:3.6.5', builder=builder)
+            self.assertEqual(builder.invocations_count, 1)
+
+            with mock.patch.object(_cache, 'calculate_file_hash', wraps=_cache.calculate_file_hash) as calculate_file_hash:
+                # Nothing has changed: no files are read and the image is not rebuilt.
+                build_image_from_working_dir(working_dir=context_dir, base_image='python:3.6.5', builder=builder)
+                self.assertEqual(builder.invocations_count, 1)
+                self.assertEqual(calculate_file_hash.call_count, 0)
+
+                # Only the modified file is read again
+                (Path(context_dir) / 'lib' / 'file1.py').write_text('py2')
+                build_image_from_working_dir(working_dir=context_dir, base_image='python:3.6.5', builder=builder)
+                self.assertEqual(builder.invocations_count, 2)
+                self.assertEqual(calculate_file_hash.call_count, 1)
+
+    def test_streaming_builder(self):
+        from kfp.containers._cache import clear_cache
+        clear_cache('build_image_from_working_dir')
+        builder = StreamingDummyImageBuilder()
+        with prepare_context_dir(py_content='py3') as context_dir:
+            build_image_from_working_dir(working_dir=context_dir, base_image='python:3.6.5', builder=builder)
+            self.assertEqual(set(builder.files.keys()), {'Dockerfile', 'requirements.txt', 'lib/file1.py'})
+            self.assertEqual(builder.files['lib/file1.py'], os.path.join(context_dir, 'lib', 'file1.py'))
+            self.assertIn(b'FROM python:3.6.5', builder.files['Dockerfile'])
+
+
 class InvocationCountingDummyImageBuilder:
     def __init__(self):
         self.invocations_count = 0
@@ -112,6 +176,15 @@ class InvocationCountingDummyImageBuilder:
         return "image/name@sha256:0123456789abcdef0123456789abcdef"
 
 
+class StreamingDummyImageBuilder:
+    def __init__(self):
+        self.files = None
+
+    def _build_from_files(self, files = None, target_image = None, timeout = 1000):
+        self.files = files
+        return "image/name@sha256:0123456789abcdef0123456789abcdef"
+
+
 def prepare_context_dir(py_content: str = '#py file', sh_content: str = '#sh file') -> str:
     context_dir = tempfile.TemporaryDirectory()
     #Preparing context
@@ -13,17 +13,44 @@
 # limitations under the License.
 
 
-from ._pipeline_param import PipelineParam, match_serialized_pipelineparam
-from ._pipeline import Pipeline, pipeline, get_pipeline_conf, PipelineConf
-from ._container_op import ContainerOp, InputArgumentPath, UserContainer, Sidecar
-from ._resource_op import ResourceOp
-from ._volume_op import (
-    VolumeOp, VOLUME_MODE_RWO, VOLUME_MODE_RWM, VOLUME_MODE_ROM
-)
-from ._pipeline_volume import PipelineVolume
-from ._volume_snapshot_op import VolumeSnapshotOp
-from ._ops_group import OpsGroup, ExitHandler, Condition, ParallelFor, SubGraph
-from ._component import python_component, graph_component, component
+# The DSL classes depend on the Kubernetes client which is expensive to import,
+# so the submodules are only loaded when their names are accessed (PEP 562).
+_attribute_to_module = {
+    'PipelineParam': '._pipeline_param',
+    'match_serialized_pipelineparam': '._pipeline_param',
+    'Pipeline': '._pipeline',
+    'pipeline': '._pipeline',
+    'get_pipeline_conf': '._pipeline',
+    'PipelineConf': '._pipeline',
+    'ContainerOp': '._container_op',
+    'InputArgumentPath': '._container_op',
+    'UserContainer': '._container_op',
+    'Sidecar': '._container_op',
+    'ResourceOp': '._resource_op',
+    'VolumeOp': '._volume_op',
+    'VOLUME_MODE_RWO': '._volume_op',
+    'VOLUME_MODE_RWM': '._volume_op',
+    'VOLUME_MODE_ROM': '._volume_op',
+    'PipelineVolume': '._pipeline_volume',
+    'VolumeSnapshotOp': '._volume_snapshot_op',
+    'OpsGroup': '._ops_group',
+    'ExitHandler': '._ops_group',
+    'Condition': '._ops_group',
+    'ParallelFor': '._ops_group',
+    'SubGraph': '._ops_group',
+    'python_component': '._component',
+    'graph_component': '._component',
+    'component': '._component',
+}
+
+__all__ = list(_attribute_to_module) + [
+    'EXECUTION_ID_PLACEHOLDER',
+    'RUN_ID_PLACEHOLDER',
+]
+
+from ..components._lazy_import import attach_lazy_attributes as _attach_lazy_attributes
+__getattr__, __dir__ = _attach_lazy_attributes(
+    __name__, globals(), _attribute_to_module)
 
 EXECUTION_ID_PLACEHOLDER = '{{workflow.uid}}-{{pod.name}}'
 RUN_ID_PLACEHOLDER = '{{workflow.uid}}'
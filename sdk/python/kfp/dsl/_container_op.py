@@ -930,9 +930,6 @@ class BaseOp(object):
         return str({self.__class__.__name__: self.__dict__})
 
 
-from ._pipeline_volume import PipelineVolume  # The import is here to prevent circular reference problems.
-
-
 class InputArgumentPath:
     def __init__(self, argument, input=None, path=None):
         self.argument = argument
@@ -1219,7 +1216,7 @@ class ContainerOp(BaseOp):
                 if hasattr(pvolume, "dependent_names"):
                     self.dependent_names.extend(pvolume.dependent_names)
                 else:
-                    pvolume = PipelineVolume(volume=pvolume)
+                    pvolume = _pipeline_volume.PipelineVolume(volume=pvolume)
                 pvolume = pvolume.after(self)
                 self.pvolumes[mount_path] = pvolume
                 self.add_volume(pvolume)
@@ -1249,3 +1246,8 @@ class _MultipleOutputsError:
 
     def __str__(self):
         _MultipleOutputsError.raise_error()
+
+
+# The import is here to prevent circular reference problems: _pipeline_volume
+# transitively imports the modules that subclass or reference ContainerOp.
+from . import _pipeline_volume
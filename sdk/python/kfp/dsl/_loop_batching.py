@@ -0,0 +1,207 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Packing the ParallelFor loop items into batches.
+
+A batched loop iterates over the batches of items instead of the items. The
+loop task is rewritten to run a driver program that executes the original
+command for every item of its batch (concurrently) and aggregates the per-item
+outputs into JSON arrays. The static item lists are split at compile time. The
+dynamic (withParam) item lists are split at runtime by a generated task.
+"""
+
+import json
+import re
+
+from kfp.dsl import _for_loop, _pipeline_param
+
+# The loop item references in the rewritten command line.
+_ITEM_MARKER = '__kfp_batch_item__'
+_ITEM_ATTRIBUTE_MARKER = '__kfp_batch_item.{}__'
+
+# argv: <batch JSON> <parallelism> <output paths JSON> -- <command>...
+# The programs must not contain double curly braces, since they are parts of Argo templates.
+_BATCH_DRIVER_PROGRAM = '''
+import concurrent.futures
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+batch = json.loads(sys.argv[1])
+parallelism = int(sys.argv[2])
+output_paths = json.loads(sys.argv[3])
+command = sys.argv[5:]
+marker_re = re.compile(r"__kfp_batch_item(?:\\.(\\w+))?__")
+batch_dir = tempfile.mkdtemp(prefix="kfp_batch_")
+
+
+def to_string(value):
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def get_item_output_path(index, path):
+    return os.path.join(batch_dir, str(index)) + path
+
+
+def run_item(index):
+    item = batch[index]
+    item_command = []
+    for arg in command:
+        for path in sorted(output_paths, key=len, reverse=True):
+            arg = arg.replace(path, get_item_output_path(index, path))
+        arg = marker_re.sub(lambda match: to_string(item if match.group(1) is None else item[match.group(1)]), arg)
+        item_command.append(arg)
+    for path in output_paths:
+        os.makedirs(os.path.dirname(get_item_output_path(index, path)), exist_ok=True)
+    return subprocess.run(item_command).returncode
+
+
+with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+    return_codes = list(executor.map(run_item, range(len(batch))))
+
+failed_indices = [index for index, return_code in enumerate(return_codes) if return_code != 0]
+if failed_indices:
+    print("Failed items: {} of {}. Indices: {}".format(len(failed_indices), len(batch), failed_indices), file=sys.stderr)
+    sys.exit(1)
+
+for path in output_paths:
+    values = []
+    for index in range(len(batch)):
+        item_output_path = get_item_output_path(index, path)
+        if os.path.exists(item_output_path):
+            with open(item_output_path) as f:
+                values.append(f.read())
+        else:
+            values.append(None)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(values, f)
+'''
+
+_SPLIT_ITEMS_PROGRAM = '''
+import json
+import os
+import sys
+
+items = json.loads(sys.argv[1])
+batch_size = int(sys.argv[2])
+batches = [json.dumps(items[i:i + batch_size]) for i in range(0, len(items), batch_size)]
+os.makedirs(os.path.dirname(sys.argv[3]), exist_ok=True)
+with open(sys.argv[3], "w") as f:
+    json.dump(batches, f)
+'''
+
+
+def batch_loop(loop_group):
+  """Rewrites the loop (after its body was built) to iterate over the item batches.
+
+  Only the loops with a single task are supported.
+  """
+  from . import _container_op
+
+  if len(loop_group.ops) != 1 or loop_group.groups or not isinstance(loop_group.ops[0], _container_op.ContainerOp):
+    raise ValueError(
+        'ParallelFor batch_size is only supported for loops with a single container task. '
+        'Loop "{}" has {} tasks and {} nested groups.'.format(loop_group.name, len(loop_group.ops), len(loop_group.groups)))
+  op = loop_group.ops[0]
+  container = op.container
+  if not container.command:
+    raise ValueError(
+        'ParallelFor batch_size requires the task "{}" to specify the container command.'.format(op.name))
+
+  loop_args = loop_group.loop_args
+  if loop_group.items_is_pipeline_param:
+    batch_param = _create_split_items_task(
+        loop_args.items_or_pipeline_param, loop_group.batch_size, container.image)
+    batch_loop_args = _for_loop.LoopArguments.from_pipeline_param(batch_param)
+  else:
+    items = loop_args.to_list_for_task_yaml()
+    batch_size = loop_group.batch_size
+    # The nested pipeline parameters stay in the serialized batches and are resolved by the compiler.
+    batches = [
+        json.dumps(items[i:i + batch_size], default=str)
+        for i in range(0, len(items), batch_size)
+    ]
+    batch_loop_args = _for_loop.LoopArguments(batches, code=None, name_override=loop_args.name)
+
+  item_param_replacements = {}
+  for param in _pipeline_param.extract_pipelineparams_from_any([container.command, container.args, op._parameter_arguments]):
+    if param.name == loop_args.name:
+      item_param_replacements[str(param)] = _ITEM_MARKER
+    elif _for_loop.LoopArgumentVariable.name_is_loop_arguments_variable(param.name) and param.name.startswith(loop_args.name):
+      subvar_name = _for_loop.LoopArgumentVariable.get_subvar_name(param.name)
+      item_param_replacements[str(param)] = _ITEM_ATTRIBUTE_MARKER.format(subvar_name)
+
+  def replace_item_params(value: str) -> str:
+    for serialized_param, marker in item_param_replacements.items():
+      value = value.replace(serialized_param, marker)
+    return value
+
+  output_paths = sorted(set(op.file_outputs.values()))
+  container.command = [
+      'python3', '-u', '-c', _BATCH_DRIVER_PROGRAM,
+      str(batch_loop_args),
+      str(loop_group.batch_parallelism or loop_group.batch_size),
+      json.dumps(output_paths),
+      '--',
+  ] + [replace_item_params(arg) for arg in container.command + (container.args or [])]
+  container.args = None
+  if op._parameter_arguments:
+    op._parameter_arguments = {
+        name: replace_item_params(value) for name, value in op._parameter_arguments.items()
+    }
+  # The inputs are re-extracted from the rewritten container.
+  op.inputs = []
+  remaining_item_params = [
+      param for param in op.inputs
+      if param.name != batch_loop_args.name and (
+          param.name == loop_args.name or
+          param.name.startswith(loop_args.name + _for_loop.LoopArgumentVariable.SUBVAR_NAME_DELIMITER))
+  ]
+  if remaining_item_params:
+    raise ValueError(
+        'ParallelFor batch_size only supports passing the loop items to the task command line. '
+        'Task "{}" uses them elsewhere (e.g. in an environment variable or as an input artifact).'.format(op.name))
+
+  # The outputs of a batched task are the JSON arrays of the per-item outputs.
+  for output in op.outputs.values():
+    output.param_type = 'JsonArray'
+  loop_group.loop_args = batch_loop_args
+
+
+def _create_split_items_task(items_param, batch_size: int, image: str):
+  from ..components._components import _create_task_factory_from_component_spec
+  from ..components._structures import (
+      ComponentSpec, ContainerImplementation, ContainerSpec, InputSpec, InputValuePlaceholder,
+      OutputPathPlaceholder, OutputSpec,
+  )
+
+  # The batched task image is reused since it must have Python anyway.
+  split_items_op = _create_task_factory_from_component_spec(ComponentSpec(
+      name='Split loop items',
+      inputs=[InputSpec('items'), InputSpec('batch_size', 'Integer')],
+      outputs=[OutputSpec('batches', 'JsonArray')],
+      implementation=ContainerImplementation(container=ContainerSpec(
+          image=image,
+          command=[
+              'python3', '-u', '-c', _SPLIT_ITEMS_PROGRAM,
+              InputValuePlaceholder('items'),
+              InputValuePlaceholder('batch_size'),
+              OutputPathPlaceholder('batches'),
+          ],
+      )),
+  ))
+  return split_items_op(items=items_param, batch_size=batch_size).outputs['batches']
@@ -190,6 +190,21 @@ class ParallelFor(OpsGroup):
       with dsl.ParallelFor([{'a': 1, 'b': 10}, {'a': 2, 'b': 20}]) as item:
         op1 = ContainerOp(..., args=['echo {}'.format(item.a)])
         op2 = ContainerOp(..., args=['echo {}'.format(item.b])
+
+    When there are many small items, they can be packed into batches, so that
+    each pod runs a batch of items concurrently instead of a single item. Only
+    the loops with a single task are supported. The outputs of the batched
+    task are JSON arrays of the per-item outputs::
+
+      with dsl.ParallelFor(shards, batch_size=100, batch_parallelism=8) as shard:
+        score_task = score_op(shard)
+
+  Args:
+    loop_args: The items to loop over. A list or a pipeline parameter with a JSON list.
+    parallelism: The maximum number of the concurrently running iterations.
+    batch_size: The number of items per iteration (pod).
+    batch_parallelism: The number of the concurrently processed items in each
+      batch. Defaults to batch_size.
   """
   TYPE_NAME = 'for_loop'
 
@@ -198,14 +213,25 @@ class ParallelFor(OpsGroup):
     return uuid.uuid4().hex[:_for_loop.LoopArguments.NUM_CODE_CHARS]
 
   def __init__(self,  loop_args: Union[_for_loop.ItemList, _pipeline_param.PipelineParam],
-               parallelism: int=None):
+               parallelism: int=None, batch_size: int=None, batch_parallelism: int=None):
     if parallelism and parallelism < 1:
         raise ValueError('ParallelFor parallism set to < 1, allowed values are > 0')
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('ParallelFor batch_size set to < 1, allowed values are > 0')
+    if batch_parallelism is not None and batch_parallelism < 1:
+        raise ValueError('ParallelFor batch_parallelism set to < 1, allowed values are > 0')
+    self.batch_size = batch_size
+    self.batch_parallelism = batch_parallelism
     
     self.items_is_pipeline_param = isinstance(loop_args, _pipeline_param.PipelineParam)
 
-    # use a random code to uniquely identify this loop
-    code = self._get_unique_id_code()
+    # use a random (or a structural, when compiling deterministically) code to uniquely identify this loop
+    pipeline = _pipeline.Pipeline.get_default_pipeline()
+    if pipeline and pipeline.deterministic_naming:
+      code = pipeline.get_structural_id_code(
+          self.TYPE_NAME, loop_args, _for_loop.LoopArguments.NUM_CODE_CHARS)
+    else:
+      code = self._get_unique_id_code()
     group_name = 'for-loop-{}'.format(code)
     super().__init__(self.TYPE_NAME, name=group_name, parallelism=parallelism)
 
@@ -220,3 +246,9 @@ class ParallelFor(OpsGroup):
   def __enter__(self) -> _for_loop.LoopArguments:
     _ = super().__enter__()
     return self.loop_args
+
+  def __exit__(self, *args):
+    super().__exit__(*args)
+    if self.batch_size and not args[0]:
+      from . import _loop_batching
+      _loop_batching.batch_loop(self)
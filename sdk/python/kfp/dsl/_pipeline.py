@@ -12,10 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Callable, Optional, Union
+import hashlib
+import json
+from typing import Any, Callable, Optional, Union
 from kubernetes.client.models import V1PodDNSConfig
 from . import _container_op
-from . import _resource_op
 from . import _ops_group
 from ._component_bridge import \
   _create_container_op_from_component_and_arguments, \
@@ -28,6 +29,9 @@ import sys
 # It can be used by command-line DSL compiler to inject code that runs for every pipeline definition.
 _pipeline_decorator_handler = None
 
+# The static ParallelFor item lists bigger than this (in bytes, serialized as JSON) are loaded at runtime by default.
+_DEFAULT_LOOP_ITEMS_EXTERNALIZATION_THRESHOLD = 256 * 1024
+
 
 def pipeline(
     name: Optional[str] = None,
@@ -85,6 +89,7 @@ class PipelineConf():
     self.parallelism = None
     self._data_passing_method = None
     self.dns_config = None
+    self.loop_items_externalization_threshold = _DEFAULT_LOOP_ITEMS_EXTERNALIZATION_THRESHOLD
 
   def set_image_pull_secrets(self, image_pull_secrets):
     """Configures the pipeline level imagepullsecret
@@ -118,6 +123,23 @@ class PipelineConf():
     self.parallelism = max_num_pods
     return self
 
+  def set_loop_items_externalization_threshold(self, size_bytes: Optional[int]):
+    """Configures the size of the static ParallelFor item lists that are moved out of the loop tasks.
+
+    The bigger item lists are compressed and loaded by a generated task at runtime, which keeps the workflow small.
+    The loaded items are passed through an output parameter, so the lists are split between several loop tasks
+    to keep every output under the size limit of Argo. The lists that cannot be split stay inline.
+    By default, the lists bigger than 256 KiB are externalized.
+
+    Args:
+      size_bytes: The minimum size of the externalized item lists (serialized as JSON). None disables the externalization.
+    """
+    if size_bytes is not None and size_bytes < 0:
+        raise ValueError('Loop items externalization threshold set to < 0, allowed values are >= 0')
+
+    self.loop_items_externalization_threshold = size_bytes
+    return self
+
   def set_ttl_seconds_after_finished(self, seconds: int):
     """Configures the ttl after the pipeline has finished.
 
@@ -268,6 +290,9 @@ class Pipeline():
     self.group_id = 0
     self.conf = PipelineConf()
     self._metadata = None
+    # When set, the generated IDs are derived from the pipeline structure instead of being random.
+    self.deterministic_naming = False
+    self._structural_id_count = 0
 
   def __enter__(self):
     if Pipeline._default_pipeline:
@@ -312,7 +337,7 @@ class Pipeline():
 
     return op_name
 
-  def push_ops_group(self, group: _ops_group.OpsGroup):
+  def push_ops_group(self, group: '_ops_group.OpsGroup'):
     """Push an OpsGroup into the stack.
 
     Args:
@@ -335,6 +360,23 @@ class Pipeline():
     self.group_id += 1
     return self.group_id
 
+  def get_structural_id_code(self, kind: str, data: Any, length: int) -> str:
+    """Get an id code derived from the pipeline structure built so far.
+
+    Used instead of the random codes when deterministic_naming is set, so that
+    compiling the same pipeline always produces the same ids.
+
+    Args:
+      kind: The kind of the identified object (e.g. the group type).
+      data: The JSON-serializable description of the identified object. The
+        other objects are serialized using str().
+      length: The length of the returned code.
+    """
+    self._structural_id_count += 1
+    structure = [self.name, kind, self._structural_id_count, self.group_id, len(self.ops), data]
+    structure_json = json.dumps(structure, sort_keys=True, default=str)
+    return hashlib.sha256(structure_json.encode('utf-8')).hexdigest()[:length]
+
   def _set_metadata(self, metadata):
     """_set_metadata passes the containerop the metadata information
 
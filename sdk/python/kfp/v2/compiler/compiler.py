@@ -18,8 +18,10 @@ pipeline into Pipeline IR:
 https://docs.google.com/document/d/1PUDuSQ8vmeKSBloli53mp7GIvzekaY7sggg6ywy35Dk/
 """
 
+import hashlib
 import inspect
-from typing import Any, Callable, List, Mapping, Optional
+import json
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
 
 import kfp
 from kfp.compiler._k8s_helper import sanitize_k8s_name
@@ -83,14 +85,26 @@ class Compiler(object):
     pipeline_spec.schema_version = 'v2alpha1'
 
     deployment_config = pipeline_spec_pb2.PipelineDeploymentConfig()
-    importer_tasks = []
+    # Importer tasks keyed by the importer spec (artifact uri and type schema).
+    importer_tasks = {}
+    # Executor labels keyed by the hash of the container spec.
+    executor_labels = {}
 
     for op in pipeline.ops.values():
       component_spec = op._metadata
       task = pipeline_spec.tasks.add()
       task.CopyFrom(op.task_spec)
-      deployment_config.executors[task.executor_label].container.CopyFrom(
-          op.container_spec)
+      # The tasks with identical container specs (e.g. multiple tasks created
+      # from the same component) share the executor.
+      container_spec_hash = hashlib.sha256(
+          op.container_spec.SerializeToString(deterministic=True)).digest()
+      executor_label = executor_labels.setdefault(container_spec_hash,
+                                                  task.executor_label)
+      if executor_label == task.executor_label:
+        deployment_config.executors[executor_label].container.CopyFrom(
+            op.container_spec)
+      else:
+        task.executor_label = executor_label
 
       # A task may have explicit depdency on other tasks even though they may
       # not have inputs/outputs dependency. e.g.: op2.after(op1)
@@ -100,27 +114,32 @@ class Compiler(object):
       # Check if need to insert importer node
       for input_name in task.inputs.artifacts:
         if not task.inputs.artifacts[input_name].producer_task:
-          type_schema = type_utils.get_input_artifact_type_schema(
-              input_name, component_spec.inputs)
+          # Retrieve the pre-built importer spec
+          importer_spec = op.importer_spec[input_name]
+
+          # The tasks importing the same artifact share the importer task.
+          importer_key = importer_spec.SerializeToString(deterministic=True)
+          importer_task = importer_tasks.get(importer_key)
+          if importer_task is None:
+            type_schema = type_utils.get_input_artifact_type_schema(
+                input_name, component_spec.inputs)
+
+            importer_task = importer_node.build_importer_task_spec(
+                dependent_task=task,
+                input_name=input_name,
+                input_type_schema=type_schema)
+            importer_tasks[importer_key] = importer_task
 
-          importer_task = importer_node.build_importer_task_spec(
-              dependent_task=task,
-              input_name=input_name,
-              input_type_schema=type_schema)
-          importer_tasks.append(importer_task)
+            deployment_config.executors[
+                importer_task.executor_label].importer.CopyFrom(importer_spec)
 
           task.inputs.artifacts[
               input_name].producer_task = importer_task.task_info.name
           task.inputs.artifacts[
               input_name].output_artifact_key = importer_node.OUTPUT_KEY
 
-          # Retrieve the pre-built importer spec
-          importer_spec = op.importer_spec[input_name]
-          deployment_config.executors[
-              importer_task.executor_label].importer.CopyFrom(importer_spec)
-
     pipeline_spec.deployment_config.Pack(deployment_config)
-    pipeline_spec.tasks.extend(importer_tasks)
+    pipeline_spec.tasks.extend(importer_tasks.values())
 
     return pipeline_spec
 
@@ -199,6 +218,43 @@ class Compiler(object):
 
     return pipeline_job
 
+  def _create_pipeline_job_dict(
+      self,
+      pipeline_spec: pipeline_spec_pb2.PipelineSpec,
+      pipeline_root: str,
+      pipeline_parameters: Optional[Mapping[str, Any]] = None,
+  ) -> Dict[str, Any]:
+    """Creates the JSON representation of the pipeline job.
+
+    Same as `json_format.MessageToDict(self._create_pipeline_job(...))`, but the
+    pipeline spec is converted directly instead of going through the Struct
+    message, which is slow to populate for large pipelines.
+
+    Args:
+      pipeline_spec: The pipeline spec object.
+      pipeline_root: The root of the pipeline outputs.
+      pipeline_parameters: The mapping from parameter names to values. Optional.
+
+    Returns:
+      A dictionary representing the compiled pipeline job.
+    """
+    runtime_config = compiler_utils.build_runtime_config_spec(
+        pipeline_root=pipeline_root, pipeline_parameters=pipeline_parameters)
+    pipeline_job = pipeline_spec_pb2.PipelineJob(runtime_config=runtime_config)
+    pipeline_job_dict = json_format.MessageToDict(pipeline_job)
+    pipeline_job_dict['pipelineSpec'] = json_format.MessageToDict(pipeline_spec)
+
+    # Keeping the field order of the message serialization.
+    field_order = [
+        field.json_name for field in sorted(
+            pipeline_job.DESCRIPTOR.fields, key=lambda field: field.number)
+    ]
+    return {
+        key: pipeline_job_dict[key]
+        for key in field_order
+        if key in pipeline_job_dict
+    }
+
   def compile(self,
               pipeline_func: Callable[..., Any],
               pipeline_root: str,
@@ -221,7 +277,7 @@ class Compiler(object):
     try:
       kfp.TYPE_CHECK = type_check
       pipeline = self._create_pipeline(pipeline_func, pipeline_name)
-      pipeline_job = self._create_pipeline_job(
+      pipeline_job = self._create_pipeline_job_dict(
           pipeline_spec=pipeline,
           pipeline_root=pipeline_root,
           pipeline_parameters=pipeline_parameters)
@@ -229,19 +285,23 @@ class Compiler(object):
     finally:
       kfp.TYPE_CHECK = type_check_old_value
 
-  def _write_pipeline(self, pipeline_job: pipeline_spec_pb2.PipelineJob,
+  def _write_pipeline(self, pipeline_job: Union[pipeline_spec_pb2.PipelineJob,
+                                                Dict[str, Any]],
                       output_path: str) -> None:
     """Dump pipeline spec into json file.
 
     Args:
-      pipeline_job: IR pipeline job spec.
+      pipeline_job: IR pipeline job spec or its JSON representation.
       ouput_path: The file path to be written.
 
     Raises:
       ValueError: if the specified output path doesn't end with the acceptable
       extentions.
     """
-    json_text = json_format.MessageToJson(pipeline_job)
+    if isinstance(pipeline_job, dict):
+      json_text = json.dumps(pipeline_job, indent=2)
+    else:
+      json_text = json_format.MessageToJson(pipeline_job)
 
     if output_path.endswith('.json'):
       with open(output_path, 'w') as json_file:
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
 import shutil
 import tempfile
@@ -380,5 +381,60 @@ class CompilerTest(unittest.TestCase):
           output_path='output.json')
 
 
+  def test_compile_pipeline_shares_executors_and_importers(self):
+    consumer_op = components.load_component_from_text("""
+      name: consumer
+      inputs:
+      - {name: input_model, type: Model}
+      - {name: input_value, type: Integer}
+      implementation:
+        container:
+          image: gcr.io/my-project/my-image:tag
+          args:
+          - {inputUri: input_model}
+          - {inputValue: input_value}
+      """)
+
+    @dsl.pipeline(name='shared-pipeline')
+    def my_pipeline():
+      for i in range(3):
+        consumer_op(input_model='gs://bucket/model1', input_value=i)
+      consumer_op(input_model='gs://bucket/model2', input_value=3)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+      target_json_file = os.path.join(tmpdir, 'result.json')
+      compiler.Compiler().compile(
+          pipeline_func=my_pipeline,
+          pipeline_root='dummy_root',
+          output_path=target_json_file)
+      with open(target_json_file) as f:
+        pipeline_spec = json.load(f)['pipelineSpec']
+    finally:
+      shutil.rmtree(tmpdir)
+
+    tasks = {task['taskInfo']['name']: task for task in pipeline_spec['tasks']}
+    executors = pipeline_spec['deploymentConfig']['executors']
+    importer_tasks = [name for name in tasks if name.endswith('_importer')]
+    self.assertEqual(len(tasks), 6)
+    self.assertEqual(len(importer_tasks), 2)
+    self.assertEqual(len(executors), 3)
+    # All the consumer tasks use the same executor
+    self.assertEqual(
+        {tasks[name]['executorLabel'] for name in tasks
+         if name not in importer_tasks}, {'consumer'})
+    # The tasks importing the same uri share the importer task
+    producer_tasks = [
+        tasks[name]['inputs']['artifacts']['input_model']['producerTask']
+        for name in ['consumer', 'consumer 2', 'consumer 3', 'consumer 4']
+    ]
+    self.assertEqual(producer_tasks[0], producer_tasks[1])
+    self.assertEqual(producer_tasks[0], producer_tasks[2])
+    self.assertNotEqual(producer_tasks[0], producer_tasks[3])
+    self.assertEqual(
+        executors[tasks[producer_tasks[3]]['executorLabel']]['importer']
+        ['artifactUri']['constantValue']['stringValue'], 'gs://bucket/model2')
+
+
 if __name__ == '__main__':
   unittest.main()
@@ -39,12 +39,12 @@ class CompilerCliTests(unittest.TestCase):
         # Correct the sdkVersion
         golden['pipelineSpec']['sdkVersion'] = 'kfp-{}'.format(kfp.__version__)
         # Need to sort the list items before comparison
-        golden['pipelineSpec']['tasks'].sort(key=lambda x: x['executorLabel'])
+        golden['pipelineSpec']['tasks'].sort(key=lambda x: x['taskInfo']['name'])
 
       with open(os.path.join(test_data_dir, target_json), 'r') as f:
         compiled = json.load(f)
         # Need to sort the list items before comparison
-        compiled['pipelineSpec']['tasks'].sort(key=lambda x: x['executorLabel'])
+        compiled['pipelineSpec']['tasks'].sort(key=lambda x: x['taskInfo']['name'])
 
       self.maxDiff = None
       self.assertEqual(golden, compiled)
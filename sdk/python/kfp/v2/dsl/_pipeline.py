@@ -105,8 +105,7 @@ class Pipeline():
       The name of the op.
     """
     # If there is an existing op with this name then generate a new name.
-    op_name = _naming._make_name_unique_by_adding_index(op.human_name,
-                                                        list(self.ops.keys()),
+    op_name = _naming._make_name_unique_by_adding_index(op.human_name, self.ops,
                                                         ' ')
     self.ops[op_name] = op
     return op_name
@@ -15,8 +15,11 @@
 import kfp
 import kfp.compiler as compiler
 import kfp.dsl as dsl
+import base64
+import gzip
 import json
 import os
+import re
 import shutil
 import subprocess
 import sys
@@ -27,6 +30,7 @@ import unittest
 import yaml
 
 from kfp.compiler import Compiler
+from kfp.compiler._template_deduplication import deduplicate_templates
 from kfp.dsl._component import component
 from kfp.dsl import ContainerOp, pipeline, PipelineParam
 from kfp.dsl.types import Integer, InconsistentTypeException
@@ -348,6 +352,49 @@ class TestCompiler(unittest.TestCase):
     """Test basic sequential pipeline."""
     self._test_py_compile_zip('basic')
 
+  def test_py_compile_batch_manifest(self):
+    """Test compiling multiple pipelines from a manifest in batch mode."""
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    tmpdir = tempfile.mkdtemp()
+    try:
+      manifest = [
+          {'py': os.path.join(test_data_dir, 'basic.py'), 'output': 'basic.yaml'},
+          {'py': os.path.join(test_data_dir, 'coin.py'), 'output': 'coin.tar.gz'},
+          {'py': os.path.join(test_data_dir, 'missing.py'), 'output': 'missing.yaml'},
+      ]
+      manifest_path = os.path.join(tmpdir, 'manifest.yaml')
+      with open(manifest_path, 'w') as f:
+        yaml.safe_dump(manifest, f)
+      timing_report_path = os.path.join(tmpdir, 'timing.json')
+
+      process = subprocess.run(
+          ['dsl-compile', '--manifest', manifest_path, '--parallelism', '2',
+           '--timing-report', timing_report_path],
+          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+      self.assertEqual(process.returncode, 1)
+      self.assertIn(b'Compiled 2 of 3 pipelines, 1 failed', process.stdout)
+      self.assertIn(b'FAILED: ' + os.path.join(test_data_dir, 'missing.py').encode(),
+                    process.stdout)
+
+      with open(timing_report_path) as f:
+        timing_report = json.load(f)
+      self.assertEqual([item['succeeded'] for item in timing_report], [True, True, False])
+
+      for file_base_name, compiled in [
+          ('basic', yaml.safe_load(open(os.path.join(tmpdir, 'basic.yaml')))),
+          ('coin', self._get_yaml_from_tar(os.path.join(tmpdir, 'coin.tar.gz'))),
+      ]:
+        with open(os.path.join(test_data_dir, file_base_name + '.yaml'), 'r') as f:
+          golden = yaml.safe_load(f)
+        for workflow in golden, compiled:
+          del workflow['metadata']
+          for template in workflow['spec']['templates']:
+            template.pop('metadata', None)
+        self.maxDiff = None
+        self.assertEqual(golden, compiled)
+    finally:
+      shutil.rmtree(tmpdir)
+
   def test_py_compile_with_sidecar(self):
     """Test pipeline with sidecar."""
     self._test_py_compile_yaml('sidecar')
@@ -680,6 +727,246 @@ implementation:
     workflow_dict = kfp.compiler.Compiler()._compile(some_pipeline)
     self.assertEqual(workflow_dict['spec']['parallelism'], 1)
 
+  def test_externalize_large_loop_items(self):
+    """Test that the large static loop item lists are moved out of the loop tasks."""
+    def some_op(text):
+      return dsl.ContainerOp(
+          name='echo',
+          image='busybox',
+          command=['echo', text],
+      )
+
+    large_items = [{'index': i, 'text': 'the text of the item number %d' % i} for i in range(2000)]
+
+    def some_pipeline():
+      with dsl.ParallelFor(large_items) as item:
+        some_op(item.text)
+      with dsl.ParallelFor([1, 2, 3]) as item:
+        some_op(item)
+
+    pipeline_conf = dsl.PipelineConf().set_loop_items_externalization_threshold(1024)
+    workflow_dict = kfp.compiler.Compiler()._compile(some_pipeline, pipeline_conf=pipeline_conf)
+    dag_tasks = {
+        task['name']: task
+        for template in workflow_dict['spec']['templates']
+        for task in template.get('dag', {}).get('tasks', [])
+    }
+    loader_names = [name for name in dag_tasks if name.endswith('-items')]
+    self.assertEqual(len(loader_names), 1)
+    loader_name = loader_names[0]
+    loop_tasks = [task for task in dag_tasks.values() if loader_name in task.get('dependencies', [])]
+    self.assertEqual(len(loop_tasks), 1)
+    self.assertEqual(
+        loop_tasks[0]['withParam'],
+        '{{tasks.%s.outputs.parameters.%s-items}}' % (loader_name, loader_name))
+    self.assertNotIn('withItems', loop_tasks[0])
+    self.assertEqual(
+        len([task for task in dag_tasks.values() if task.get('withItems') == [1, 2, 3]]), 1)
+
+    loader_template = [template for template in workflow_dict['spec']['templates'] if template['name'] == loader_name][0]
+    raw_data = loader_template['inputs']['artifacts'][0]['raw']['data']
+    lines = gzip.decompress(base64.b64decode(raw_data)).decode('utf-8').splitlines()
+    self.assertEqual([json.loads(line) for line in lines], large_items)
+    self.assertLess(len(json.dumps(workflow_dict)), len(json.dumps(large_items)))
+
+    # The lists under the default threshold stay inline.
+    inline_workflow_dict = kfp.compiler.Compiler()._compile(some_pipeline)
+    inline_tasks = [task for template in inline_workflow_dict['spec']['templates']
+                    for task in template.get('dag', {}).get('tasks', [])]
+    self.assertFalse(any(task['name'].endswith('-items') for task in inline_tasks))
+    self.assertEqual(len([task for task in inline_tasks if 'withItems' in task]), 2)
+
+    with self.assertRaises(ValueError):
+      dsl.PipelineConf().set_loop_items_externalization_threshold(-1)
+
+  def test_externalize_loop_items_by_default(self):
+    """Test that the loop item lists over the default threshold are externalized unless disabled."""
+    def some_op(text):
+      return dsl.ContainerOp(
+          name='echo',
+          image='busybox',
+          command=['echo', text],
+      )
+
+    large_items = ['the text of the item number %d' % i for i in range(20000)]
+    self.assertGreater(len(json.dumps(large_items)), 256 * 1024)
+
+    def some_pipeline():
+      with dsl.ParallelFor(large_items) as item:
+        some_op(item)
+
+    def get_dag_tasks(workflow_dict):
+      return [task for template in workflow_dict['spec']['templates']
+              for task in template.get('dag', {}).get('tasks', [])]
+
+    dag_tasks = get_dag_tasks(kfp.compiler.Compiler()._compile(some_pipeline))
+    self.assertTrue(any(task['name'].endswith('-items') for task in dag_tasks))
+    self.assertFalse(any('withItems' in task for task in dag_tasks))
+
+    pipeline_conf = dsl.PipelineConf().set_loop_items_externalization_threshold(None)
+    inline_dag_tasks = get_dag_tasks(kfp.compiler.Compiler()._compile(some_pipeline, pipeline_conf=pipeline_conf))
+    self.assertFalse(any(task['name'].endswith('-items') for task in inline_dag_tasks))
+    self.assertEqual([task['withItems'] for task in inline_dag_tasks if 'withItems' in task], [large_items])
+
+  def test_externalized_loop_items_are_split_under_output_limit(self):
+    """Test that the loaded item lists fit into the output parameter annotation."""
+    from kfp.compiler._loop_items_externalization import MAX_ITEMS_OUTPUT_BYTES, _LOAD_ITEMS_PROGRAM
+
+    def some_op(text):
+      return dsl.ContainerOp(
+          name='echo',
+          image='busybox',
+          command=['echo', text],
+      )
+
+    large_items = [{'index': i, 'text': 'the "text" of the item number %d' % i} for i in range(10000)]
+
+    def some_pipeline():
+      with dsl.ParallelFor(large_items) as item:
+        loop_task = some_op(item.text)
+      some_op('after').after(loop_task)
+
+    pipeline_conf = dsl.PipelineConf().set_loop_items_externalization_threshold(0)
+    workflow_dict = kfp.compiler.Compiler()._compile(some_pipeline, pipeline_conf=pipeline_conf)
+    templates = {template['name']: template for template in workflow_dict['spec']['templates']}
+    dag_tasks = {
+        task['name']: task
+        for template in templates.values()
+        for task in template.get('dag', {}).get('tasks', [])
+    }
+    loop_tasks = [task for task in dag_tasks.values() if 'withParam' in task]
+    self.assertGreater(len(loop_tasks), 1)
+
+    loaded_items = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+      for loop_task in loop_tasks:
+        loader_name = loop_task['withParam'].split('.')[1]
+        self.assertIn(loader_name, loop_task['dependencies'])
+        data_path = os.path.join(temp_dir, 'data')
+        output_path = os.path.join(temp_dir, 'outputs', loader_name)
+        with open(data_path, 'w') as f:
+          f.write(templates[loader_name]['inputs']['artifacts'][0]['raw']['data'])
+        subprocess.run([sys.executable, '-c', _LOAD_ITEMS_PROGRAM, data_path, output_path], check=True)
+        with open(output_path) as f:
+          output = f.read()
+        # The output parameter is escaped inside the JSON annotation.
+        self.assertLessEqual(len(json.dumps(output)), MAX_ITEMS_OUTPUT_BYTES)
+        loaded_items.extend(json.loads(output))
+    self.assertEqual(sorted(loaded_items, key=lambda item: item['index']), large_items)
+
+    # The task after the loop waits for all the parts.
+    after_task = [task for task in dag_tasks.values() if loop_tasks[0]['name'] in task.get('dependencies', [])]
+    self.assertEqual(len(after_task), 1)
+    self.assertEqual(set(after_task[0]['dependencies']), set(task['name'] for task in loop_tasks))
+
+  def test_externalized_loop_items_stay_inline_when_loop_outputs_are_used(self):
+    """Test that the item lists that need to be split stay inline when the loop outputs are used."""
+    @kfp.components.create_component_from_func
+    def echo_op(text: str) -> str:
+      return text
+
+    @kfp.components.create_component_from_func
+    def consume_op(texts: str):
+      print(texts)
+
+    large_items = ['the text of the item number %d' % i for i in range(10000)]
+
+    def some_pipeline():
+      with dsl.ParallelFor(large_items) as item:
+        echo_task = echo_op(item)
+      consume_op(echo_task.output)
+
+    pipeline_conf = dsl.PipelineConf().set_loop_items_externalization_threshold(0)
+    with self.assertWarns(UserWarning):
+      workflow_dict = kfp.compiler.Compiler()._compile(some_pipeline, pipeline_conf=pipeline_conf)
+    dag_tasks = [task for template in workflow_dict['spec']['templates']
+                 for task in template.get('dag', {}).get('tasks', [])]
+    self.assertFalse(any(task['name'].endswith('-items') for task in dag_tasks))
+    self.assertEqual([task['withItems'] for task in dag_tasks if 'withItems' in task], [large_items])
+
+  def test_deterministic_compile(self):
+    """Test that compiling the same pipeline twice produces the same bytes."""
+    def some_op(text):
+      return dsl.ContainerOp(
+          name='echo',
+          image='busybox',
+          command=['echo', text],
+          file_outputs={'out': '/tmp/out'},
+      )
+
+    @dsl.pipeline()
+    def some_pipeline(items='[1, 2]'):
+      with dsl.ParallelFor([{'a': 1}, {'a': 2}]) as item:
+        with dsl.ParallelFor(items) as inner_item:
+          some_op(inner_item)
+        some_op(item.a)
+      with dsl.ParallelFor([{'a': 1}, {'a': 2}]) as item:
+        some_op(item.a)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+      package_contents = []
+      for index in range(2):
+        package_path = os.path.join(tmpdir, 'workflow%d.tar.gz' % index)
+        compiler.Compiler().compile(some_pipeline, package_path, deterministic=True)
+        with open(package_path, 'rb') as f:
+          package_contents.append(f.read())
+      self.assertEqual(package_contents[0], package_contents[1])
+
+      workflow = self._get_yaml_from_tar(package_path)
+      self.assertNotIn('pipelines.kubeflow.org/pipeline_compilation_time', workflow['metadata']['annotations'])
+      loop_template_names = [template['name'] for template in workflow['spec']['templates'] if template['name'].startswith('for-loop-')]
+      self.assertEqual(len(loop_template_names), 3)
+      self.assertEqual(len(set(loop_template_names)), 3)
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_workflow_package_round_trip(self):
+    """Test writing and reading the workflow packages in all formats."""
+    from kfp.compiler._workflow_package import read_workflow_package, write_workflow_package
+    from kfp.components._yaml_utils import dump_yaml
+
+    workflow = {
+        'apiVersion': 'argoproj.io/v1alpha1',
+        'kind': 'Workflow',
+        'spec': {
+            'templates': [{'name': 'task-%d' % i, 'container': {'image': 'busybox', 'args': ['line 1\nline 2', 'yes']}} for i in range(100)],
+        },
+    }
+    tmpdir = tempfile.mkdtemp()
+    try:
+      for file_name in ['workflow.tar.gz', 'workflow.tgz', 'workflow.zip', 'workflow.yaml']:
+        sizes = []
+        for compression_level in [1, 9]:
+          package_path = os.path.join(tmpdir, '%d-%s' % (compression_level, file_name))
+          write_workflow_package(workflow, package_path, compression_level=compression_level)
+          self.assertEqual(read_workflow_package(package_path), workflow)
+          sizes.append(os.path.getsize(package_path))
+        if not file_name.endswith('.yaml'):
+          self.assertGreater(sizes[0], sizes[1])
+
+      package_path = os.path.join(tmpdir, '9-workflow.tar.gz')
+      self.assertEqual(self._get_yaml_from_tar(package_path), workflow)
+      self.assertEqual(compiler.Compiler()._write_workflow(workflow), dump_yaml(workflow))
+      with self.assertRaises(ValueError):
+        write_workflow_package(workflow, os.path.join(tmpdir, 'workflow.json'))
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_unresolved_pipeline_param_detection(self):
+    """Test detecting the unresolved PipelineParams split between the written chunks."""
+    from kfp.compiler.compiler import _SubstringDetector
+
+    detector = _SubstringDetector('{{pipelineparam')
+    for chunk in ['abc {{pipe', 'line', 'param:op=;name=a}}']:
+      detector.write(chunk)
+    self.assertTrue(detector.found)
+
+    detector = _SubstringDetector('{{pipelineparam')
+    for chunk in ['abc {{pipe', 'line', ' param']:
+      detector.write(chunk)
+    self.assertFalse(detector.found)
+
   def test_set_ttl_seconds_after_finished(self):
     """Test a pipeline with ttl after finished."""
     def some_op():
@@ -945,6 +1232,9 @@ implementation:
   def test_parallelfor_item_argument_resolving(self):
     self._test_py_compile_yaml('parallelfor_item_argument_resolving')
 
+  def test_parallelfor_batching(self):
+    self._test_py_compile_yaml('parallelfor_batching')
+
   def test_py_input_artifact_raw_value(self):
     """Test pipeline input_artifact_raw_value."""
     self._test_py_compile_yaml('input_artifact_raw_value')
@@ -1106,5 +1396,90 @@ implementation:
     resolved = Compiler._resolve_task_pipeline_param(p, group_type="subgraph")
     self.assertEqual(resolved, "{{inputs.parameters.op1-param1}}")
 
+  def test_deduplicate_templates(self):
+    add_op = kfp.components.load_component_from_text('''
+name: Add
+inputs:
+- {name: a, type: Integer}
+- {name: b, type: Integer}
+outputs:
+- {name: sum, type: Integer}
+implementation:
+  container:
+    image: alpine
+    command: [sh, -c, 'echo $(($0 + $1)) > $2', {inputValue: a}, {inputValue: b}, {outputPath: sum}]
+''')
+    consume_op = kfp.components.load_component_from_text('''
+name: Consume
+inputs:
+- {name: data}
+- {name: suffix}
+implementation:
+  container:
+    image: alpine
+    command: [sh, -c, 'cat $0; echo $1', {inputPath: data}, {inputValue: suffix}]
+''')
+
+    @dsl.pipeline(name='deduplicate-templates')
+    def some_pipeline(x: int = 1):
+      task = add_op(x, 1)
+      for i in range(2, 6):
+        task = add_op(task.output, i)
+      with dsl.Condition(task.output == 15):
+        consume_op(task.output, 'first')
+        consume_op(task.output, 'second')
+      with dsl.ParallelFor([1, 2]) as item:
+        add_op(task.output, item)
+      consume_op(add_op(x, 7).output, 'third')
+
+    workflow = Compiler()._create_workflow(some_pipeline)
+    deduplicated_workflow, report = deduplicate_templates(workflow)
+    kfp.compiler.compiler._validate_workflow(deduplicated_workflow)
+    self.assertLess(report.template_count_after, report.template_count_before)
+    self.assertLess(report.size_after, report.size_before)
+    self.assertEqual(report.template_count_after, len(deduplicated_workflow['spec']['templates']))
+
+    compiler = Compiler()
+    compiled_workflow = compiler._create_workflow(some_pipeline, deduplicate_templates=True)
+    self.assertEqual(len(compiled_workflow['spec']['templates']), report.template_count_after)
+    self.assertEqual(compiler._template_deduplication_report.template_count_after, report.template_count_after)
+
+    def get_templates_and_tasks(workflow):
+      templates = {template['name']: template for template in workflow['spec']['templates']}
+      tasks = {
+          task['name']: task
+          for template in templates.values() if 'dag' in template
+          for task in template['dag']['tasks']
+      }
+      return templates, tasks
+
+    def resolve_container(template, task):
+      # Substitutes the task arguments and strips the names of the upstream outputs which are template-specific.
+      arguments = {argument['name']: argument['value'] for argument in task.get('arguments', {}).get('parameters', [])}
+      text = json.dumps([template['container'], template['metadata']['annotations']])
+      for name, value in arguments.items():
+        text = text.replace('{{inputs.parameters.%s}}' % name, json.dumps(value)[1:-1])
+      return re.sub(r'(tasks\.[-\w]+\.outputs\.parameters)\.[-\w]+', r'\1', text)
+
+    templates, tasks = get_templates_and_tasks(workflow)
+    deduplicated_templates, deduplicated_tasks = get_templates_and_tasks(deduplicated_workflow)
+    self.assertEqual(set(tasks), set(deduplicated_tasks))
+    for task_name, task in tasks.items():
+      deduplicated_task = deduplicated_tasks[task_name]
+      template = templates[task['template']]
+      deduplicated_template = deduplicated_templates[deduplicated_task['template']]
+      if 'container' in template:
+        self.assertEqual(resolve_container(template, task), resolve_container(deduplicated_template, deduplicated_task))
+      # The task arguments must match the template inputs
+      for kind in ['parameters', 'artifacts']:
+        self.assertEqual(
+            sorted(argument['name'] for argument in deduplicated_task.get('arguments', {}).get(kind, [])),
+            sorted(input['name'] for input in deduplicated_template.get('inputs', {}).get(kind, [])),
+        )
+      # The output references must point to the existing outputs
+      for task_name, kind, output_name in re.findall(r'tasks\.([-\w]+)\.outputs\.(parameters|artifacts)\.([-\w]+)', json.dumps(deduplicated_task)):
+        upstream_template = deduplicated_templates[deduplicated_tasks[task_name]['template']]
+        self.assertIn(output_name, [output['name'] for output in upstream_template['outputs'][kind]])
+
   def test_uri_artifact_passing(self):
     self._test_py_compile_yaml('uri_artifacts')
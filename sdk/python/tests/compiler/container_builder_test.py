@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import os
 import tarfile
 import unittest
@@ -51,6 +52,33 @@ class TestContainerBuild(unittest.TestCase):
     # clean up
     os.remove(temp_tarball)
 
+  @mock.patch('kfp.containers._k8s_job_helper.K8sJobHelper')
+  def test_build_from_files(self, mock_k8s_job_helper, mock_gcshelper):
+    """ Test streaming the files to the build context """
+    uploaded_tarballs = []
+    def upload_gcs_file_obj(file_obj, gcs_path):
+      file_obj.seek(0)
+      uploaded_tarballs.append(file_obj.read())
+    mock_gcshelper.upload_gcs_file_obj.side_effect = upload_gcs_file_obj
+    kaniko_status = mock.Mock(state=mock.Mock(terminated=mock.Mock(message='sha256:0123')))
+    kaniko_status.name = 'kaniko'
+    mock_k8s_job_helper.return_value.run_job.return_value.status.container_statuses = [kaniko_status]
+
+    with tempfile.TemporaryDirectory() as test_data_dir:
+      temp_file = os.path.join(test_data_dir, 'main.py')
+      with open(temp_file, 'w') as f:
+        f.write('print(1)')
+
+      builder = ContainerBuilder(gcs_staging=GCS_BASE, default_image_name=DEFAULT_IMAGE_NAME, namespace='default')
+      image_name = builder._build_from_files({'src/main.py': temp_file, 'Dockerfile': b'FROM python:3.7'})
+
+    self.assertEqual(image_name, DEFAULT_IMAGE_NAME + '@sha256:0123')
+    self.assertEqual(len(uploaded_tarballs), 1)
+    with tarfile.open(fileobj=io.BytesIO(uploaded_tarballs[0])) as tarball:
+      self.assertEqual(sorted(tarball.getnames()), ['Dockerfile', 'src/main.py'])
+      self.assertEqual(tarball.extractfile('src/main.py').read(), b'print(1)')
+      self.assertEqual(tarball.extractfile('Dockerfile').read(), b'FROM python:3.7')
+
   def test_generate_kaniko_yaml(self, mock_gcshelper):
     """ Test generating the kaniko job yaml """
 
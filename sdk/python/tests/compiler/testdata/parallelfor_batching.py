@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import kfp
+from kfp import dsl
+from kfp.dsl import _for_loop
+
+class Coder:
+  def __init__(self, ):
+    self._code_id = 0
+
+  def get_code(self, ):
+    self._code_id += 1
+    return '{code:0{num_chars:}d}'.format(code=self._code_id, num_chars=_for_loop.LoopArguments.NUM_CODE_CHARS)
+
+
+dsl.ParallelFor._get_unique_id_code = Coder().get_code
+
+produce_op = kfp.components.load_component_from_text('''\
+name: Produce list
+outputs:
+- name: data_list
+implementation:
+  container:
+    image: python:3.7
+    command:
+    - sh
+    - -c
+    - echo "[1, 2, 3, 4, 5]" > "$0"
+    - outputPath: data_list
+''')
+
+add_op = kfp.components.load_component_from_text('''\
+name: Add
+inputs:
+- name: a
+- name: b
+outputs:
+- name: sum
+implementation:
+  container:
+    image: python:3.7
+    command:
+    - sh
+    - -c
+    - echo "$(($0 + $1))" > "$2"
+    - inputValue: a
+    - inputValue: b
+    - outputPath: sum
+''')
+
+consume_op = kfp.components.load_component_from_text('''\
+name: Consume data
+inputs:
+- name: data
+implementation:
+  container:
+    image: python:3.7
+    command:
+    - echo
+    - inputValue: data
+''')
+
+@dsl.pipeline(
+    name='Parallelfor batching',
+    description='Test pipeline to verify the batched loops.'
+)
+def pipeline():
+  with dsl.ParallelFor([{'a': 1, 'b': 10}, {'a': 2, 'b': 20}, {'a': 3, 'b': 30}], batch_size=2) as item:
+    add_task = add_op(item.a, item.b)
+  consume_op(add_task.output)
+
+  source_task = produce_op()
+  with dsl.ParallelFor(source_task.output, batch_size=2, batch_parallelism=1) as item:
+    consume_op(item)
@@ -122,3 +122,34 @@ class TestConditionOp(unittest.TestCase):
       with condition2:
         pass
       self.assertEqual(condition2.name, 'condition-[param1 is pizza]-2')
+
+
+class TestParallelFor(unittest.TestCase):
+  def test_batch_size_packs_static_items(self):
+    with Pipeline('somename') as p:
+      with dsl.ParallelFor([1, 2, 3], batch_size=2) as item:
+        op1 = ContainerOp(name='op1', image='image', command=['echo', item], file_outputs={'out': '/out.txt'})
+
+    loop = p.groups[0].groups[0]
+    self.assertEqual(loop.loop_args.to_list_for_task_yaml(), ['[1, 2]', '[3]'])
+    self.assertIn('__kfp_batch_item__', op1.command)
+    self.assertIn(str(loop.loop_args), op1.command)
+    self.assertEqual(op1.inputs, [loop.loop_args])
+    self.assertEqual(op1.output.param_type, 'JsonArray')
+
+  def test_batch_size_splits_dynamic_items_at_runtime(self):
+    with Pipeline('somename') as p:
+      producer = ContainerOp(name='producer', image='image', file_outputs={'out': '/out.txt'})
+      with dsl.ParallelFor(producer.output, batch_size=10) as item:
+        ContainerOp(name='op1', image='image', command=['echo', item])
+
+    self.assertEqual(['producer', 'Split loop items'], [op.human_name for op in p.groups[0].ops])
+    loop = p.groups[0].groups[0]
+    self.assertEqual(loop.loop_args.items_or_pipeline_param.op_name, p.groups[0].ops[1].name)
+
+  def test_batch_size_requires_single_task(self):
+    with self.assertRaises(ValueError):
+      with Pipeline('somename') as p:
+        with dsl.ParallelFor([1, 2, 3], batch_size=2) as item:
+          ContainerOp(name='op1', image='image', command=['echo', item])
+          ContainerOp(name='op2', image='image', command=['echo', item])
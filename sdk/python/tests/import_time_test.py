@@ -0,0 +1,107 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Import-time regression benchmark.
+
+Measures `python -X importtime` for the SDK entry points in a fresh
+interpreter and checks them against a budget. The budget can be overridden
+with the KFP_IMPORT_TIME_BUDGET_MS environment variable.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+_IMPORT_TIME_BUDGET_MS = float(os.environ.get('KFP_IMPORT_TIME_BUDGET_MS', 250))
+
+# Modules that must not be loaded by the bare package imports.
+_HEAVY_MODULES = [
+    'kubernetes',
+    'kfp_server_api',
+    'google.protobuf',
+    'absl',
+    'cloudpickle',
+    'requests',
+]
+
+
+def _measure_import(statement: str):
+  """Returns the cumulative import time (ms) per module.
+
+  The second element of the tuple contains only the top-level imports.
+  """
+  result = subprocess.run(
+      [sys.executable, '-X', 'importtime', '-c', statement],
+      stdout=subprocess.PIPE,
+      stderr=subprocess.PIPE,
+      universal_newlines=True,
+      check=True,
+  )
+  cumulative_times_ms = {}
+  top_level_times_ms = {}
+  for line in result.stderr.splitlines():
+    match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)', line)
+    if match:
+      time_ms = int(match.group(2)) / 1000
+      cumulative_times_ms[match.group(4)] = time_ms
+      if len(match.group(3)) == 1:
+        top_level_times_ms[match.group(4)] = time_ms
+  return cumulative_times_ms, top_level_times_ms
+
+
+class ImportTimeTest(unittest.TestCase):
+
+  def _check_import(self, module_name: str):
+    import_times, top_level_import_times = _measure_import(
+        'import ' + module_name)
+    heavy_modules = [
+        name for name in import_times
+        if any(name == heavy or name.startswith(heavy + '.')
+               for heavy in _HEAVY_MODULES)
+    ]
+    self.assertEqual(
+        heavy_modules, [],
+        '"import {}" should not load heavy modules'.format(module_name))
+    total_time_ms = sum(
+        time_ms for name, time_ms in top_level_import_times.items()
+        if name == 'kfp' or name.startswith('kfp.'))
+    self.assertLess(
+        total_time_ms, _IMPORT_TIME_BUDGET_MS,
+        '"import {}" took {:.1f}ms, the budget is {}ms'.format(
+            module_name, total_time_ms, _IMPORT_TIME_BUDGET_MS))
+
+  def test_import_kfp(self):
+    self._check_import('kfp')
+
+  def test_import_kfp_components(self):
+    self._check_import('kfp.components')
+
+  def test_import_kfp_dsl(self):
+    self._check_import('kfp.dsl')
+
+  def test_lazy_attributes_are_loaded_on_access(self):
+    subprocess.run(
+        [
+            sys.executable, '-c',
+            'import kfp; kfp.Client; kfp.dsl.ContainerOp; kfp.dsl.types; '
+            'kfp.components.create_component_from_func; '
+            'kfp.components.structures.ComponentSpec'
+        ],
+        check=True,
+    )
+
+
+if __name__ == '__main__':
+  unittest.main()
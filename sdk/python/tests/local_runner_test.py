@@ -0,0 +1,275 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import kfp
+from kfp import components
+from kfp import dsl
+from kfp._local_cache import LocalExecutionCache, parse_duration
+
+
+@components.create_component_from_func
+def produce_op(n: int) -> list:
+    return list(range(n))
+
+
+@components.create_component_from_func
+def flip_op(seed: int) -> str:
+    return 'heads' if seed % 2 == 0 else 'tails'
+
+
+@components.create_component_from_func
+def square_op(x: int) -> int:
+    return x * x
+
+
+@components.create_component_from_func
+def fail_op():
+    raise RuntimeError('Failing on purpose')
+
+
+@components.create_component_from_func
+def echo_op(message: str) -> str:
+    print(message)
+    return message
+
+
+def write_text(text: str, output_path: components.OutputPath('Text')):
+    with open(output_path, 'w') as f:
+        f.write(text)
+
+
+def read_text(text_path: components.InputPath('Text')) -> str:
+    with open(text_path) as f:
+        return f.read()
+
+
+write_text_op = components.create_component_from_func(write_text)
+read_text_op = components.create_component_from_func(read_text)
+
+
+def control_flow_pipeline(seed: int = 2):
+    exit_task = echo_op('exit: {{workflow.status}}')
+    with dsl.ExitHandler(exit_task):
+        flip_task = flip_op(seed)
+        with dsl.Condition(flip_task.output == 'heads'):
+            write_task = write_text_op('hello')
+            read_task = read_text_op(write_task.outputs['output'])
+            echo_op(read_task.output)
+        with dsl.ParallelFor([{'a': 1}, {'a': 2}]) as item:
+            echo_op(item.a)
+        produce_task = produce_op(3)
+        with dsl.ParallelFor(produce_task.output) as x:
+            square_op(x)
+
+
+def _read_log(task):
+    with open(task.log_path) as f:
+        return f.read()
+
+
+class LocalRunnerTestCase(unittest.TestCase):
+    def test_run_pipeline_func_locally(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = kfp.run_pipeline_func_locally(
+                control_flow_pipeline, {'seed': 4}, output_dir=output_dir, max_parallelism=4)
+            self.assertEqual(result.status, 'Succeeded')
+
+            tasks = {task.task_id: task for task in result.tasks}
+            self.assertEqual(tasks['exit-handler-1.flip-op'].parameters['flip-op-Output'], 'heads')
+            self.assertEqual(tasks['exit-handler-1.condition-2.read-text'].parameters['read-text-Output'], 'hello')
+            self.assertIn('hello', _read_log(tasks['exit-handler-1.condition-2.echo-op-2']))
+            self.assertEqual(
+                tasks['exit-handler-1.produce-op'].parameters['produce-op-Output'], '[0, 1, 2]')
+            item_tasks = [task for task_id, task in tasks.items() if task_id.endswith('.echo-op-3')]
+            self.assertEqual(sorted(_read_log(task).strip() for task in item_tasks), ['1', '2'])
+            square_tasks = [task for task_id, task in tasks.items() if task_id.endswith('.square-op')]
+            self.assertEqual(len(square_tasks), 3)
+            self.assertIn('exit: Succeeded', _read_log(tasks['onExit']))
+
+            # The artifact is passed by linking the producer file.
+            write_output = tasks['exit-handler-1.condition-2.write-text'].artifacts['write-text-output']
+            self.assertTrue(write_output.startswith(output_dir))
+            self.assertGreaterEqual(os.stat(write_output).st_nlink, 2)
+
+            for task in result.tasks:
+                self.assertEqual(task.status, 'Succeeded')
+                self.assertIsNotNone(task.start_time)
+                self.assertGreater(task.duration, 0)
+            self.assertIn('exit-handler-1.flip-op', result.format_timing_report())
+
+    def test_condition_skips_tasks(self):
+        result = kfp.run_pipeline_func_locally(control_flow_pipeline, {'seed': 3})
+        self.assertEqual(result.status, 'Succeeded')
+        self.assertEqual(result.get_task('exit-handler-1.condition-2').status, 'Skipped')
+        self.assertNotIn(
+            'exit-handler-1.condition-2.read-text', [task.task_id for task in result.tasks])
+
+    def test_failure_omits_downstream_tasks_and_runs_exit_handler(self):
+        def failing_pipeline():
+            exit_task = echo_op('exit: {{workflow.status}}')
+            with dsl.ExitHandler(exit_task):
+                fail_task = fail_op()
+                echo_op('after').after(fail_task)
+
+        result = kfp.run_pipeline_func_locally(failing_pipeline, {})
+        self.assertEqual(result.status, 'Failed')
+        self.assertEqual(result.get_task('exit-handler-1.fail-op').status, 'Failed')
+        self.assertIn('Failing on purpose', _read_log(result.get_task('exit-handler-1.fail-op')))
+        self.assertEqual(result.get_task('exit-handler-1.echo-op-2').status, 'Omitted')
+        self.assertIn('exit: Failed', _read_log(result.get_task('onExit')))
+
+    def test_tasks_run_in_parallel(self):
+        @components.create_component_from_func
+        def sleep_op(seconds: float):
+            import time
+            time.sleep(seconds)
+
+        def parallel_pipeline():
+            with dsl.ParallelFor([1, 2, 3, 4]):
+                sleep_op(1)
+
+        result = kfp.run_pipeline_func_locally(parallel_pipeline, {}, max_parallelism=4)
+        self.assertEqual(result.status, 'Succeeded')
+        self.assertEqual(len(result.tasks), 4)
+        self.assertLess(result.duration, sum(task.duration for task in result.tasks))
+
+
+    def test_batched_loops(self):
+        @components.create_component_from_func
+        def add_op(a: int, b: int) -> int:
+            return a + b
+
+        @components.create_component_from_func
+        def flatten_op(batches: list):
+            import json
+            print([value for batch in batches for value in json.loads(batch)])
+
+        def batched_pipeline(n: int = 5):
+            with dsl.ParallelFor([{'a': 1, 'b': 10}, {'a': 2, 'b': 20}, {'a': 3, 'b': 30}], batch_size=2) as item:
+                add_task = add_op(item.a, item.b)
+            flatten_op(add_task.output)
+            produce_task = produce_op(n)
+            with dsl.ParallelFor(produce_task.output, batch_size=3, batch_parallelism=2) as x:
+                square_op(x)
+
+        result = kfp.run_pipeline_func_locally(batched_pipeline, {})
+        self.assertEqual(result.status, 'Succeeded')
+        add_outputs = sorted(
+            task.parameters['add-op-Output'] for task in result.tasks if task.template == 'add-op')
+        self.assertEqual(add_outputs, ['["11", "22"]', '["33"]'])
+        self.assertEqual(len([task for task in result.tasks if task.template == 'square-op']), 2)
+        # The loop outputs are aggregated over the batches.
+        self.assertIn("['11', '22', '33']", _read_log(result.get_task('flatten-op')))
+
+    def test_externalized_loop_items(self):
+        def loop_pipeline():
+            with dsl.ParallelFor([{'a': 1}, {'a': 2}, {'a': 3}]) as item:
+                echo_op(item.a)
+
+        pipeline_conf = dsl.PipelineConf().set_loop_items_externalization_threshold(0)
+        result = kfp.run_pipeline_func_locally(loop_pipeline, {}, pipeline_conf=pipeline_conf)
+        self.assertEqual(result.status, 'Succeeded')
+        self.assertTrue(any(task.task_id.endswith('-items') for task in result.tasks))
+        echo_logs = sorted(_read_log(task).strip() for task in result.tasks if task.template == 'echo-op')
+        self.assertEqual(echo_logs, ['1', '2', '3'])
+
+    def test_execution_cache(self):
+        def cached_pipeline(text: str = 'hello'):
+            write_task = write_text_op(text)
+            read_task = read_text_op(write_task.outputs['output'])
+            echo_op(read_task.output)
+            volatile_task = echo_op('volatile')
+            volatile_task.execution_options.caching_strategy.max_cache_staleness = 'P0D'
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first_result = kfp.run_pipeline_func_locally(cached_pipeline, {}, cache_dir=cache_dir)
+            self.assertEqual(first_result.status, 'Succeeded')
+            self.assertFalse(any(task.cached for task in first_result.tasks))
+
+            second_result = kfp.run_pipeline_func_locally(cached_pipeline, {}, cache_dir=cache_dir)
+            self.assertEqual(second_result.status, 'Succeeded')
+            self.assertEqual(
+                {task.task_id: task.cached for task in second_result.tasks},
+                {'write-text': True, 'read-text': True, 'echo-op': True, 'echo-op-2': False},
+            )
+            self.assertEqual(second_result.get_task('read-text').parameters['read-text-Output'], 'hello')
+            cached_artifact = second_result.get_task('write-text').artifacts['write-text-output']
+            with open(cached_artifact) as f:
+                self.assertEqual(f.read(), 'hello')
+            self.assertIn('Cached', second_result.format_timing_report())
+
+            changed_result = kfp.run_pipeline_func_locally(cached_pipeline, {'text': 'bye'}, cache_dir=cache_dir)
+            self.assertFalse(changed_result.get_task('write-text').cached)
+            self.assertEqual(changed_result.get_task('read-text').parameters['read-text-Output'], 'bye')
+
+            stale_result = kfp.run_pipeline_func_locally(
+                cached_pipeline, {}, cache_dir=cache_dir, max_cache_staleness='PT0S')
+            self.assertFalse(any(task.cached for task in stale_result.tasks))
+
+    def test_execution_cache_eviction(self):
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as data_dir:
+            cache = LocalExecutionCache(cache_dir, max_size_bytes=150)
+            for index in range(3):
+                path = os.path.join(data_dir, str(index))
+                with open(path, 'w') as f:
+                    f.write(str(index) * 100)
+                cache.put('key{}'.format(index), {'index': str(index)}, {'data': path})
+                # Making the access times distinct.
+                os.utime(os.path.join(cache_dir, 'entries', 'key{}.json'.format(index)), (index, index))
+            self.assertIsNotNone(cache.get('key0'))
+            cache.evict()
+
+            self.assertIsNotNone(cache.get('key0'))
+            self.assertIsNone(cache.get('key1'))
+            self.assertIsNone(cache.get('key2'))
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, 'objects'))), 1)
+
+    def test_execution_cache_objects_are_not_changed_through_outputs(self):
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as data_dir:
+            cache = LocalExecutionCache(cache_dir)
+            output_path = os.path.join(data_dir, 'output')
+            with open(output_path, 'w') as f:
+                f.write('original')
+            cache.put('key', {}, {'data': output_path})
+
+            # The task output is changed in place after it was stored.
+            with open(output_path, 'w') as f:
+                f.write('changed')
+            restored_path = os.path.join(data_dir, 'restored', 'output')
+            cache.restore_artifacts(cache.get('key'), {'data': restored_path})
+            with open(restored_path) as f:
+                self.assertEqual(f.read(), 'original')
+            self.assertFalse(os.stat(restored_path).st_mode & 0o222)
+
+            # The restored output shares the stored object. Changing it anyway makes the entry a cache miss.
+            os.chmod(restored_path, 0o644)
+            with open(restored_path, 'w') as f:
+                f.write('changed')
+            self.assertIsNone(cache.get('key'))
+            self.assertIsNone(LocalExecutionCache(cache_dir).get('key'))
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration('P0D'), 0)
+        self.assertEqual(parse_duration('P30DT1H22M3S'), 30 * 86400 + 3600 + 22 * 60 + 3)
+        self.assertEqual(parse_duration('PT1.5S'), 1.5)
+        with self.assertRaises(ValueError):
+            parse_duration('30 days')
+
+
+if __name__ == '__main__':
+    unittest.main()
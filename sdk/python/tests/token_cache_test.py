@@ -0,0 +1,165 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import os
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from kfp import _auth
+from kfp._token_cache import TokenCache
+
+
+class _TokenSource:
+
+    def __init__(self, lifetime_seconds: float = 3600):
+        self.lifetime_seconds = lifetime_seconds
+        self.fetch_count = 0
+
+    def __call__(self):
+        self.fetch_count += 1
+        return 'token-{}'.format(self.fetch_count), time.time() + self.lifetime_seconds
+
+
+class TokenCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+        self._cache_path = os.path.join(self._temp_dir.name, 'kfp', 'token_cache.json')
+
+    def _make_cache(self, **kwargs) -> TokenCache:
+        cache = TokenCache(cache_path=self._cache_path, **kwargs)
+        self.addCleanup(cache.clear)
+        return cache
+
+    def test_token_is_reused(self):
+        source = _TokenSource()
+        cache = self._make_cache()
+        self.assertEqual(cache.get_token('key', source), 'token-1')
+        self.assertEqual(cache.get_token('key', source), 'token-1')
+        self.assertEqual(cache.get_token('other-key', source), 'token-2')
+        self.assertEqual(source.fetch_count, 2)
+
+    def test_token_is_shared_with_other_processes(self):
+        source = _TokenSource()
+        self._make_cache().get_token('key', source)
+        # A new cache behaves like a cache of another process.
+        self.assertEqual(self._make_cache().get_token('key', source), 'token-1')
+        self.assertEqual(source.fetch_count, 1)
+        self.assertEqual(stat.S_IMODE(os.stat(self._cache_path).st_mode), 0o600)
+
+    def test_expiring_token_is_fetched_again(self):
+        source = _TokenSource(lifetime_seconds=60)
+        cache = self._make_cache(refresh_margin_seconds=120)
+        self.assertEqual(cache.get_token('key', source), 'token-1')
+        self.assertEqual(cache.get_token('key', source), 'token-2')
+        self.assertEqual(self._make_cache().get_token('key', source), 'token-3')
+
+    def test_missing_token_is_not_cached(self):
+        cache = self._make_cache()
+        self.assertIsNone(cache.get_token('key', lambda: None))
+        self.assertEqual(cache.get_token('key', _TokenSource()), 'token-1')
+
+    def test_used_token_is_refreshed_in_background(self):
+        source = _TokenSource(lifetime_seconds=1.5)
+        cache = TokenCache(cache_path=None, refresh_margin_seconds=1)
+        self.addCleanup(cache.clear)
+        with mock.patch('kfp._token_cache._REFRESH_RETRY_SECONDS', 0):
+            self.assertEqual(cache.get_token('key', source), 'token-1')
+            unused_source = _TokenSource(lifetime_seconds=1.5)
+            cache.get_token('unused-key', unused_source)
+            cache._tokens['unused-key'].used = False
+            deadline = time.time() + 5
+            while source.fetch_count < 2 and time.time() < deadline:
+                time.sleep(0.05)
+        self.assertEqual(source.fetch_count, 2)
+        self.assertEqual(cache._tokens['key'].token, 'token-2')
+        self.assertEqual(unused_source.fetch_count, 1)
+
+
+class GcpAccessTokenTestCase(unittest.TestCase):
+
+    def test_gcp_access_token_is_cached(self):
+        credentials = mock.Mock(spec=['refresh', 'valid', 'token', 'expiry'])
+        credentials.valid = True
+        credentials.token = 'access-token'
+        credentials.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        cache = TokenCache(cache_path=None)
+        self.addCleanup(cache.clear)
+        _auth._get_default_credentials.cache_clear()
+        self.addCleanup(_auth._get_default_credentials.cache_clear)
+        with mock.patch('google.auth.default', return_value=(credentials, 'project')), \
+                mock.patch('kfp._auth.get_default_token_cache', return_value=cache):
+            self.assertEqual(_auth.get_gcp_access_token(), 'access-token')
+            self.assertEqual(_auth.get_gcp_access_token(), 'access-token')
+        credentials.refresh.assert_called_once()
+        self.assertAlmostEqual(
+            list(cache._tokens.values())[0].expiry,
+            time.time() + 3600, delta=60)
+
+
+class IdTokenTestCase(unittest.TestCase):
+
+    def test_id_token_is_cached_per_local_credential(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        credential_path = os.path.join(temp_dir.name, 'credentials.json')
+        cache = TokenCache(cache_path=None)
+        self.addCleanup(cache.clear)
+
+        def store_refresh_token(refresh_token):
+            with open(credential_path, 'w') as f:
+                json.dump({'client-id': {'refresh_token': refresh_token}}, f)
+
+        with mock.patch('kfp._auth.LOCAL_KFP_CREDENTIAL', credential_path), \
+                mock.patch('kfp._auth.get_default_token_cache', return_value=cache), \
+                mock.patch('kfp._auth._fetch_auth_token', side_effect=['token-1', 'token-2']):
+            store_refresh_token('refresh-token-1')
+            self.assertEqual(_auth.get_auth_token('client-id', None, None), 'token-1')
+            self.assertEqual(_auth.get_auth_token('client-id', None, None), 'token-1')
+            # The user has logged in with another account.
+            store_refresh_token('refresh-token-2')
+            self.assertEqual(_auth.get_auth_token('client-id', None, None), 'token-2')
+
+    def test_id_token_getter_uses_credential_stored_by_login(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        credential_path = os.path.join(temp_dir.name, 'credentials.json')
+        cache = TokenCache(cache_path=None)
+        self.addCleanup(cache.clear)
+
+        def login(client_id, other_client_id, other_client_secret):
+            with open(credential_path, 'w') as f:
+                json.dump({client_id: {'refresh_token': 'refresh-token'}}, f)
+            return 'token-1'
+
+        with mock.patch('kfp._auth.LOCAL_KFP_CREDENTIAL', credential_path), \
+                mock.patch('kfp._auth.get_default_token_cache', return_value=cache), \
+                mock.patch('kfp._auth._fetch_auth_token', side_effect=login) as fetch_auth_token:
+            get_token = _auth.make_auth_token_getter('client-id', 'other-client-id', 'other-client-secret')
+            with mock.patch('kfp._auth._get_local_credential') as get_local_credential:
+                self.assertEqual(get_token(), 'token-1')
+                self.assertEqual(get_token(), 'token-1')
+            get_local_credential.assert_not_called()
+        fetch_auth_token.assert_called_once()
+        self.assertEqual(len(cache._tokens), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()